@@ -0,0 +1,239 @@
+# Teste de carga das páginas: N sessões simuladas, cada uma em uma thread, executando uma
+# página pela API de testes do streamlit (sem navegador e sem rede) e mudando os filtros
+# a cada rerun. Mede a latência de cada rerun (p50/p95/p99), a vazão do processo e o pico
+# de memória (RSS), para saber quantos analistas um processo do streamlit atende. A vazão
+# é separada em duas janelas: a primeira execução de cada sessão (fria, monta a página do
+# zero) e, depois que todas as sessões passaram dela, os reruns (quente).
+#
+# Uso: python benchmarks/bench_carga.py [--sessoes 8] [--reruns 20] [--paginas main countries ...] [--semente 0] [--aquecimento] [--saida arquivo.json]
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+from fome_zero.estado import estado_atual
+
+PAGINAS = {
+    'main': '📊_Main_Page.py',
+    'countries': os.path.join('pages', '1_🌍_Countries.py'),
+    'cities': os.path.join('pages', '2_🏙️_Cities.py'),
+    'cuisines': os.path.join('pages', '3_🍽_Cuisines.py'),
+}
+
+# início dos rótulos dos filtros na barra lateral (o texto muda um pouco entre as páginas)
+FILTRO_PAISES = 'Escolhas os países'
+FILTRO_CULINARIAS = 'Escolhas tipos de culinária'
+FILTRO_QUANTIDADE = 'Selecione a quantidade de restaurantes'
+
+TEMPO_LIMITE = 120
+
+# RUNTIME COMPARTILHADO:
+# O AppTest cria um runtime falso no começo de cada execução e o apaga no final. Com várias
+# sessões em threads, uma execução apagaria o runtime de outra no meio do script; aqui todas
+# as sessões usam um único runtime, como em um servidor de verdade (inclusive o mesmo
+# armazenamento do st.cache_data, que o AppTest recriaria a cada rerun).
+
+def instalar_runtime():
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+
+def _executar(at, widget_state=None, timeout=None):
+    # o mesmo que AppTest._run, sem trocar o runtime
+    runner = LocalScriptRunner(at._script_path, at.session_state, args=at.args, kwargs=at.kwargs)
+    at._tree = runner.run(widget_state, at.query_params, timeout or at.default_timeout)
+    at._tree._runner = at
+    return at
+
+def nova_sessao(caminho):
+    at = AppTest.from_file(caminho, default_timeout=TEMPO_LIMITE)
+    # at.run() e o set_value() dos widgets passam por _run
+    at._run = lambda widget_state=None, timeout=None: _executar(at, widget_state, timeout)
+    return at
+
+# SESSÃO SIMULADA:
+
+def _widget(widgets, rotulo):
+    for widget in widgets:
+        if widget.label.startswith(rotulo):
+            return widget
+    return None
+
+def _acoes(at):
+
+    # cada ação muda um filtro presente na página para um valor sorteado
+    acoes = []
+    paises = _widget(at.sidebar.multiselect, FILTRO_PAISES)
+    if paises is not None:
+        acoes.append(('paises', paises, lambda rng: rng.sample(paises.options, rng.randint(1, len(paises.options)))))
+    culinarias = _widget(at.sidebar.multiselect, FILTRO_CULINARIAS)
+    if culinarias is not None:
+        acoes.append(('culinarias', culinarias, lambda rng: rng.sample(culinarias.options, rng.randint(1, 8))))
+    quantidade = _widget(at.sidebar.slider, FILTRO_QUANTIDADE)
+    if quantidade is not None:
+        acoes.append(('quantidade', quantidade, lambda rng: rng.randint(quantidade.min, quantidade.max)))
+    return acoes
+
+def sessao(pagina, reruns, semente, registrar, barreira):
+
+    rng = random.Random(semente)
+    at = nova_sessao(PAGINAS[pagina])
+    inicio = time.perf_counter()
+    try:
+        at.run()
+        erro = None
+    except RuntimeError as excecao:
+        erro = excecao
+    registrar(pagina, 'inicial', time.perf_counter() - inicio, [erro] if erro else at.exception)
+    # os reruns só começam quando todas as sessões saíram da execução inicial
+    barreira.wait()
+    if erro:
+        return
+
+    for _ in range(reruns):
+        # os widgets são lidos de novo a cada rerun: as opções podem mudar com os filtros
+        nome, widget, sortear = rng.choice(_acoes(at))
+        widget.set_value(sortear(rng))
+        inicio = time.perf_counter()
+        try:
+            at.run()
+        except RuntimeError as erro:
+            # estouro do TEMPO_LIMITE: a sessão para, as outras continuam
+            registrar(pagina, nome, time.perf_counter() - inicio, [erro])
+            return
+        registrar(pagina, nome, time.perf_counter() - inicio, at.exception)
+
+# RELATÓRIO:
+
+def percentis(tempos):
+    ms = np.array(tempos) * 1000
+    return {'reruns': len(ms), 'p50_ms': np.percentile(ms, 50), 'p95_ms': np.percentile(ms, 95), 'p99_ms': np.percentile(ms, 99), 'max_ms': ms.max()}
+
+def pico_rss_mb():
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Teste de carga das páginas com sessões simuladas')
+    parser.add_argument('--sessoes', type=int, default=8, help='sessões simultâneas')
+    parser.add_argument('--reruns', type=int, default=20, help='mudanças de filtro por sessão')
+    parser.add_argument('--paginas', nargs='+', choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--aquecimento', action='store_true', help='deixa o aquecimento dos gráficos rodar antes das sessões')
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados', f"carga_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    # as páginas abrem o logo.png pelo caminho relativo
+    os.chdir(RAIZ)
+    # sem o aquecimento dos gráficos, a primeira visita de cada seleção paga o caminho frio
+    if not args.aquecimento:
+        os.environ['FOME_ZERO_AQUECIMENTO'] = '0'
+    instalar_runtime()
+    # o dataset é carregado antes, para a primeira sessão não pagar a leitura sozinha
+    estado_atual()
+    for thread in threading.enumerate():
+        if thread.name == 'aquecimento':
+            thread.join()
+    rss_antes = pico_rss_mb()
+
+    medicoes = []
+    erros = []
+    trava = threading.Lock()
+
+    def registrar(pagina, acao, segundos, excecao):
+        with trava:
+            medicoes.append((pagina, acao, segundos))
+            if excecao:
+                erros.append(f"{pagina}/{acao}: {getattr(excecao[0], 'message', excecao[0])}")
+
+    # o fim da janela fria (e começo da quente) é marcado quando a última sessão chega à barreira
+    marcos = {}
+    barreira = threading.Barrier(args.sessoes, action=lambda: marcos.setdefault('quente', time.perf_counter()))
+
+    # as sessões se distribuem entre as páginas escolhidas
+    threads = [threading.Thread(target=sessao, args=(args.paginas[i % len(args.paginas)], args.reruns, args.semente + i, registrar, barreira))
+               for i in range(args.sessoes)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fim = time.perf_counter()
+    duracao = fim - inicio
+    duracao_fria = marcos['quente'] - inicio
+    duracao_quente = fim - marcos['quente']
+
+    # a primeira execução de cada sessão fica de fora dos percentis e da vazão quente: ela monta a página do zero
+    iniciais = [m for m in medicoes if m[1] == 'inicial']
+    reruns = [m for m in medicoes if m[1] != 'inicial']
+    relatorio = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'maquina': platform.platform(),
+        'sessoes': args.sessoes,
+        'reruns_por_sessao': args.reruns,
+        'aquecimento': args.aquecimento,
+        'duracao_s': duracao,
+        'duracao_fria_s': duracao_fria,
+        'duracao_quente_s': duracao_quente,
+        'vazao_inicial_por_s': len(iniciais) / duracao_fria,
+        'vazao_reruns_por_s': len(reruns) / duracao_quente if duracao_quente > 0 else None,
+        'rss_apos_carga_mb': rss_antes,
+        'pico_rss_mb': pico_rss_mb(),
+        'geral': percentis([m[2] for m in reruns]) if reruns else None,
+        'por_pagina': {pagina: percentis([m[2] for m in reruns if m[0] == pagina]) for pagina in args.paginas if any(m[0] == pagina for m in reruns)},
+        'por_acao': {acao: percentis([m[2] for m in reruns if m[1] == acao]) for acao in sorted({m[1] for m in reruns})},
+        'erros': erros,
+    }
+
+    print(f"{args.sessoes} sessões x {args.reruns} reruns em {duracao:.1f} s, pico de RSS {relatorio['pico_rss_mb']:.0f} MB")
+    print(f"  fria:   {len(iniciais)} execuções iniciais em {duracao_fria:.1f} s, {relatorio['vazao_inicial_por_s']:.1f} execuções/s")
+    if relatorio['vazao_reruns_por_s'] is not None:
+        print(f"  quente: {len(reruns)} reruns em {duracao_quente:.1f} s, {relatorio['vazao_reruns_por_s']:.1f} reruns/s")
+    if relatorio['geral']:
+        p = relatorio['geral']
+        print(f"  {'geral':<11} {p['reruns']:>5} reruns  p50 {p['p50_ms']:>8.1f} ms  p95 {p['p95_ms']:>8.1f} ms  p99 {p['p99_ms']:>8.1f} ms")
+    for grupo in ['por_pagina', 'por_acao']:
+        for nome, p in relatorio[grupo].items():
+            print(f"  {nome:<11} {p['reruns']:>5} reruns  p50 {p['p50_ms']:>8.1f} ms  p95 {p['p95_ms']:>8.1f} ms  p99 {p['p99_ms']:>8.1f} ms")
+    for erro in erros:
+        print(f"  erro: {erro}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, 'w') as f:
+        json.dump(relatorio, f, indent=1)
+    print(f"resultados em {args.saida}")
+
+if __name__ == '__main__':
+    main()
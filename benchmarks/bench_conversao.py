@@ -0,0 +1,62 @@
+# Benchmark: conversão de moeda e nome do país, por linha (df.apply) x colunar.
+#
+# Uso: python benchmarks/bench_conversao.py [--repeticoes 5] [--escalas 1 10 100]
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, paises_nome, rename_columns, valor_unificado
+from fome_zero.transformacoes import paises_nome_colunar, valor_unificado_colunar
+
+# acima deste tamanho o caminho por linha demora demais; só o colunar é medido
+LIMITE_POR_LINHA = 1_000_000
+
+def por_linha(df, taxas_cambio):
+    valores = df.apply(lambda row: valor_unificado(row, taxas_cambio) , axis=1 )
+    paises = df.apply(lambda row: paises_nome(row) , axis=1 )
+    return valores, paises
+
+def colunar(df, taxas_cambio):
+    return valor_unificado_colunar(df, taxas_cambio), paises_nome_colunar(df)
+
+def medir(funcao, repeticoes, *args):
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Conversão por linha x colunar')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    taxas_cambio = carregar_dados_de_json()
+    base = rename_columns(pd.read_csv(CAMINHO_CSV))[['country_code', 'average_cost_for_two']]
+
+    print(f"{'linhas':>10} {'por linha (s)':>14} {'colunar (s)':>12} {'ganho':>8}")
+    for escala in args.escalas:
+        df = pd.concat([base] * escala, ignore_index=True)
+        t_colunar, (valores, paises) = medir(colunar, args.repeticoes, df, taxas_cambio)
+
+        if len(df) <= LIMITE_POR_LINHA:
+            t_linha, (valores_linha, paises_linha) = medir(por_linha, 1 if escala > 1 else args.repeticoes, df, taxas_cambio)
+            # os dois caminhos precisam produzir exatamente os mesmos valores
+            assert valores.equals(valores_linha.rename('valor_unificado'))
+            assert paises.equals(paises_linha.rename('country'))
+            print(f"{len(df):>10} {t_linha:>14.4f} {t_colunar:>12.4f} {t_linha / t_colunar:>7.0f}x")
+        else:
+            print(f"{len(df):>10} {'-':>14} {t_colunar:>12.4f} {'-':>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Consultas de proximidade (k mais próximos e raio) com o índice espacial, comparadas
+# com a varredura linear (haversine em todas as linhas), em datasets sintéticos de
+# tamanhos crescentes. Os pontos de partida ficam perto de restaurantes sorteados (como
+# o centro de uma cidade escolhida na página) e cada consulta do índice é conferida com
+# a varredura. Os resultados vão para um JSON para comparar execuções.
+#
+# Uso: python benchmarks/bench_espacial.py [--linhas 100000 1000000 3000000] [--consultas 200] [--saida arquivo.json]
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from fome_zero.dados import CAMINHO_CSV
+from fome_zero.espacial import construir_indice_espacial, dentro_do_raio, mais_proximos, varredura_linear
+from fome_zero.gerador import construir_modelo, gerar_dataframe
+from fome_zero.limpeza import nome_da_coluna, primeiro_item
+
+# (nome, tipo, tamanho): k para os mais próximos, km para o raio
+CONSULTAS = [
+    ('k10', 'k', 10),
+    ('k100', 'k', 100),
+    ('raio_1km', 'raio', 1),
+    ('raio_5km', 'raio', 5),
+    ('raio_25km', 'raio', 25),
+]
+
+# a varredura linear é cara: só algumas consultas dela são medidas
+CONSULTAS_LINEARES = 10
+
+def filtros_de_teste(df):
+
+    italianas = np.flatnonzero(primeiro_item(df, 'cuisines').to_numpy() == 'Italian')
+    return {
+        'sem_filtro': {},
+        'preco_e_nota': {'precos': [1, 2], 'nota_minima': 4.0},
+        'culinaria': {'linhas': italianas},
+    }
+
+def consultar(indice, df, tipo, tamanho, latitude, longitude, filtros, linear=False):
+    if linear:
+        return varredura_linear(df, latitude, longitude, **({'k': tamanho} if tipo == 'k' else {'raio_km': tamanho}), **filtros)
+    if tipo == 'k':
+        return mais_proximos(indice, latitude, longitude, tamanho, **filtros)
+    return dentro_do_raio(indice, latitude, longitude, tamanho, **filtros)
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Benchmark das consultas de proximidade com e sem o índice espacial')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument('--consultas', type=int, default=200, help='pontos de partida por tamanho de dataset')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados', f"espacial_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    modelo = construir_modelo(CAMINHO_CSV)
+    relatorio = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'maquina': platform.platform(),
+        'consultas': args.consultas,
+        'resultados': [],
+        'diferencas': 0,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+
+    for linhas in args.linhas:
+        bruto = gerar_dataframe(modelo, linhas, args.semente)
+        df = bruto.set_axis([nome_da_coluna(coluna) for coluna in bruto.columns], axis=1)
+
+        inicio = time.perf_counter()
+        indice = construir_indice_espacial(df)
+        construcao = time.perf_counter() - inicio
+        print(f"{linhas:>10} linhas  índice construído em {construcao * 1000:.0f} ms")
+        relatorio['resultados'].append({'linhas': linhas, 'etapa': 'construir_indice_espacial', 'segundos': construcao})
+
+        rng = np.random.default_rng(args.semente)
+        origens = rng.integers(len(df), size=args.consultas)
+        # ~1 km em torno de um restaurante
+        pontos = np.column_stack([df['latitude'].to_numpy()[origens], df['longitude'].to_numpy()[origens]]) + rng.normal(0, 0.01, (args.consultas, 2))
+
+        for nome_filtro, filtros in filtros_de_teste(df).items():
+            for nome, tipo, tamanho in CONSULTAS:
+                tempos, encontrados = [], []
+                for latitude, longitude in pontos:
+                    inicio = time.perf_counter()
+                    resultado = consultar(indice, df, tipo, tamanho, latitude, longitude, filtros)
+                    tempos.append(time.perf_counter() - inicio)
+                    encontrados.append(resultado)
+
+                tempos_lineares = []
+                for (latitude, longitude), resultado in list(zip(pontos, encontrados))[:CONSULTAS_LINEARES]:
+                    inicio = time.perf_counter()
+                    esperado = consultar(indice, df, tipo, tamanho, latitude, longitude, filtros, linear=True)
+                    tempos_lineares.append(time.perf_counter() - inicio)
+                    if not np.array_equal(resultado[0], esperado[0]):
+                        relatorio['diferencas'] += 1
+
+                registro = {
+                    'linhas': linhas,
+                    'etapa': nome,
+                    'filtro': nome_filtro,
+                    'mediana_ms': float(np.median(tempos)) * 1000,
+                    'p95_ms': float(np.percentile(tempos, 95)) * 1000,
+                    'linear_mediana_ms': float(np.median(tempos_lineares)) * 1000,
+                    'resultados_medio': float(np.mean([len(r[0]) for r in encontrados])),
+                }
+                relatorio['resultados'].append(registro)
+                print(f"{linhas:>10} linhas  {nome:<10} {nome_filtro:<13} índice {registro['mediana_ms']:>8.3f} ms (p95 {registro['p95_ms']:>8.3f})"
+                      f"  linear {registro['linear_mediana_ms']:>9.1f} ms  {registro['resultados_medio']:>9.1f} restaurantes")
+
+        # grava a cada tamanho, para não perder os resultados se um maior estourar a memória
+        with open(args.saida, 'w') as f:
+            json.dump(relatorio, f, indent=1)
+
+    print(f"{relatorio['diferencas']} consultas do índice diferentes da varredura linear")
+    print(f"resultados em {args.saida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# Benchmark das etapas do ETL e dos cálculos de cada página, no dataset real e em
+# versões ampliadas dele. Os resultados vão para um JSON para comparar execuções.
+#
+# Uso: python benchmarks/bench_etapas.py [--escalas 1 10 100 1000] [--repeticoes 3] [--dados copias|sintetico] [--saida arquivo.json]
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from fome_zero import culinarias as cl
+from fome_zero import cubo as cb
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json
+from fome_zero.exportacao import escrever_csv
+from fome_zero.gerador import construir_modelo, gerar_dataframe
+from fome_zero.indices import construir_indice_de_filtros, construir_melhores_por_culinaria, filtrar, melhores_das_culinarias
+from fome_zero.limpeza import etapas_de_limpeza, limpar
+from fome_zero.mapa import construir_mapa
+from fome_zero.tipos import compactar_tipos
+
+PAISES_PADRAO = ['Brazil','England','South Africa', 'Canada','Qatar','Australia']
+CULINARIAS_PADRAO = ['Brazilian','Italian','Japanese', 'Arabian']
+
+# o HTML do mapa cresce com o número de pontos; acima disso a etapa é pulada
+LIMITE_MAPA = 1_000_000
+
+# ESCALONAMENTO:
+# Cada cópia do dataset recebe restaurant_ids novos e coordenadas levemente deslocadas,
+# então as distribuições de país, cidade, culinária, nota e votos são as reais e a taxa
+# de linhas duplicadas continua a mesma do zomato.csv.
+
+def escalar(bruto, fator, semente=0):
+
+    if fator == 1:
+        return bruto
+    rng = np.random.default_rng(semente)
+    copias = np.repeat(np.arange(fator), len(bruto))
+    df = pd.concat([bruto] * fator, ignore_index=True)
+    df['Restaurant ID'] = df['Restaurant ID'].to_numpy() + copias * 100_000_000
+    # o mesmo deslocamento para as duplicatas de uma cópia, para que continuem iguais
+    deslocamento = rng.normal(0, 0.01, size=(fator, 2))
+    deslocamento[0] = 0
+    df['Latitude'] = df['Latitude'].to_numpy() + deslocamento[copias, 0]
+    df['Longitude'] = df['Longitude'].to_numpy() + deslocamento[copias, 1]
+    return df
+
+# MEDIÇÃO:
+
+def medir(funcao, repeticoes):
+
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, tempos
+
+def etapas_etl(bruto, taxas_cambio, registrar, anotar):
+
+    # a limpeza de tratar_dados (limpeza.py) inteira e, no grupo limpeza, cada uma das
+    # suas etapas, com os tempos que limpar() registra em cada repetição
+    relatorios = []
+    def executar():
+        df, relatorio = limpar(bruto, etapas_de_limpeza(taxas_cambio))
+        relatorios.append(relatorio)
+        return df
+    df = registrar('etl', 'limpar', executar)
+    for i, etapa in enumerate(relatorios[0]):
+        anotar('limpeza', etapa['etapa'], [relatorio[i]['ms'] / 1000 for relatorio in relatorios])
+    return registrar('etl', 'compactar_tipos', lambda: compactar_tipos(df))
+
+def etapas_paginas(df, registrar):
+
+    cubo = registrar('estruturas', 'construir_cubo', lambda: cb.construir_cubo(df))
+    indice = registrar('estruturas', 'construir_indice_de_filtros', lambda: construir_indice_de_filtros(df))
+    melhores = registrar('estruturas', 'construir_melhores_por_culinaria', lambda: construir_melhores_por_culinaria(df))
+    culinarias = registrar('estruturas', 'construir_indice_de_culinarias', lambda: cl.construir_indice_de_culinarias(df))
+    melhores_todas = registrar('estruturas', 'melhores_de_todas_as_culinarias', lambda: cl.melhores_por_culinaria(df, culinarias))
+
+    filtrado = registrar('main', 'filtro_paises', lambda: filtrar(df, indice, country=PAISES_PADRAO))
+    registrar('main', 'metricas', lambda: (len(filtrado), filtrado['country_code'].nunique(), filtrado['city'].nunique(),
+                                            filtrado['votes'].sum(), filtrado['cuisines'].nunique()))
+    if len(filtrado) <= LIMITE_MAPA:
+        registrar('main', 'html_do_mapa', lambda: construir_mapa(filtrado).get_root().render())
+    registrar('main', 'exportacao_csv', lambda: escrever_csv(filtrado, io.StringIO()))
+
+    for nome in ['restaurantes_por_pais', 'cidades_por_pais', 'media_votos_por_pais', 'media_preco_por_pais']:
+        registrar('countries', nome, lambda: getattr(cb, nome)(cubo, PAISES_PADRAO))
+
+    for nome in ['cidades_com_mais_restaurantes', 'cidades_com_nota_acima_de_4', 'cidades_com_nota_abaixo_de_2_5']:
+        registrar('cities', nome, lambda: getattr(cb, nome)(cubo, PAISES_PADRAO).head(10))
+
+    # o padrão das páginas conta todas as culinárias de cada restaurante (índice de
+    # culinárias); a chave "Somente a culinária principal" usa o cubo, no grupo *_principal
+    registrar('cities', 'cidades_com_mais_culinarias', lambda: cl.cidades_com_mais_culinarias(culinarias, PAISES_PADRAO).head(10))
+    registrar('cities_principal', 'cidades_com_mais_culinarias', lambda: cb.cidades_com_mais_culinarias(cubo, PAISES_PADRAO).head(10))
+
+    registrar('cuisines', 'melhores_das_culinarias', lambda: melhores_das_culinarias(melhores_todas, CULINARIAS_PADRAO))
+    selecionados = registrar('cuisines', 'filtro_paises_culinarias',
+                             lambda: cl.filtrar_por_culinarias(df, indice, culinarias, CULINARIAS_PADRAO, country=PAISES_PADRAO))
+    registrar('cuisines', 'tabela_melhores', lambda: selecionados.sort_values(by=['aggregate_rating', 'restaurant_id'], ascending=[False, True]).head(10))
+    registrar('cuisines', 'melhores_notas', lambda: cl.media_nota_por_culinaria(culinarias).head(10))
+    registrar('cuisines', 'piores_notas', lambda: cl.media_nota_por_culinaria(culinarias, excluir=['Drinks Only', 'Mineira'], ascending=True).head(10))
+
+    registrar('cuisines_principal', 'melhores_das_culinarias', lambda: melhores_das_culinarias(melhores, CULINARIAS_PADRAO))
+    selecionados = registrar('cuisines_principal', 'filtro_paises_culinarias', lambda: filtrar(df, indice, country=PAISES_PADRAO, cuisines=CULINARIAS_PADRAO))
+    registrar('cuisines_principal', 'tabela_melhores', lambda: selecionados.sort_values(by=['aggregate_rating', 'restaurant_id'], ascending=[False, True]).head(10))
+    registrar('cuisines_principal', 'melhores_notas', lambda: cb.media_nota_por_culinaria(cubo).head(10))
+    registrar('cuisines_principal', 'piores_notas', lambda: cb.media_nota_por_culinaria(cubo, excluir=['Drinks Only', 'Mineira'], ascending=True).head(10))
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Benchmark das etapas do ETL e das páginas')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--dados', choices=['copias', 'sintetico'], default='copias',
+                        help='copias: o dataset real repetido; sintetico: linhas novas do fome_zero.gerador')
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados', f"etapas_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    taxas_cambio = carregar_dados_de_json()
+    original = pd.read_csv(CAMINHO_CSV)
+    modelo = construir_modelo(CAMINHO_CSV) if args.dados == 'sintetico' else None
+    relatorio = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'maquina': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'dados': args.dados,
+        'resultados': [],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+
+    for escala in args.escalas:
+        if escala == 1 or modelo is None:
+            bruto = escalar(original, escala)
+        else:
+            bruto = gerar_dataframe(modelo, escala * len(original))
+
+        def anotar(grupo, etapa, tempos):
+            relatorio['resultados'].append({'escala': escala, 'linhas': len(bruto), 'grupo': grupo, 'etapa': etapa,
+                                            'segundos': min(tempos), 'tempos': tempos})
+            print(f"{escala:>5}x {len(bruto):>10} {grupo:<18} {etapa:<35} {min(tempos) * 1000:>10.2f} ms")
+
+        def registrar(grupo, etapa, funcao):
+            resultado, tempos = medir(funcao, args.repeticoes)
+            anotar(grupo, etapa, tempos)
+            return resultado
+
+        # a leitura do CSV também é medida: as escalas maiores vão para um arquivo temporário
+        if escala == 1:
+            registrar('etl', 'read_csv', lambda: pd.read_csv(CAMINHO_CSV))
+        else:
+            with tempfile.TemporaryDirectory() as pasta:
+                caminho = os.path.join(pasta, 'zomato.csv')
+                bruto.to_csv(caminho, index=False)
+                registrar('etl', 'read_csv', lambda: pd.read_csv(caminho))
+
+        df = etapas_etl(bruto, taxas_cambio, registrar, anotar)
+        etapas_paginas(df, registrar)
+
+        # tempo somado por grupo, para ver em que escala cada página deixa de ser interativa
+        # (as etapas do grupo limpeza já estão no limpar do etl)
+        for grupo in ['etl', 'estruturas', 'main', 'countries', 'cities', 'cities_principal', 'cuisines', 'cuisines_principal']:
+            total = sum(r['segundos'] for r in relatorio['resultados'] if r['escala'] == escala and r['grupo'] == grupo)
+            print(f"{escala:>5}x {'total':>10} {grupo:<18} {'':<35} {total * 1000:>10.2f} ms")
+
+        # grava a cada escala, para não perder os resultados se uma escala maior estourar a memória
+        with open(args.saida, 'w') as f:
+            json.dump(relatorio, f, indent=1)
+
+    print(f"resultados em {args.saida}")
+
+if __name__ == '__main__':
+    main()
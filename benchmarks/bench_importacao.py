@@ -0,0 +1,175 @@
+# Tempo de importação e da primeira execução de cada página, em um processo novo por
+# página (cold start). Cada página roda uma vez pela API de testes do streamlit sob
+# python -X importtime; os imports feitos depois do próprio streamlit (os da página e os
+# que ela faz sob demanda durante a execução) são somados e agrupados por pacote, no
+# mesmo formato do -X importtime. O relatório confere um orçamento por página e os pacotes
+# que a página não deve carregar (ex.: o folium fora da página do mapa); com algum estouro
+# o script sai com código 1.
+#
+# Uso: python benchmarks/bench_importacao.py [--paginas main countries ...] [--repeticoes 3] [--saida arquivo.json]
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGINAS = {
+    'main': '📊_Main_Page.py',
+    'countries': os.path.join('pages', '1_🌍_Countries.py'),
+    'cities': os.path.join('pages', '2_🏙️_Cities.py'),
+    'cuisines': os.path.join('pages', '3_🍽_Cuisines.py'),
+    'nearby': os.path.join('pages', '4_📍_Nearby.py'),
+}
+
+# ORÇAMENTO POR PÁGINA (ms, com o snapshot do dataset já em disco e o cache de figuras frio):
+# importacao_ms: imports depois do streamlit; primeira_execucao_ms: a primeira execução
+# inteira da página (imports + leitura do snapshot + agregações + figuras/mapa)
+ORCAMENTO = {
+    'main': {'importacao_ms': 1200, 'primeira_execucao_ms': 2000},
+    'countries': {'importacao_ms': 1200, 'primeira_execucao_ms': 2000},
+    'cities': {'importacao_ms': 1200, 'primeira_execucao_ms': 2000},
+    'cuisines': {'importacao_ms': 1200, 'primeira_execucao_ms': 2000},
+    'nearby': {'importacao_ms': 1200, 'primeira_execucao_ms': 2000},
+}
+
+# pacotes que a página nunca deve importar (o plotly.express entra nas páginas de gráficos
+# só quando uma figura não está no cache; a medição é feita com o cache frio)
+PROIBIDOS = {
+    'main': ['plotly.express'],
+    'countries': ['folium', 'branca', 'babel'],
+    'cities': ['folium', 'branca', 'babel'],
+    'cuisines': ['folium', 'branca', 'babel'],
+    'nearby': ['plotly.express', 'folium', 'branca', 'babel'],
+}
+
+# separa, na saída do -X importtime, os imports do streamlit dos imports da página
+MARCA = '--- página ---'
+
+# PROCESSO FILHO:
+
+def executar_pagina(pagina):
+
+    # roda em um processo novo com -X importtime; o streamlit entra antes da marca
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(RAIZ)
+    sys.path.insert(0, RAIZ)
+    # o aquecimento abriria um pool de processos no meio da medição
+    os.environ['FOME_ZERO_AQUECIMENTO'] = '0'
+    print(MARCA, file=sys.stderr, flush=True)
+
+    inicio = time.perf_counter()
+    at = AppTest.from_file(PAGINAS[pagina], default_timeout=120)
+    at.run()
+    tempo = time.perf_counter() - inicio
+    print(json.dumps({'primeira_execucao_s': tempo, 'erros': [str(getattr(e, 'message', e)) for e in at.exception]}))
+
+# RELATÓRIO:
+
+def ler_importtime(saida):
+
+    # linhas "import time: self [us] | cumulative | nome"; o tempo próprio (self) de cada
+    # módulo somado dá o total sem contar duas vezes os imports aninhados. Só interessam
+    # as linhas que vêm depois da marca
+    linhas = saida.split(MARCA, 1)[1].splitlines()
+    modulos = []
+    for linha in linhas:
+        if not linha.startswith('import time:'):
+            continue
+        proprio, _, nome = linha[len('import time:'):].split('|')
+        if not proprio.strip().isdigit():
+            continue
+        modulos.append((nome.strip(), int(proprio)))
+    return modulos
+
+def medir_pagina(pagina):
+
+    processo = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--filho', pagina],
+                              cwd=RAIZ, capture_output=True, text=True)
+    if MARCA not in processo.stderr:
+        raise RuntimeError(f"{pagina}: o processo filho falhou\n{processo.stderr[-2000:]}")
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    modulos = ler_importtime(processo.stderr)
+
+    por_pacote = collections.Counter()
+    for nome, proprio in modulos:
+        por_pacote[nome.split('.')[0]] += proprio
+    nomes = {nome for nome, _ in modulos}
+    return {
+        'importacao_ms': sum(proprio for _, proprio in modulos) / 1000,
+        'primeira_execucao_ms': resultado['primeira_execucao_s'] * 1000,
+        'modulos': len(modulos),
+        'por_pacote_ms': {pacote: us / 1000 for pacote, us in por_pacote.most_common()},
+        'proibidos_carregados': [p for p in PROIBIDOS.get(pagina, []) if any(n == p or n.startswith(p + '.') for n in nomes)],
+        'erros': resultado['erros'],
+    }
+
+def estouros(pagina, medicao):
+
+    problemas = []
+    for medida, limite in ORCAMENTO.get(pagina, {}).items():
+        if medicao[medida] > limite:
+            problemas.append(f"{pagina}: {medida} {medicao[medida]:.0f} ms > orçamento de {limite} ms")
+    for pacote in medicao['proibidos_carregados']:
+        problemas.append(f"{pagina}: importou {pacote}")
+    for erro in medicao['erros']:
+        problemas.append(f"{pagina}: erro na execução: {erro}")
+    return problemas
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Tempo de importação e da primeira execução de cada página, com orçamento')
+    parser.add_argument('--paginas', nargs='+', choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument('--repeticoes', type=int, default=3, help='processos novos por página; vale a execução mais rápida')
+    parser.add_argument('--pacotes', type=int, default=8, help='pacotes mais lentos exibidos por página')
+    parser.add_argument('--filho', choices=list(PAGINAS), help=argparse.SUPPRESS)
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados', f"importacao_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    if args.filho:
+        executar_pagina(args.filho)
+        return
+
+    relatorio = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'maquina': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'orcamento': ORCAMENTO,
+        'paginas': {},
+        'estouros': [],
+    }
+    for pagina in args.paginas:
+        medicao = min((medir_pagina(pagina) for _ in range(args.repeticoes)), key=lambda m: m['primeira_execucao_ms'])
+        relatorio['paginas'][pagina] = medicao
+        relatorio['estouros'] += estouros(pagina, medicao)
+
+        pacotes = ', '.join(f"{pacote} {ms:.0f}" for pacote, ms in list(medicao['por_pacote_ms'].items())[:args.pacotes])
+        print(f"{pagina:<10} importação {medicao['importacao_ms']:>7.0f} ms ({medicao['modulos']} módulos)  primeira execução {medicao['primeira_execucao_ms']:>7.0f} ms")
+        print(f"{'':<10} {pacotes}")
+
+    for problema in relatorio['estouros']:
+        print(f"  estouro: {problema}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, 'w') as f:
+        json.dump(relatorio, f, indent=1)
+    print(f"resultados em {args.saida}")
+    sys.exit(1 if relatorio['estouros'] else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# Tamanho e tempo do mapa da Main Page com o dataset crescendo: o mapa completo (HTML
+# com todos os restaurantes selecionados) contra o mapa interativo, que só envia a camada
+# da área visível (índice de ladrilhos, fome_zero/ladrilhos.py). Para o interativo são
+# medidas algumas áreas típicas, do mundo inteiro a uma rua; a camada deve ficar do mesmo
+# tamanho em qualquer escala. O mesmo vale para o mapa de densidade (células coloridas
+# pela nota média). Os resultados vão para um JSON para comparar execuções.
+#
+# Uso: python benchmarks/bench_mapa.py [--linhas 10000 100000 1000000 3000000] [--repeticoes 5] [--saida arquivo.json]
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, tratar_dados
+from fome_zero.espacial import construir_indice_espacial
+from fome_zero.gerador import construir_modelo, gerar_dataframe
+from fome_zero.indices import construir_indice_de_filtros, filtrar
+from fome_zero.ladrilhos import construir_indice_de_ladrilhos, consultar_area, densidade_na_area
+from fome_zero.mapa import camada_da_area, camada_de_densidade, construir_mapa
+from fome_zero.paises import PAISES_PADRAO
+from fome_zero.tipos import compactar_tipos
+
+# (nome, (sul, oeste, norte, leste), zoom) de um mapa de 700 x 500 px
+AREAS = [
+    ('mundo', (-85, -246, 85, 246), 2),
+    ('brasil', (-34, -75, 6, -33), 4),
+    ('sao_paulo', (-23.75, -46.85, -23.45, -46.35), 10),
+    ('bairro', (-23.57, -46.67, -23.54, -46.63), 14),
+    ('rua', (-23.562, -46.660, -23.558, -46.655), 17),
+]
+
+# o HTML do mapa completo cresce com o número de pontos; acima disso ele não é medido
+LIMITE_MAPA_COMPLETO = 1_000_000
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, min(tempos)
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Tamanho e tempo do mapa completo e do mapa interativo por escala')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 3_000_000])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'resultados', f"mapa_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"))
+    args = parser.parse_args()
+
+    import folium
+
+    modelo = construir_modelo(CAMINHO_CSV)
+    taxas_cambio = carregar_dados_de_json()
+    relatorio = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'maquina': platform.platform(),
+        'repeticoes': args.repeticoes,
+        'resultados': [],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+
+    for linhas in args.linhas:
+        df = compactar_tipos(tratar_dados(gerar_dataframe(modelo, linhas), taxas_cambio)).reset_index(drop=True)
+        indice = construir_indice_de_filtros(df)
+
+        espacial, tempo_espacial = medir(lambda: construir_indice_espacial(df), 1)
+        ladrilhos, tempo_ladrilhos = medir(lambda: construir_indice_de_ladrilhos(df), 1)
+        print(f"{len(df):>10} restaurantes  índice espacial {tempo_espacial * 1000:.0f} ms, ladrilhos {tempo_ladrilhos * 1000:.0f} ms")
+        relatorio['resultados'].append({'linhas': len(df), 'mapa': 'indices', 'espacial_s': tempo_espacial, 'ladrilhos_s': tempo_ladrilhos})
+
+        selecionados = filtrar(df, indice, country=PAISES_PADRAO)
+        if len(selecionados) <= LIMITE_MAPA_COMPLETO:
+            html, tempo = medir(lambda: folium.Figure().add_child(construir_mapa(selecionados)).render(), 1)
+            relatorio['resultados'].append({'linhas': len(df), 'mapa': 'completo', 'pontos': len(selecionados), 'bytes': len(html.encode()), 'segundos': tempo})
+            print(f"{len(df):>10} restaurantes  {'completo':<10} {len(selecionados):>9} pontos  {len(html.encode()) / 1024:>9.0f} KB  {tempo * 1000:>9.1f} ms")
+
+        for nome, (sul, oeste, norte, leste), zoom in AREAS:
+            def camada():
+                resultado = consultar_area(ladrilhos, espacial, indice, PAISES_PADRAO, sul, oeste, norte, leste, zoom)
+                return resultado, camada_da_area(resultado, df, oeste)[1]
+            (resultado, dados), tempo = medir(camada, args.repeticoes)
+            tamanho = len(json.dumps(dados).encode())
+            relatorio['resultados'].append({'linhas': len(df), 'mapa': nome, 'zoom': zoom, 'tipo': resultado['tipo'],
+                                            'pontos': len(dados['features']), 'bytes': tamanho, 'segundos': tempo})
+            print(f"{len(df):>10} restaurantes  {nome:<10} {len(dados['features']):>9} {resultado['tipo']:<10}  {tamanho / 1024:>9.1f} KB  {tempo * 1000:>9.1f} ms")
+
+            def densidade():
+                return camada_de_densidade(densidade_na_area(ladrilhos, PAISES_PADRAO, sul, oeste, norte, leste, zoom, 'nota'), 'nota', oeste)[1]
+            dados, tempo = medir(densidade, args.repeticoes)
+            tamanho = len(json.dumps(dados).encode())
+            relatorio['resultados'].append({'linhas': len(df), 'mapa': f'{nome}_densidade', 'zoom': zoom, 'tipo': 'células',
+                                            'pontos': len(dados['features']), 'bytes': tamanho, 'segundos': tempo})
+            print(f"{len(df):>10} restaurantes  {nome:<10} {len(dados['features']):>9} {'células':<10}  {tamanho / 1024:>9.1f} KB  {tempo * 1000:>9.1f} ms")
+
+        # grava a cada escala, para não perder os resultados se uma maior estourar a memória
+        with open(args.saida, 'w') as f:
+            json.dump(relatorio, f, indent=1)
+
+    print(f"resultados em {args.saida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# Pacote compartilhado pelas páginas do dashboard Fome Zero!
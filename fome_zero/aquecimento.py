@@ -0,0 +1,119 @@
+import argparse
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from streamlit import runtime
+
+from fome_zero.cambio import MOEDAS_EXIBICAO, caminho_taxas_ativas, fator_do_dolar
+from fome_zero.consultas import backend_configurado, preparar_fonte
+from fome_zero.cubo import construir_cubo
+from fome_zero.culinarias import construir_indice_de_culinarias
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, construir_snapshot, impressao_digital
+from fome_zero.figuras import chave_figura, construir_figura, publicar_figura
+from fome_zero.paises import PAISES_PADRAO
+
+logger = logging.getLogger(__name__)
+
+# AQUECIMENTO DOS GRÁFICOS:
+# Os gráficos são independentes entre si, então cada um (consulta dos dados + figura do
+# plotly + JSON) é montado em um processo de um pool, para a seleção padrão de países e
+# para "todos os países", e publicado no cache de figuras. Quem abre uma página depois
+# disso já encontra os gráficos prontos. O melhor restaurante de cada culinária e os
+# demais agregados já são calculados junto com o estado (estado.py).
+#
+# O estado dispara o aquecimento em segundo plano sempre que publica uma versão nova do
+# dataset, só dentro do servidor do streamlit (scripts que usam o estado não abrem o
+# pool); FOME_ZERO_AQUECIMENTO=0 desliga.
+
+VARIAVEL_AMBIENTE = "FOME_ZERO_AQUECIMENTO"
+# valores do slider "quantidade de restaurantes" da página Culinárias
+QUANTIDADES = range(0, 21)
+
+_aquecidas = set()
+_trava = threading.Lock()
+
+def tarefas_de_aquecimento(todos, taxas):
+
+    # todos: lista ordenada dos países do dataset (a opção "todos os países" do filtro)
+    tarefas = []
+    for paises in [PAISES_PADRAO, todos]:
+        for grafico in ['restaurantes_por_pais', 'cidades_por_pais', 'media_votos_por_pais', 'cidades_com_mais_restaurantes',
+                        'cidades_com_nota_acima_de_4', 'cidades_com_nota_abaixo_de_2_5']:
+            tarefas.append((grafico, {'paises': paises}))
+        # gráficos de culinária: com todas as culinárias e só com a principal
+        for todas in (True, False):
+            tarefas.append(('cidades_com_mais_culinarias', {'paises': paises, 'todas': todas}))
+        for moeda in MOEDAS_EXIBICAO:
+            tarefas.append(('media_preco_por_pais', {'paises': paises, 'moeda': moeda, 'fator': fator_do_dolar(taxas, moeda)}))
+    for quantidade in QUANTIDADES:
+        for todas in (True, False):
+            tarefas.append(('melhores_culinarias', {'quantidade': quantidade, 'todas': todas}))
+            tarefas.append(('piores_culinarias', {'quantidade': quantidade, 'todas': todas}))
+    return tarefas
+
+# a fonte dos dados (o cubo ou o caminho do banco) vai uma vez para cada processo, no
+# inicializador, e não a cada tarefa
+_FONTE = None
+
+def _iniciar_processo(fonte):
+    global _FONTE
+    _FONTE = fonte
+
+def _construir_no_processo(grafico, parametros):
+    return construir_figura(grafico, _FONTE, parametros)
+
+def aquecer(fonte, todos, versao, taxas, processos=None):
+
+    inicio = time.perf_counter()
+    tarefas = tarefas_de_aquecimento(todos, taxas)
+    # spawn: o servidor do streamlit tem várias threads, e fork copiaria travas ocupadas
+    contexto = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(processos, mp_context=contexto, initializer=_iniciar_processo, initargs=(fonte,)) as executor:
+        futuros = {executor.submit(_construir_no_processo, grafico, parametros): (grafico, parametros) for grafico, parametros in tarefas}
+        for futuro in concurrent.futures.as_completed(futuros):
+            grafico, parametros = futuros[futuro]
+            publicar_figura(chave_figura(grafico, versao, parametros), futuro.result())
+
+    tempo = time.perf_counter() - inicio
+    logger.info(f"aquecimento: {len(tarefas)} gráficos da versão {versao[:8]} em {tempo:.1f} s")
+    return len(tarefas), tempo
+
+def _aquecer_sem_falhar(fonte, todos, versao, taxas):
+    try:
+        aquecer(fonte, todos, versao, taxas)
+    except Exception:
+        # sem aquecimento as páginas só montam os gráficos na primeira visita
+        logger.exception("falha no aquecimento dos gráficos")
+
+def aquecer_em_segundo_plano(fonte, todos, versao, taxas):
+
+    if os.environ.get(VARIAVEL_AMBIENTE) == "0" or not runtime.exists():
+        return None
+    with _trava:
+        if versao in _aquecidas:
+            return None
+        _aquecidas.add(versao)
+    thread = threading.Thread(target=_aquecer_sem_falhar, args=(fonte, todos, versao, taxas), name="aquecimento", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+
+    # python -m fome_zero.aquecimento: mede o aquecimento sem subir o servidor
+    parser = argparse.ArgumentParser(description='Monta em paralelo todos os gráficos aquecidos na subida do servidor')
+    parser.add_argument('--processos', type=int, default=None)
+    args = parser.parse_args()
+
+    caminho_taxas = caminho_taxas_ativas()
+    df = construir_snapshot(caminho_taxas=caminho_taxas)
+    versao = impressao_digital(CAMINHO_CSV, caminho_taxas)
+    fonte = preparar_fonte(backend_configurado(), df, construir_cubo(df), versao, construir_indice_de_culinarias(df))
+    quantidade, tempo = aquecer(fonte, sorted(df['country'].unique()), versao, carregar_dados_de_json(caminho_taxas), args.processos)
+    print(f"{quantidade} gráficos em {tempo:.1f} s")
+
+if __name__ == '__main__':
+    main()
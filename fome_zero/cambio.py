@@ -0,0 +1,122 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import re
+import threading
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.dados import CAMINHO_TAXAS, RAIZ
+from fome_zero.paises import MOEDAS
+from fome_zero.transformacoes import tabela_por_codigo
+
+# TAXAS DE CÂMBIO:
+# Cotações em relação ao dólar (1 USD = x moeda). As versões ficam guardadas com a data
+# em taxas/AAAA-MM-DD.json e a mais recente é a ativa; sem nenhuma versão datada vale o
+# taxas_moedas.json da raiz. O valor_unificado continua em dólar e a moeda escolhida na
+# barra lateral só reescala os valores exibidos.
+
+PASTA_TAXAS = os.path.join(RAIZ, "taxas")
+
+MOEDAS_EXIBICAO = ['USD', 'BRL', 'EUR', 'GBP', 'INR', 'AUD', 'CAD', 'ZAR', 'AED']
+
+SIMBOLOS = {
+ 'USD': '$',
+ 'BRL': 'R$',
+ 'EUR': '€',
+ 'GBP': '£',
+ 'INR': '₹',
+ }
+
+def simbolo(moeda):
+    return SIMBOLOS.get(moeda, moeda)
+
+def listar_versoes(pasta=PASTA_TAXAS):
+    # [(data, caminho)] em ordem cronológica
+    arquivos = glob.glob(os.path.join(pasta, "*.json"))
+    datas = [os.path.basename(a)[:-len(".json")] for a in arquivos]
+    return sorted((d, a) for d, a in zip(datas, arquivos) if re.fullmatch(r"\d{4}-\d{2}-\d{2}", d))
+
+def caminho_taxas_ativas(pasta=PASTA_TAXAS):
+    versoes = listar_versoes(pasta)
+    return versoes[-1][1] if versoes else CAMINHO_TAXAS
+
+def validar_taxas(taxas):
+
+    # aceita também o formato das APIs de câmbio: {"base": "USD", "rates": {...}}
+    if "rates" in taxas:
+        if taxas.get("base", "USD") != "USD":
+            raise ValueError(f"as taxas precisam ter o dólar como base, não {taxas['base']}")
+        taxas = taxas["rates"]
+    faltando = sorted(set(MOEDAS.values()) - set(taxas))
+    if faltando:
+        raise ValueError(f"taxas sem as moedas usadas no dataset: {', '.join(faltando)}")
+    # as moedas da barra lateral também: sem elas a conversão falha quando são escolhidas
+    faltando = sorted(set(MOEDAS_EXIBICAO) - set(taxas))
+    if faltando:
+        raise ValueError(f"taxas sem as moedas de exibição (MOEDAS_EXIBICAO): {', '.join(faltando)}")
+    return {moeda: float(taxa) for moeda, taxa in taxas.items()}
+
+def ler_taxas(origem):
+
+    # origem é um arquivo local ou uma URL; com um arquivo a atualização funciona offline
+    if re.match(r"https?://", origem):
+        with urllib.request.urlopen(origem, timeout=30) as resposta:
+            return validar_taxas(json.load(resposta))
+    with open(origem, "r") as f:
+        return validar_taxas(json.load(f))
+
+def salvar_versao(taxas, data=None, pasta=PASTA_TAXAS):
+
+    data = data or datetime.date.today().isoformat()
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"{data}.json")
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w") as f:
+        json.dump(validar_taxas(taxas), f, sort_keys=True)
+    os.replace(temporario, caminho)
+    return caminho
+
+def atualizar_taxas(origem, data=None, pasta=PASTA_TAXAS):
+    return salvar_versao(ler_taxas(origem), data, pasta)
+
+# CONVERSÃO:
+
+def divisores_por_codigo(taxas, moeda):
+    # custo local / divisor = custo na moeda escolhida; para USD é a mesma conta do valor_unificado
+    return tabela_por_codigo({codigo: taxas[m] / taxas[moeda] for codigo, m in MOEDAS.items()}, np.nan, 'float64')
+
+def converter_custos(df, taxas, moeda):
+    divisores = divisores_por_codigo(taxas, moeda)[df['country_code'].to_numpy()]
+    valores = np.round(df['average_cost_for_two'].to_numpy(dtype='float64') / divisores, 2)
+    return pd.Series(valores, index=df.index, name='valor_unificado')
+
+def fator_do_dolar(taxas, moeda):
+    # para agregados já somados em dólar (ex.: médias do cubo)
+    return taxas[moeda]
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Versões das taxas de câmbio')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    comandos.add_parser('listar', help='mostra as versões guardadas e a ativa')
+    atualizar = comandos.add_parser('atualizar', help='guarda uma nova versão a partir de um arquivo ou URL')
+    atualizar.add_argument('origem')
+    atualizar.add_argument('--data', help='AAAA-MM-DD (padrão: hoje)')
+    args = parser.parse_args()
+
+    if args.comando == 'listar':
+        ativa = caminho_taxas_ativas()
+        for data, caminho in listar_versoes():
+            print(f"{'*' if caminho == ativa else ' '} {data}")
+        if ativa == CAMINHO_TAXAS:
+            print(f"* {os.path.basename(CAMINHO_TAXAS)} (nenhuma versão datada)")
+    else:
+        print(atualizar_taxas(args.origem, args.data))
+
+if __name__ == '__main__':
+    main()
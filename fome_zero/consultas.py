@@ -0,0 +1,149 @@
+import argparse
+import os
+import random
+import sys
+
+import numpy as np
+
+from fome_zero import culinarias, cubo, sql
+from fome_zero.paises import PAISES_PADRAO
+
+# BACKENDS DE CONSULTA:
+# Os gráficos das páginas consultam os dados por estas funções, que recebem uma "fonte"
+# ({'backend': nome, 'dados': ..., 'culinarias': ...}) e repassam para o backend dela:
+#   - pandas (padrão): 'dados' é o cubo de agregados (cubo.py), em memória;
+#   - sqlite: 'dados' é o caminho do banco com os restaurantes tratados (sql.py).
+# As consultas por culinária com todas=True contam todas as culinárias de cada
+# restaurante e, nos dois backends, usam o índice de culinárias (culinarias.py).
+# O backend é escolhido pela variável de ambiente FOME_ZERO_BACKEND. Os dois devolvem as
+# mesmas tabelas; python -m fome_zero.consultas compara os dois em várias seleções.
+
+BACKENDS = {'pandas': cubo, 'sqlite': sql}
+VARIAVEL_AMBIENTE = 'FOME_ZERO_BACKEND'
+
+def backend_configurado():
+    nome = os.environ.get(VARIAVEL_AMBIENTE, 'pandas')
+    if nome not in BACKENDS:
+        raise ValueError(f"{VARIAVEL_AMBIENTE}={nome}: use um de {', '.join(BACKENDS)}")
+    return nome
+
+def preparar_fonte(backend, df, cubo_de_agregados, versao, indice_de_culinarias, pasta=sql.PASTA_BANCOS):
+    if backend == 'sqlite':
+        # um banco por versão; os de versões antigas são apagados quando um novo é criado
+        dados = sql.construir_banco(df, sql.caminho_banco(versao, pasta))
+    else:
+        dados = cubo_de_agregados
+    return {'backend': backend, 'dados': dados, 'culinarias': indice_de_culinarias}
+
+def _modulo(fonte):
+    return BACKENDS[fonte['backend']]
+
+# PÁGINA PAÍSES:
+
+def restaurantes_por_pais(fonte, paises):
+    return _modulo(fonte).restaurantes_por_pais(fonte['dados'], paises)
+
+def cidades_por_pais(fonte, paises):
+    return _modulo(fonte).cidades_por_pais(fonte['dados'], paises)
+
+def media_votos_por_pais(fonte, paises):
+    return _modulo(fonte).media_votos_por_pais(fonte['dados'], paises)
+
+def media_preco_por_pais(fonte, paises):
+    return _modulo(fonte).media_preco_por_pais(fonte['dados'], paises)
+
+# PÁGINA CIDADES:
+
+def cidades_com_mais_restaurantes(fonte, paises):
+    return _modulo(fonte).cidades_com_mais_restaurantes(fonte['dados'], paises)
+
+def cidades_com_nota_acima_de_4(fonte, paises):
+    return _modulo(fonte).cidades_com_nota_acima_de_4(fonte['dados'], paises)
+
+def cidades_com_nota_abaixo_de_2_5(fonte, paises):
+    return _modulo(fonte).cidades_com_nota_abaixo_de_2_5(fonte['dados'], paises)
+
+def cidades_com_mais_culinarias(fonte, paises, todas=False):
+    if todas:
+        return culinarias.cidades_com_mais_culinarias(fonte['culinarias'], paises)
+    return _modulo(fonte).cidades_com_mais_culinarias(fonte['dados'], paises)
+
+# PÁGINA CULINÁRIAS:
+
+def media_nota_por_culinaria(fonte, paises=None, excluir=(), ascending=False, todas=False):
+    if todas:
+        return culinarias.media_nota_por_culinaria(fonte['culinarias'], paises, excluir, ascending)
+    return _modulo(fonte).media_nota_por_culinaria(fonte['dados'], paises, excluir, ascending)
+
+# COMPARAÇÃO ENTRE BACKENDS:
+
+CONSULTAS_POR_PAIS = [restaurantes_por_pais, cidades_por_pais, media_votos_por_pais, media_preco_por_pais, cidades_com_mais_restaurantes,
+                      cidades_com_nota_acima_de_4, cidades_com_nota_abaixo_de_2_5, cidades_com_mais_culinarias]
+
+def _iguais(a, b):
+    # dimensões e contagens iguais; médias iguais a menos do último bit (a ordem das somas muda)
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    for coluna in a.columns:
+        x, y = a[coluna].to_numpy(), b[coluna].to_numpy()
+        if a[coluna].dtype.kind == 'f' or b[coluna].dtype.kind == 'f':
+            if not np.allclose(x.astype(float), y.astype(float), rtol=1e-12, atol=0, equal_nan=True):
+                return False
+        elif [str(v) for v in x] != [str(v) for v in y]:
+            return False
+    return True
+
+def comparar_backends(fonte_a, fonte_b, selecoes):
+
+    diferencas = []
+    for paises in selecoes:
+        consultas = [(f.__name__, f, (paises,)) for f in CONSULTAS_POR_PAIS]
+        consultas += [('media_nota_por_culinaria', media_nota_por_culinaria, (paises, ['Drinks Only', 'Mineira'], ascending)) for ascending in (False, True)]
+        for nome, funcao, argumentos in consultas:
+            if not _iguais(funcao(fonte_a, *argumentos), funcao(fonte_b, *argumentos)):
+                diferencas.append((nome, paises))
+    return diferencas
+
+def comparar_indice_de_culinarias(fonte, selecoes):
+
+    # com só a culinária principal, o índice tem que dar as mesmas tabelas do backend
+    diferencas = []
+    indice = fonte['culinarias']
+    for paises in selecoes:
+        if not _iguais(culinarias.cidades_com_mais_culinarias(indice, paises, principal=True), cidades_com_mais_culinarias(fonte, paises)):
+            diferencas.append(('indice: cidades_com_mais_culinarias', paises))
+        for ascending in (False, True):
+            argumentos = (paises, ['Drinks Only', 'Mineira'], ascending)
+            if not _iguais(culinarias.media_nota_por_culinaria(indice, *argumentos, principal=True), media_nota_por_culinaria(fonte, *argumentos)):
+                diferencas.append(('indice: media_nota_por_culinaria', paises))
+    return diferencas
+
+def main():
+
+    # python -m fome_zero.consultas: confere que os backends devolvem as mesmas tabelas
+    from fome_zero.cambio import caminho_taxas_ativas
+    from fome_zero.dados import construir_snapshot, impressao_digital, CAMINHO_CSV
+
+    parser = argparse.ArgumentParser(description='Compara as consultas dos gráficos entre os backends pandas e sqlite e o índice de culinárias')
+    parser.add_argument('--selecoes', type=int, default=200, help='seleções aleatórias de países, além da padrão e de todos')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    caminho_taxas = caminho_taxas_ativas()
+    df = construir_snapshot(caminho_taxas=caminho_taxas)
+    versao = impressao_digital(CAMINHO_CSV, caminho_taxas)
+    indice = culinarias.construir_indice_de_culinarias(df)
+    pandas = preparar_fonte('pandas', df, cubo.construir_cubo(df), versao, indice)
+    sqlite = preparar_fonte('sqlite', df, None, versao, indice)
+
+    todos = sorted(df['country'].unique())
+    rng = random.Random(args.semente)
+    selecoes = [PAISES_PADRAO, todos, None, []] + [rng.sample(todos, rng.randint(1, len(todos))) for _ in range(args.selecoes)]
+    diferencas = comparar_backends(pandas, sqlite, selecoes) + comparar_indice_de_culinarias(pandas, selecoes)
+    for nome, paises in diferencas:
+        print(f"diferente: {nome} {paises}")
+    print(f"{len(selecoes)} seleções, {len(diferencas)} diferenças")
+    sys.exit(1 if diferencas else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import pandas as pd
+
+# CUBO DE AGREGADOS:
+# Somas e contagens pré-calculadas no grão (país, cidade, culinária). Os gráficos das
+# páginas Países, Cidades e Culinárias são respondidos somando as linhas do cubo dos
+# países selecionados, sem reagrupar os restaurantes a cada mudança de filtro.
+# Contagens distintas (cidades por país, culinárias por cidade) não podem ser somadas;
+# elas contam as linhas do cubo, que existem uma vez para cada combinação observada.
+
+DIMENSOES = ['country', 'city', 'cuisines']
+
+def construir_cubo(df):
+
+    nota = df['aggregate_rating']
+    base = pd.DataFrame({
+        'country': df['country'],
+        'city': df['city'],
+        'cuisines': df['cuisines'],
+        'restaurantes': 1,
+        'soma_votos': df['votes'].astype('int64'),
+        # notas têm uma casa decimal: somadas em décimos (inteiros) a média não depende da
+        # ordem das somas, nem ao tirar linhas do cubo ou ao calcular em outro backend
+        'soma_decimos_nota': (nota * 10).round().fillna(0).astype('int64'),
+        'cont_nota': nota.notna(),
+        'soma_preco': df['valor_unificado'],
+        'cont_preco': df['valor_unificado'].notna(),
+        'nota_acima_4': nota > 4,
+        # mesma regra da página Cidades: restaurantes sem votos não entram
+        'nota_abaixo_2_5': (nota < 2.5) & (df['votes'] != 0),
+    })
+    return base.groupby(DIMENSOES, observed=True).sum().reset_index()
+
+def atualizar_cubo(cubo, removidas, adicionadas):
+
+    # o cubo só tem somas e contagens: tirar linhas é somar o cubo delas com sinal trocado
+    medidas = [coluna for coluna in cubo.columns if coluna not in DIMENSOES]
+    saindo = construir_cubo(removidas)
+    saindo[medidas] = -saindo[medidas]
+    partes = [parte for parte in (cubo, saindo, construir_cubo(adicionadas)) if len(parte)]
+    cubo = pd.concat(partes, ignore_index=True).groupby(DIMENSOES, observed=True).sum().reset_index()
+    # combinações sem nenhum restaurante deixam de existir (contagens distintas dependem disso)
+    return cubo.loc[cubo['restaurantes'] > 0].reset_index(drop=True)
+
+def _selecionar(cubo, paises):
+    # paises=None usa o cubo inteiro (a página Culinárias não filtra por país)
+    if paises is None:
+        return cubo
+    return cubo.loc[cubo['country'].isin(paises)]
+
+def _somar(cubo, paises, grupo, medidas):
+    return _selecionar(cubo, paises).groupby(grupo, observed=True)[medidas].sum()
+
+def _como_texto(coluna):
+    return coluna.astype(str) if isinstance(coluna.dtype, pd.CategoricalDtype) else coluna
+
+def ordenar(tabela, medida, ascending, desempate):
+    # empates na medida saem em ordem alfabética das dimensões: a ordem fica definida e é a
+    # mesma em todos os backends de consulta (consultas.py)
+    return tabela.sort_values(by=[medida] + desempate, ascending=[ascending] + [True] * len(desempate), key=_como_texto, kind='stable').reset_index(drop=True)
+
+# PÁGINA PAÍSES:
+
+def restaurantes_por_pais(cubo, paises):
+    soma = _somar(cubo, paises, ['country'], ['restaurantes'])
+    return soma.rename(columns={'restaurantes': 'restaurant_id'}).reset_index()
+
+def cidades_por_pais(cubo, paises):
+    sel = _selecionar(cubo, paises)
+    return sel.groupby(['country'], observed=True)['city'].nunique().reset_index()
+
+def media_votos_por_pais(cubo, paises):
+    soma = _somar(cubo, paises, ['country'], ['soma_votos', 'restaurantes'])
+    return (soma['soma_votos'] / soma['restaurantes']).rename('votes').reset_index()
+
+def media_preco_por_pais(cubo, paises):
+    soma = _somar(cubo, paises, ['country'], ['soma_preco', 'cont_preco'])
+    return (soma['soma_preco'] / soma['cont_preco']).rename('valor_unificado').reset_index()
+
+# PÁGINA CIDADES:
+
+def _ranking_cidades(cubo, paises, medida, coluna):
+
+    soma = _somar(cubo, paises, ['country', 'city'], [medida])
+    # cidades sem nenhum restaurante na condição não aparecem, como no filtro original
+    soma = soma.loc[soma[medida] > 0]
+    return ordenar(soma.rename(columns={medida: coluna}).reset_index(), coluna, False, ['country', 'city'])
+
+def cidades_com_mais_restaurantes(cubo, paises):
+    return _ranking_cidades(cubo, paises, 'restaurantes', 'restaurant_id')
+
+def cidades_com_nota_acima_de_4(cubo, paises):
+    return _ranking_cidades(cubo, paises, 'nota_acima_4', 'aggregate_rating')
+
+def cidades_com_nota_abaixo_de_2_5(cubo, paises):
+    return _ranking_cidades(cubo, paises, 'nota_abaixo_2_5', 'aggregate_rating')
+
+def cidades_com_mais_culinarias(cubo, paises):
+    sel = _selecionar(cubo, paises)
+    contagem = sel.groupby(['country', 'city'], observed=True)['cuisines'].nunique()
+    return ordenar(contagem.reset_index(), 'cuisines', False, ['country', 'city'])
+
+# PÁGINA CULINÁRIAS:
+
+def media_nota_por_culinaria(cubo, paises=None, excluir=(), ascending=False):
+
+    sel = _selecionar(cubo, paises)
+    sel = sel.loc[~sel['cuisines'].isin(excluir)]
+    soma = sel.groupby(['cuisines'], observed=True)[['soma_decimos_nota', 'cont_nota']].sum()
+    media = (soma['soma_decimos_nota'] / soma['cont_nota'] / 10).round(2).rename('aggregate_rating').reset_index()
+    return ordenar(media, 'aggregate_rating', ascending, ['cuisines'])
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+from fome_zero.cubo import ordenar
+from fome_zero.indices import atualizar_coluna_indexada, construir_melhores_por_culinaria, indexar_coluna, posicoes_dos_valores, posicoes_filtradas
+
+# ÍNDICE DE CULINÁRIAS:
+# Um restaurante pode ter vários tipos de culinária ("Italian, Pizza, Cafe", coluna
+# todas_culinarias). Em vez de um dataframe "explodido", que repetiria todas as colunas
+# do restaurante uma vez por culinária, a relação restaurante x culinária fica em
+# arrays de códigos no estilo CSR:
+#   codigos[deslocamentos[i]:deslocamentos[i + 1]] são as culinárias da linha i, na
+#   ordem da lista (a primeira é a principal, a da coluna cuisines);
+#   linhas[j] é a linha da entrada j.
+# O caminho inverso (culinária -> linhas), usado no filtro, segue o formato do índice
+# de filtros (indices.py). Junto ficam só as colunas de cada restaurante que as consultas
+# usam (país, cidade e nota), para que o índice também sirva de fonte para os gráficos.
+#
+# As funções de consulta devolvem as mesmas tabelas do cubo (cubo.py); com
+# principal=True só a primeira culinária de cada restaurante conta e o resultado é o
+# mesmo do cubo (python -m fome_zero.consultas confere).
+
+SEPARADOR = ", "
+
+def construir_indice_de_culinarias(df):
+
+    # as combinações distintas ("Italian, Pizza") são separadas uma vez cada
+    codigos_combinacao, combinacoes = pd.factorize(df['todas_culinarias'])
+    listas = [str(combinacao).split(SEPARADOR) for combinacao in combinacoes]
+    nomes = pd.Index(sorted({nome for lista in listas for nome in lista}))
+
+    tamanhos_combinacao = np.array([len(lista) for lista in listas] + [0], dtype=np.int64)
+    inicios_combinacao = np.zeros(len(listas) + 1, dtype=np.int64)
+    np.cumsum(tamanhos_combinacao[:-1], out=inicios_combinacao[1:])
+    codigos_combinacoes = nomes.get_indexer([nome for lista in listas for nome in lista]).astype(np.int32)
+
+    # código -1 (sem culinária) cai na combinação vazia do final
+    tamanhos = tamanhos_combinacao[codigos_combinacao]
+    deslocamentos = np.zeros(len(df) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=deslocamentos[1:])
+    linhas = np.repeat(np.arange(len(df), dtype=np.int64), tamanhos)
+    # posição de cada entrada dentro da sua linha, somada ao início da combinação da linha
+    dentro = np.arange(len(linhas), dtype=np.int64) - deslocamentos[linhas]
+    codigos = codigos_combinacoes[inicios_combinacao[codigos_combinacao[linhas]] + dentro]
+
+    return {
+        'nomes': nomes,
+        'deslocamentos': deslocamentos,
+        'codigos': codigos,
+        'linhas': linhas,
+        'por_culinaria': indexar_coluna(pd.Series(pd.Categorical.from_codes(codigos, categories=nomes))),
+        **_colunas_das_consultas(df),
+    }
+
+def _colunas_das_consultas(df):
+    nota = df['aggregate_rating'].to_numpy(dtype='float64')
+    return {
+        'country': pd.Series(pd.Categorical(df['country'])),
+        'city': pd.Series(pd.Categorical(df['city'])),
+        # notas em décimos, como no cubo
+        'decimos_nota': np.where(np.isnan(nota), 0, np.round(nota * 10)).astype(np.int64),
+        'tem_nota': ~np.isnan(nota),
+    }
+
+def atualizar_indice_de_culinarias(indice, df, posicoes):
+
+    # df já é o dataframe atualizado e posicoes vem de deltas.posicoes_do_delta. Só as
+    # linhas novas têm as listas separadas; as entradas das que ficam mantêm a ordem e
+    # as das novas vão para o final, como se o índice fosse construído do zero.
+    novas = construir_indice_de_culinarias(df.take(posicoes['novas']))
+    nomes = indice['nomes'].union(novas['nomes'])
+
+    linhas = posicoes['mapa'][indice['linhas']]
+    vivas = linhas >= 0
+    # posição antiga -> nova das entradas, para o caminho culinária -> entradas
+    mapa_entradas = np.cumsum(vivas) - 1
+    mapa_entradas[~vivas] = -1
+    codigos_novos = nomes.get_indexer(novas['nomes'])[novas['codigos']].astype(np.int32)
+    entradas_novas = np.arange(vivas.sum(), vivas.sum() + len(codigos_novos), dtype=np.int64)
+
+    codigos = indice['codigos'][vivas]
+    if len(nomes) > len(indice['nomes']):
+        # culinária nova no meio da ordem alfabética: os códigos antigos mudam
+        codigos = nomes.get_indexer(indice['nomes']).astype(np.int32)[codigos]
+    codigos = np.concatenate([codigos, codigos_novos])
+    por_culinaria = atualizar_coluna_indexada(indice['por_culinaria'], nomes, mapa_entradas, codigos_novos, entradas_novas)
+
+    # culinárias que ficaram sem restaurante saem, como na construção
+    usadas = np.diff(por_culinaria['deslocamentos']) > 0
+    if not usadas.all():
+        codigos = (np.cumsum(usadas) - 1)[codigos].astype(np.int32)
+        nomes = nomes[usadas]
+        por_culinaria = {'categorias': nomes, 'deslocamentos': np.concatenate([[0], por_culinaria['deslocamentos'][1:][usadas]]),
+                         'posicoes': por_culinaria['posicoes']}
+
+    tamanhos = np.concatenate([np.diff(indice['deslocamentos'])[posicoes['mapa'] >= 0], np.diff(novas['deslocamentos'])])
+    deslocamentos = np.zeros(len(df) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=deslocamentos[1:])
+    return {
+        'nomes': nomes,
+        'deslocamentos': deslocamentos,
+        'codigos': codigos,
+        'linhas': np.concatenate([linhas[vivas], posicoes['novas'][novas['linhas']]]),
+        'por_culinaria': por_culinaria,
+        **_colunas_das_consultas(df),
+    }
+
+def _entradas(indice, paises, principal):
+
+    # máscara das entradas (restaurante, culinária) que entram na consulta
+    selecionadas = np.ones(len(indice['codigos']), dtype=bool)
+    if principal:
+        selecionadas &= np.arange(len(indice['codigos'])) == indice['deslocamentos'][indice['linhas']]
+    if paises is not None:
+        selecionadas &= indice['country'].isin(paises).to_numpy()[indice['linhas']]
+    return selecionadas
+
+# FILTRO E MELHORES:
+
+def posicoes_das_culinarias(indice, culinarias):
+
+    # linhas com pelo menos uma das culinárias; a mesma linha pode vir de várias
+    entrada = indice['por_culinaria']
+    codigos = indice['nomes'].get_indexer(list(culinarias))
+    codigos = codigos[codigos >= 0]
+    deslocamentos = entrada['deslocamentos']
+    partes = [indice['linhas'][entrada['posicoes'][deslocamentos[c]:deslocamentos[c + 1]]] for c in codigos]
+    if not partes:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(partes))
+
+def filtrar_por_culinarias(df, indice, indice_de_culinarias, culinarias, **selecoes):
+
+    # como indices.filtrar, mas a culinária vale se estiver em qualquer posição da lista
+    posicoes = posicoes_das_culinarias(indice_de_culinarias, culinarias)
+    outras = posicoes_filtradas(indice, **selecoes)
+    if outras is not None:
+        posicoes = np.intersect1d(posicoes, outras, assume_unique=True)
+    return df.take(posicoes)
+
+def _candidatas(df, indice, entradas=slice(None)):
+    linhas = indice['linhas'][entradas]
+    return pd.DataFrame({
+        'cuisines': indice['nomes'].to_numpy()[indice['codigos'][entradas]],
+        'restaurant_id': df['restaurant_id'].to_numpy()[linhas],
+        'restaurant_name': df['restaurant_name'].to_numpy()[linhas],
+        'aggregate_rating': df['aggregate_rating'].to_numpy()[linhas],
+    })
+
+def melhores_por_culinaria(df, indice):
+
+    # as mesmas regras de indices.construir_melhores_por_culinaria, disputadas por todos
+    # os restaurantes que têm a culinária, e não só por aqueles em que ela é a principal
+    return construir_melhores_por_culinaria(_candidatas(df, indice))
+
+def atualizar_melhores_de_todas(melhores, df, indice, removidas, posicoes):
+
+    # como indices.atualizar_melhores_por_culinaria, com df e indice já atualizados: só
+    # as culinárias que perderam o seu melhor restaurante são recalculadas, a partir das
+    # suas entradas no índice; as demais só disputam com as entradas das linhas novas
+    perdidas = melhores.loc[melhores['restaurant_id'].isin(removidas['restaurant_id'])].index
+    candidatas = [melhores.drop(index=perdidas).reset_index(),
+                  _candidatas(df, indice, slice(indice['deslocamentos'][len(df) - len(posicoes['novas'])], None))]
+    if len(perdidas):
+        candidatas.append(_candidatas(df, indice, posicoes_dos_valores({'cuisines': indice['por_culinaria']}, 'cuisines', perdidas)))
+    return construir_melhores_por_culinaria(pd.concat(candidatas, ignore_index=True))
+
+# CONSULTAS DOS GRÁFICOS:
+
+def cidades_com_mais_culinarias(indice, paises, principal=False):
+
+    selecionadas = _entradas(indice, paises, principal)
+    linhas = indice['linhas'][selecionadas]
+    paises_codigos = indice['country'].cat.codes.to_numpy().astype(np.int64)[linhas]
+    cidades_codigos = indice['city'].cat.codes.to_numpy().astype(np.int64)[linhas]
+
+    # pares (cidade, culinária) distintos, contados por cidade
+    quantidade_cidades = len(indice['city'].cat.categories)
+    quantidade_nomes = len(indice['nomes'])
+    cidades = paises_codigos * quantidade_cidades + cidades_codigos
+    pares = np.unique(cidades * quantidade_nomes + indice['codigos'][selecionadas])
+    cidades, contagens = np.unique(pares // quantidade_nomes, return_counts=True)
+
+    tabela = pd.DataFrame({
+        'country': pd.Categorical.from_codes(cidades // quantidade_cidades, categories=indice['country'].cat.categories),
+        'city': pd.Categorical.from_codes(cidades % quantidade_cidades, categories=indice['city'].cat.categories),
+        'cuisines': contagens,
+    })
+    return ordenar(tabela, 'cuisines', False, ['country', 'city'])
+
+def media_nota_por_culinaria(indice, paises=None, excluir=(), ascending=False, principal=False):
+
+    selecionadas = _entradas(indice, paises, principal)
+    codigos = indice['codigos'][selecionadas]
+    linhas = indice['linhas'][selecionadas]
+    quantidade = len(indice['nomes'])
+
+    entradas = np.bincount(codigos, minlength=quantidade)
+    soma = np.bincount(codigos, weights=indice['decimos_nota'][linhas], minlength=quantidade)
+    contagem = np.bincount(codigos, weights=indice['tem_nota'][linhas], minlength=quantidade)
+
+    presentes = (entradas > 0) & ~indice['nomes'].isin(list(excluir))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.round(soma[presentes] / contagem[presentes] / 10, 2)
+    tabela = pd.DataFrame({'cuisines': indice['nomes'][presentes], 'aggregate_rating': media})
+    return ordenar(tabela, 'aggregate_rating', ascending, ['cuisines'])
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fome_zero.limpeza import etapas_de_limpeza, limpar, nome_da_coluna, relatorio_limpeza
+from fome_zero.medicao import marcar
+from fome_zero.paises import country_moeda, country_name
+from fome_zero.tipos import compactar_tipos, relatorio_memoria, uso_de_memoria
+
+logger = logging.getLogger(__name__)
+
+# Caminhos dos arquivos usados pelo dashboard, relativos à raiz do projeto
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_CSV = os.path.join(RAIZ, "dataset", "zomato.csv")
+CAMINHO_TAXAS = os.path.join(RAIZ, "taxas_moedas.json")
+CAMINHO_SNAPSHOT = os.path.join(RAIZ, "dataset", "cache", "zomato_tratado.parquet")
+
+# Aumentar sempre que tratar_dados mudar, para que os snapshots antigos sejam reconstruídos
+VERSAO_PIPELINE = 4
+
+# FUNÇÕES:
+
+def rename_columns(dataframe):
+
+    df = dataframe.copy()
+    df.columns = [nome_da_coluna(coluna) for coluna in df.columns]
+
+    return df
+
+
+def valor_unificado(row,taxas_cambio):
+
+    taxa = taxas_cambio[(country_moeda(row['country_code']))]
+
+    price = round((row['average_cost_for_two']/taxa),2)
+    return price
+
+def create_price_tye(price_range):
+
+    if price_range == 1:
+        return "cheap"
+    elif price_range == 2:
+        return "normal"
+    elif price_range == 3:
+        return "expensive"
+    else:
+        return "gourmet"
+
+def salvar_dados_em_json(dados, arquivo=CAMINHO_TAXAS):
+    with open(arquivo, "w") as f:
+        json.dump(dados, f)
+
+def carregar_dados_de_json(arquivo=CAMINHO_TAXAS):
+    if os.path.exists(arquivo):
+        with open(arquivo, "r") as f:
+            return json.load(f)
+    return None
+
+def paises_nome(row):
+
+    pais = country_name(row['country_code'])
+    return pais
+
+# LIMPEZA E TRATAMENTO:
+
+def tratar_dados(df1, taxas_cambio):
+
+    # as etapas (colunas, vazios, duplicatas, culinárias, valor em dólar, outliers, país)
+    # estão declaradas em limpeza.py; o df original não é modificado
+    df, relatorio = limpar(df1, etapas_de_limpeza(taxas_cambio))
+    logger.info(relatorio_limpeza(relatorio))
+    return df
+
+def impressao_digital(*arquivos):
+
+    # Identifica a versão dos arquivos de entrada pelo tamanho e data de modificação,
+    # sem precisar ler o conteúdo a cada rerun da página
+    h = hashlib.sha1()
+    for arquivo in arquivos:
+        info = os.stat(arquivo)
+        h.update(f"{os.path.abspath(arquivo)}:{info.st_size}:{info.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+def chave_snapshot(caminho_csv, caminho_taxas):
+
+    # Diferente da impressão digital, aqui o conteúdo é lido: o snapshot sobrevive a
+    # deploys e checkouts, que mudam a data dos arquivos mas não os dados
+    h = hashlib.sha1(f"pipeline:{VERSAO_PIPELINE};".encode())
+    for arquivo in (caminho_csv, caminho_taxas):
+        with open(arquivo, "rb") as f:
+            h.update(hashlib.sha1(f.read()).digest())
+    return h.hexdigest()
+
+def ler_snapshot(caminho_snapshot, chave):
+
+    # Retorna o dataframe salvo apenas se ele foi gerado a partir das mesmas entradas
+    if not os.path.exists(caminho_snapshot):
+        return None
+    try:
+        metadados = pq.read_schema(caminho_snapshot).metadata or {}
+        if metadados.get(b"fome_zero_chave") != chave.encode():
+            return None
+        return pd.read_parquet(caminho_snapshot)
+    except (OSError, pa.ArrowException):
+        return None
+
+def salvar_snapshot(df, caminho_snapshot, chave):
+
+    tabela = pa.Table.from_pandas(df)
+    tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), b"fome_zero_chave": chave.encode()})
+
+    # escreve em um arquivo temporário e troca no final, para que outro processo
+    # nunca leia um snapshot pela metade
+    os.makedirs(os.path.dirname(caminho_snapshot), exist_ok=True)
+    temporario = f"{caminho_snapshot}.{os.getpid()}.tmp"
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, caminho_snapshot)
+
+def construir_snapshot(caminho_csv=CAMINHO_CSV, caminho_taxas=CAMINHO_TAXAS, caminho_snapshot=CAMINHO_SNAPSHOT, forcar=False):
+
+    chave = chave_snapshot(caminho_csv, caminho_taxas)
+    df = None if forcar else ler_snapshot(caminho_snapshot, chave)
+    if df is not None:
+        marcar('ler_snapshot')
+        return df
+
+    taxas_cambio = carregar_dados_de_json(caminho_taxas)
+    bruto = pd.read_csv(caminho_csv)
+    marcar('read_csv')
+    df = tratar_dados(bruto, taxas_cambio)
+    marcar('tratar_dados')
+
+    # categóricas e tipos menores antes de salvar: o snapshot já guarda a versão compacta
+    antes = uso_de_memoria(df)
+    df = compactar_tipos(df)
+    logger.info(relatorio_memoria(antes, uso_de_memoria(df)))
+    marcar('compactar_tipos')
+    try:
+        salvar_snapshot(df, caminho_snapshot, chave)
+    except OSError:
+        # sem permissão de escrita o dashboard continua funcionando, só não guarda o snapshot
+        pass
+    marcar('salvar_snapshot')
+    return df
+
+if __name__ == "__main__":
+    # python -m fome_zero.dados [--forcar]: gera o snapshot antes de subir o servidor
+    import sys
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    df = construir_snapshot(forcar="--forcar" in sys.argv)
+    print(f"{CAMINHO_SNAPSHOT}: {len(df)} linhas")
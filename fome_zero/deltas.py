@@ -0,0 +1,71 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.dados import RAIZ, impressao_digital, tratar_dados
+from fome_zero.tipos import compactar_tipos, unir_categorias
+
+# ARQUIVOS DE DELTA:
+# Atualizações diárias do dataset sem reprocessar o zomato.csv. Cada arquivo em
+# dataset/deltas/*.csv tem as mesmas colunas do zomato.csv e uma coluna extra "Operacao":
+#   upsert -> restaurante novo ou alterado (a linha substitui a anterior com o mesmo Restaurant ID)
+#   delete -> restaurante removido (basta o Restaurant ID)
+# Sem a coluna Operacao todas as linhas são upsert. Os arquivos são aplicados em ordem
+# alfabética, então nomes como 2026-10-18.csv mantêm a ordem cronológica.
+
+PASTA_DELTAS = os.path.join(RAIZ, "dataset", "deltas")
+COLUNA_OPERACAO = "Operacao"
+
+def listar_deltas(pasta=PASTA_DELTAS):
+    # (caminho, impressão digital) de cada arquivo, na ordem em que devem ser aplicados
+    return [(caminho, impressao_digital(caminho)) for caminho in sorted(glob.glob(os.path.join(pasta, "*.csv")))]
+
+def ler_delta(caminho, taxas_cambio):
+
+    bruto = pd.read_csv(caminho)
+    if COLUNA_OPERACAO not in bruto.columns:
+        bruto[COLUNA_OPERACAO] = "upsert"
+
+    # se o mesmo restaurante aparece mais de uma vez no arquivo, vale a última linha
+    bruto = bruto.drop_duplicates(subset="Restaurant ID", keep="last")
+    ids = bruto["Restaurant ID"].to_numpy()
+
+    novas = bruto.loc[bruto[COLUNA_OPERACAO].str.lower() != "delete"].drop(columns=COLUNA_OPERACAO)
+    if len(novas):
+        # mesma limpeza do dataset completo; uma linha que não passa nela só remove a antiga
+        novas = compactar_tipos(tratar_dados(novas, taxas_cambio))
+    else:
+        novas = None
+    return ids, novas
+
+def aplicar_delta(df, ids, novas):
+
+    # retorna o dataframe atualizado e as linhas que saíram e entraram, usadas para
+    # atualizar os agregados sem recalculá-los do zero
+    saem = df["restaurant_id"].isin(ids).to_numpy()
+    removidas = df.loc[saem]
+    ficam = df.loc[~saem]
+
+    if novas is None:
+        novas = df.iloc[:0]
+    # índices novos depois do último existente, para não repetir rótulos
+    inicio = df.index.max() + 1 if len(df) else 0
+    novas = novas.set_axis(pd.RangeIndex(inicio, inicio + len(novas)))
+
+    ficam, removidas, novas = unir_categorias(ficam, removidas, novas)
+    return pd.concat([ficam, novas]), removidas, novas
+
+def posicoes_do_delta(anterior, removidas, adicionadas):
+
+    # as linhas que ficam mantêm a ordem e as novas vão para o final, então os índices por
+    # posição (filtros, culinárias, espacial) são ajustados com isto em vez de refeitos:
+    # posição no dataframe anterior -> posição no atualizado (-1 para as removidas) e as
+    # posições das linhas novas
+    ficam = np.ones(len(anterior), dtype=bool)
+    ficam[anterior.index.get_indexer(removidas.index)] = False
+    mapa = np.full(len(anterior), -1, dtype=np.int64)
+    mapa[ficam] = np.arange(ficam.sum())
+    inicio = int(ficam.sum())
+    return {'mapa': mapa, 'novas': np.arange(inicio, inicio + len(adicionadas), dtype=np.int64)}
@@ -0,0 +1,227 @@
+import numpy as np
+
+# ÍNDICE ESPACIAL:
+# As coordenadas dos restaurantes ficam em uma grade de células de CELULA_GRAUS graus
+# (latitude x longitude), no estilo das grades de geohash. Cada ponto recebe a chave
+# faixa * colunas + coluna (faixa de latitude, coluna de longitude) e os pontos são
+# ordenados por ela: as células de uma mesma faixa ficam vizinhas no array, e os pontos
+# de uma faixa entre duas longitudes saem de dois searchsorted. Uma consulta:
+#   - calcula a caixa de latitudes e longitudes que contém o círculo do raio (a largura
+#     em longitude cresce com a latitude e, perto dos polos, vira a volta inteira);
+#   - junta os trechos das faixas da caixa (no antimeridiano, dois trechos por faixa);
+#   - aplica os filtros e a distância exata (haversine) só a esses candidatos.
+# Os k mais próximos começam com um raio pequeno, que cresce até ter k restaurantes
+# dentro dele. O custo depende de quantos pontos estão perto do ponto de partida, e não
+# do tamanho do dataset. Com um filtro de culinária mais seletivo que a caixa, os
+# candidatos são as próprias linhas da culinária.
+
+RAIO_TERRA_KM = 6371.0088
+# ~5,5 km de lado no equador
+CELULA_GRAUS = 0.05
+MEIA_VOLTA_KM = np.pi * RAIO_TERRA_KM
+
+def _faixas_e_colunas(latitudes, longitudes, celula):
+    faixas = np.clip(np.floor((latitudes + 90) / celula), 0, round(180 / celula) - 1).astype(np.int64)
+    colunas = np.floor((longitudes + 180) / celula).astype(np.int64) % round(360 / celula)
+    return faixas, colunas
+
+def _pontos(df, linhas, celula):
+
+    # as linhas com coordenadas, ordenadas pela chave da célula
+    latitudes = df['latitude'].to_numpy(dtype='float64')[linhas]
+    longitudes = df['longitude'].to_numpy(dtype='float64')[linhas]
+    # coordenadas vazias ou fora do globo não entram no índice
+    validas = np.flatnonzero(np.isfinite(latitudes) & np.isfinite(longitudes) & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180))
+
+    faixas, colunas = _faixas_e_colunas(latitudes[validas], longitudes[validas], celula)
+    chaves = faixas * round(360 / celula) + colunas
+    ordem = np.argsort(chaves, kind='stable')
+    validas = validas[ordem]
+    return {
+        'chaves': chaves[ordem],
+        'posicoes': linhas[validas].astype(np.int64),
+        # em radianos, como a haversine usa
+        'latitude': np.radians(latitudes[validas]),
+        'longitude': np.radians(longitudes[validas]),
+        'price_range': df['price_range'].to_numpy()[linhas][validas],
+        'aggregate_rating': df['aggregate_rating'].to_numpy(dtype='float64')[linhas][validas],
+    }
+
+def _no_indice(posicoes, linhas):
+    # linha do dataframe -> posição no índice (-1 sem coordenadas)
+    no_indice = np.full(linhas, -1, dtype=np.int64)
+    no_indice[posicoes] = np.arange(len(posicoes))
+    return no_indice
+
+def construir_indice_espacial(df, celula=CELULA_GRAUS):
+    pontos = _pontos(df, np.arange(len(df), dtype=np.int64), celula)
+    return {'celula': celula, **pontos, 'no_indice': _no_indice(pontos['posicoes'], len(df))}
+
+def atualizar_indice_espacial(indice, df, posicoes):
+
+    # df já é o dataframe atualizado e posicoes vem de deltas.posicoes_do_delta. Os pontos
+    # que ficam só trocam de linha; os das linhas novas entram no final da sua célula
+    # (as linhas novas vêm depois de todas), como na ordenação estável da construção.
+    linhas = posicoes['mapa'][indice['posicoes']]
+    ficam = linhas >= 0
+    novos = _pontos(df, posicoes['novas'], indice['celula'])
+    chaves = indice['chaves'][ficam]
+    lugares = np.searchsorted(chaves, novos['chaves'], 'right')
+
+    atualizado = {'celula': indice['celula'], 'chaves': np.insert(chaves, lugares, novos['chaves']),
+                  'posicoes': np.insert(linhas[ficam], lugares, novos['posicoes'])}
+    for coluna in ('latitude', 'longitude', 'price_range', 'aggregate_rating'):
+        atualizado[coluna] = np.insert(indice[coluna][ficam], lugares, novos[coluna])
+    atualizado['no_indice'] = _no_indice(atualizado['posicoes'], len(df))
+    return atualizado
+
+def distancia_km(latitude, longitude, latitudes, longitudes):
+
+    # haversine; tudo em radianos
+    a = (np.sin((latitudes - latitude) / 2) ** 2
+         + np.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+# CANDIDATOS:
+
+def _caixa(latitude, longitude, raio_km):
+
+    # latitudes e longitudes (graus) da caixa que contém o círculo; as longitudes não
+    # são reduzidas a [-180, 180] e None quer dizer a volta inteira
+    delta = raio_km / RAIO_TERRA_KM
+    phi = np.radians(latitude)
+    minima, maxima = phi - delta, phi + delta
+    if minima <= -np.pi / 2 or maxima >= np.pi / 2:
+        # o círculo passa por um polo
+        return max(np.degrees(minima), -90), min(np.degrees(maxima), 90), None
+    abertura = np.degrees(np.arcsin(min(np.sin(delta) / np.cos(phi), 1)))
+    if abertura >= 180:
+        return np.degrees(minima), np.degrees(maxima), None
+    return np.degrees(minima), np.degrees(maxima), (longitude - abertura, longitude + abertura)
+
+def intervalos_de_colunas(inicio, fim, total_colunas):
+
+    # colunas [inicio, fim] de uma grade que dá a volta no globo; os extremos podem
+    # passar de 0 ou de total_colunas (antimeridiano), e aí o intervalo vira dois
+    if fim - inicio + 1 >= total_colunas:
+        return [(0, total_colunas - 1)]
+    primeira = inicio % total_colunas
+    ultima = primeira + fim - inicio
+    if ultima < total_colunas:
+        return [(primeira, ultima)]
+    return [(primeira, total_colunas - 1), (0, ultima - total_colunas)]
+
+def trechos_da_grade(chaves, faixas, intervalos, total_colunas):
+    # (início, fim) nas chaves ordenadas de cada faixa e intervalo de colunas
+    primeiras = np.concatenate([faixas * total_colunas + a for a, _ in intervalos])
+    ultimas = np.concatenate([faixas * total_colunas + b for _, b in intervalos])
+    return np.searchsorted(chaves, primeiras, 'left'), np.searchsorted(chaves, ultimas, 'right')
+
+def juntar_trechos(inicios, fins):
+    # os índices de todos os trechos, em um único array e sem laço
+    tamanhos = fins - inicios
+    antes = np.cumsum(tamanhos) - tamanhos
+    return np.repeat(inicios - antes, tamanhos) + np.arange(tamanhos.sum())
+
+def _trechos_da_caixa(indice, latitude_minima, latitude_maxima, longitudes):
+
+    celula = indice['celula']
+    total_colunas = round(360 / celula)
+    primeira, ultima = _faixas_e_colunas(np.array([latitude_minima, latitude_maxima]), np.zeros(2), celula)[0]
+    faixas = np.arange(primeira, ultima + 1, dtype=np.int64)
+    if longitudes is None:
+        intervalos = [(0, total_colunas - 1)]
+    else:
+        intervalos = intervalos_de_colunas(int(np.floor((longitudes[0] + 180) / celula)), int(np.floor((longitudes[1] + 180) / celula)), total_colunas)
+    return trechos_da_grade(indice['chaves'], faixas, intervalos, total_colunas)
+
+def _selecionar(indice, inicios, fins, linhas=None, precos=None, nota_minima=None):
+
+    # posições no índice dos pontos dos trechos que passam nos filtros
+    linhas = None if linhas is None else np.asarray(linhas, dtype=np.int64)
+    if linhas is not None and len(linhas) < (fins - inicios).sum():
+        # o filtro de linhas (ex.: culinária) tem menos pontos que os trechos
+        selecionados = indice['no_indice'][linhas]
+        selecionados = selecionados[selecionados >= 0]
+    else:
+        selecionados = juntar_trechos(inicios, fins)
+        if linhas is not None:
+            # linhas vem ordenada (ex.: culinarias.posicoes_das_culinarias)
+            posicoes = indice['posicoes'][selecionados]
+            lugar = np.minimum(np.searchsorted(linhas, posicoes), len(linhas) - 1)
+            selecionados = selecionados[linhas[lugar] == posicoes]
+
+    if precos is not None:
+        selecionados = selecionados[np.isin(indice['price_range'][selecionados], list(precos))]
+    if nota_minima is not None:
+        selecionados = selecionados[indice['aggregate_rating'][selecionados] >= nota_minima]
+    return selecionados
+
+def _candidatos(indice, latitude, longitude, raio_km, **filtros):
+
+    # posições no índice e distâncias dos restaurantes filtrados dentro do raio
+    inicios, fins = _trechos_da_caixa(indice, *_caixa(latitude, longitude, raio_km))
+    selecionados = _selecionar(indice, inicios, fins, **filtros)
+    distancias = distancia_km(np.radians(latitude), np.radians(longitude), indice['latitude'][selecionados], indice['longitude'][selecionados])
+    dentro = distancias <= raio_km
+    return selecionados[dentro], distancias[dentro]
+
+def _mais_perto_primeiro(indice, selecionados, distancias, limite=None):
+
+    # linhas do dataframe e distâncias, da mais perto para a mais longe; no empate, a
+    # menor linha primeiro. Com limite, só os que empatam ou ganham do k-ésimo são ordenados
+    if limite is not None and 0 < limite < len(distancias):
+        perto = distancias <= np.partition(distancias, limite - 1)[limite - 1]
+        selecionados, distancias = selecionados[perto], distancias[perto]
+    ordem = np.lexsort((indice['posicoes'][selecionados], distancias))[:limite]
+    return indice['posicoes'][selecionados[ordem]], distancias[ordem]
+
+# CONSULTAS:
+# Devolvem as linhas do dataframe (para df.take) e as distâncias em km, da mais perto
+# para a mais longe. Filtros: linhas (ordenadas, ex.: as de uma culinária), precos
+# (valores de price_range) e nota_minima.
+
+def dentro_do_raio(indice, latitude, longitude, raio_km, **filtros):
+    selecionados, distancias = _candidatos(indice, latitude, longitude, raio_km, **filtros)
+    return _mais_perto_primeiro(indice, selecionados, distancias)
+
+def na_caixa(indice, sul, oeste, norte, leste, **filtros):
+
+    # linhas com as coordenadas dentro da caixa (graus; como a área visível de um mapa,
+    # oeste e leste podem passar de -180 e 180), em ordem crescente
+    largura = leste - oeste
+    longitudes = None if largura >= 360 else (oeste, leste)
+    selecionados = _selecionar(indice, *_trechos_da_caixa(indice, max(sul, -90), min(norte, 90), longitudes), **filtros)
+    dentro = (indice['latitude'][selecionados] >= np.radians(sul)) & (indice['latitude'][selecionados] <= np.radians(norte))
+    if longitudes is not None:
+        dentro &= np.mod(indice['longitude'][selecionados] - np.radians(oeste), 2 * np.pi) <= np.radians(largura)
+    return np.sort(indice['posicoes'][selecionados[dentro]])
+
+def mais_proximos(indice, latitude, longitude, k, raio_maximo_km=MEIA_VOLTA_KM, **filtros):
+
+    raio = min(indice['celula'] * 111, raio_maximo_km)
+    while True:
+        selecionados, distancias = _candidatos(indice, latitude, longitude, raio, **filtros)
+        if len(selecionados) >= k or raio >= raio_maximo_km:
+            return _mais_perto_primeiro(indice, selecionados, distancias, k)
+        # a área cresce com o quadrado do raio: estima o raio que teria k pontos, com folga
+        fator = np.sqrt(k / len(selecionados)) * 1.5 if len(selecionados) else 4
+        raio = min(raio * max(fator, 2), raio_maximo_km)
+
+def varredura_linear(df, latitude, longitude, k=None, raio_km=None, linhas=None, precos=None, nota_minima=None):
+
+    # a mesma consulta sem índice (haversine em todas as linhas), para conferência e benchmark
+    distancias = distancia_km(np.radians(latitude), np.radians(longitude),
+                              np.radians(df['latitude'].to_numpy(dtype='float64')), np.radians(df['longitude'].to_numpy(dtype='float64')))
+    ficam = np.ones(len(df), dtype=bool)
+    if linhas is not None:
+        ficam &= np.isin(np.arange(len(df)), linhas)
+    if precos is not None:
+        ficam &= np.isin(df['price_range'].to_numpy(), list(precos))
+    if nota_minima is not None:
+        ficam &= df['aggregate_rating'].to_numpy() >= nota_minima
+    if raio_km is not None:
+        ficam &= distancias <= raio_km
+    encontradas = np.flatnonzero(ficam)
+    ordem = np.lexsort((encontradas, distancias[encontradas]))[:k]
+    return encontradas[ordem], distancias[encontradas[ordem]]
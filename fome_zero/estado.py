@@ -0,0 +1,146 @@
+import hashlib
+import threading
+
+import streamlit as st
+
+from fome_zero.aquecimento import aquecer_em_segundo_plano
+from fome_zero.cambio import caminho_taxas_ativas, converter_custos, ler_taxas
+from fome_zero.consultas import backend_configurado, preparar_fonte
+from fome_zero.culinarias import atualizar_indice_de_culinarias, atualizar_melhores_de_todas, construir_indice_de_culinarias, melhores_por_culinaria
+from fome_zero.cubo import DIMENSOES, atualizar_cubo, construir_cubo
+from fome_zero.dados import CAMINHO_CSV, construir_snapshot, impressao_digital
+from fome_zero.deltas import aplicar_delta, ler_delta, listar_deltas, posicoes_do_delta
+from fome_zero.espacial import atualizar_indice_espacial, construir_indice_espacial
+from fome_zero.exportacao import remover_exportacoes_antigas
+from fome_zero.indices import atualizar_indice_de_filtros, atualizar_melhores_por_culinaria, construir_indice_de_filtros, construir_melhores_por_culinaria
+from fome_zero.ladrilhos import atualizar_indice_de_ladrilhos, construir_indice_de_ladrilhos
+
+# ESTADO COMPARTILHADO DO DASHBOARD:
+# O dataframe tratado e os agregados derivados dele (cubo, fonte das consultas dos
+# gráficos, melhor restaurante por culinária, índice de filtros, índice de culinárias,
+# índice espacial e ladrilhos do mapa) ficam em um único estado por processo,
+# compartilhado entre sessões e páginas. Arquivos novos em dataset/deltas/ são aplicados
+# sobre esse estado de forma incremental: só as linhas alteradas passam pela limpeza e
+# os agregados e índices são ajustados com elas, sem reler o zomato.csv.
+#
+# Cada atualização gera um novo dicionário (a "versão"), então quem já está desenhando
+# uma página continua com os objetos da versão anterior. Para isso cada página chama
+# estado_atual() uma única vez por execução e lê tudo desse dicionário: o dataframe e os
+# índices (posições das linhas) sempre da mesma versão. As páginas nunca devem
+# alterar os objetos recebidos. Cada versão nova dispara o aquecimento dos gráficos
+# (aquecimento.py) em segundo plano e apaga as exportações das versões anteriores.
+
+def _construir_estruturas(df):
+
+    # índice de culinárias (todas as culinárias de cada restaurante)
+    culinarias = construir_indice_de_culinarias(df)
+    return {
+        'melhores_todas': melhores_por_culinaria(df, culinarias),
+        'culinarias': culinarias,
+        'indice': construir_indice_de_filtros(df),
+        # grade das coordenadas, para as consultas de proximidade (página Nearby)
+        'espacial': construir_indice_espacial(df),
+        # grupos de restaurantes por zoom, para o mapa interativo (Main Page)
+        'ladrilhos': construir_indice_de_ladrilhos(df),
+    }
+
+def _atualizar_estruturas(estruturas, df, removidas, adicionadas, posicoes):
+
+    # as mesmas estruturas de _construir_estruturas ajustadas com as linhas do delta
+    culinarias = atualizar_indice_de_culinarias(estruturas['culinarias'], df, posicoes)
+    return {
+        'melhores_todas': atualizar_melhores_de_todas(estruturas['melhores_todas'], df, culinarias, removidas, posicoes),
+        'culinarias': culinarias,
+        'indice': atualizar_indice_de_filtros(estruturas['indice'], df, posicoes),
+        'espacial': atualizar_indice_espacial(estruturas['espacial'], df, posicoes),
+        'ladrilhos': atualizar_indice_de_ladrilhos(estruturas['ladrilhos'], removidas, adicionadas),
+    }
+
+def _nova_versao(base, deltas, taxas, df, cubo, melhores, estruturas):
+
+    h = hashlib.sha1(base.encode())
+    for _, digital in deltas:
+        h.update(digital.encode())
+    versao = h.hexdigest()
+    return {
+        'versao': versao,
+        'deltas': tuple(deltas),
+        # as taxas ativas, lidas do disco uma única vez, junto com o dataset
+        'taxas': taxas,
+        'df': df,
+        'cubo': cubo,
+        # o que os gráficos consultam: o próprio cubo (pandas) ou um banco desta versão (sqlite)
+        'fonte': preparar_fonte(backend_configurado(), df, cubo, versao, estruturas['culinarias']),
+        'paises': sorted(df['country'].unique()),
+        'melhores': melhores,
+        **estruturas,
+    }
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _estado_base(caminho_csv, caminho_taxas, versao_base):
+
+    # as taxas são conferidas antes de tudo: uma versão sem alguma moeda do dataset ou da
+    # barra lateral é recusada aqui, com a moeda que falta, e não na primeira conversão
+    taxas = ler_taxas(caminho_taxas)
+    df = construir_snapshot(caminho_csv, caminho_taxas)
+    inicial = _nova_versao(versao_base, [], taxas, df, construir_cubo(df), construir_melhores_por_culinaria(df), _construir_estruturas(df))
+    aquecer_em_segundo_plano(inicial['fonte'], inicial['paises'], inicial['versao'], taxas)
+    remover_exportacoes_antigas(inicial['versao'])
+    return {'trava': threading.Lock(), 'base': versao_base, 'inicial': inicial, 'atual': inicial, 'taxas': taxas}
+
+def _aplicar(estado, versao, deltas):
+
+    taxas_cambio = estado['taxas']
+    df, cubo, melhores = versao['df'], versao['cubo'], versao['melhores']
+    estruturas = {chave: versao[chave] for chave in ('melhores_todas', 'culinarias', 'indice', 'espacial', 'ladrilhos')}
+    for caminho, _ in deltas:
+        ids, novas = ler_delta(caminho, taxas_cambio)
+        anterior = df
+        df, removidas, adicionadas = aplicar_delta(df, ids, novas)
+        cubo = atualizar_cubo(cubo, removidas, adicionadas)
+        melhores = atualizar_melhores_por_culinaria(melhores, df, removidas, adicionadas)
+        estruturas = _atualizar_estruturas(estruturas, df, removidas, adicionadas, posicoes_do_delta(anterior, removidas, adicionadas))
+
+    # mantém as dimensões do cubo com as mesmas categorias do dataframe
+    for dimensao in DIMENSOES:
+        cubo[dimensao] = cubo[dimensao].astype(df[dimensao].dtype)
+    return _nova_versao(estado['base'], list(versao['deltas']) + list(deltas), taxas_cambio, df, cubo, melhores, estruturas)
+
+def _estado(caminho_csv=CAMINHO_CSV, caminho_taxas=None):
+    caminho_taxas = caminho_taxas or caminho_taxas_ativas()
+    return _estado_base(caminho_csv, caminho_taxas, impressao_digital(caminho_csv, caminho_taxas))
+
+def estado_atual(caminho_csv=CAMINHO_CSV, caminho_taxas=None):
+
+    # a versão atual do dataset: 'versao' (identifica o dataset nas chaves dos caches),
+    # 'df', 'cubo', 'fonte', 'paises', 'taxas', 'melhores' (pela culinária principal),
+    # 'melhores_todas' (por qualquer culinária da lista), 'culinarias', 'indice',
+    # 'espacial' e 'ladrilhos'
+    estado = _estado(caminho_csv, caminho_taxas)
+    deltas = listar_deltas()
+    if tuple(deltas) == estado['atual']['deltas']:
+        return estado['atual']
+
+    with estado['trava']:
+        atual = estado['atual']
+        aplicados = list(atual['deltas'])
+        if deltas[:len(aplicados)] != aplicados:
+            # um delta já aplicado mudou ou sumiu: recomeça do dataset base
+            atual, aplicados = estado['inicial'], []
+        if len(deltas) > len(aplicados):
+            atual = _aplicar(estado, atual, deltas[len(aplicados):])
+            aquecer_em_segundo_plano(atual['fonte'], atual['paises'], atual['versao'], estado['taxas'])
+        if atual['versao'] != estado['atual']['versao']:
+            remover_exportacoes_antigas(atual['versao'])
+        estado['atual'] = atual
+    return atual
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _valores_na_moeda(versao, moeda, _atual):
+    # _atual (com '_' no nome, fica fora da chave do cache) é o estado da versão da chave
+    return converter_custos(_atual['df'], _atual['taxas'], moeda)
+
+def valores_na_moeda(estado, moeda):
+    # custo para dois convertido para a moeda escolhida, calculado uma vez por versão do
+    # dataset e moeda; trocar a moeda na barra lateral não refaz a limpeza dos dados
+    return _valores_na_moeda(estado['versao'], moeda, estado)
@@ -0,0 +1,133 @@
+import contextlib
+import gzip
+import hashlib
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fome_zero.dados import RAIZ
+
+# EXPORTAÇÃO DOS DADOS TRATADOS:
+# O arquivo só é gerado quando alguém pede o download e fica salvo em disco com um nome
+# derivado do filtro, do formato e da versão do dataset, então pedidos repetidos
+# reaproveitam o arquivo. A escrita é feita em blocos de linhas, sem montar a string do
+# CSV inteiro na memória ao lado do dataframe.
+#
+# O download_button lê o arquivo inteiro para a memória, então a página só monta o botão
+# na execução do clique em "Preparar download"; o disco evita gerar o mesmo arquivo de
+# novo. Para a pasta não crescer sem limite, os arquivos de versões anteriores do
+# dataset são apagados quando uma versão nova é publicada (estado.py) e, passando de
+# LIMITE_BYTES, os usados há mais tempo saem primeiro.
+
+PASTA_EXPORTACOES = os.path.join(RAIZ, "dataset", "cache", "exportacoes")
+LIMITE_BYTES = 512 * 1024 ** 2
+
+# nome exibido -> (extensão, tipo MIME)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV compactado (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+TAMANHO_BLOCO = 50_000
+
+def _blocos(df, tamanho_bloco):
+    for inicio in range(0, max(len(df), 1), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+def _para_csv(bloco):
+    # as colunas has_* são bool na memória; no CSV continuam 0/1 como no dataset original
+    booleanas = bloco.select_dtypes(include='bool').columns
+    if len(booleanas):
+        bloco = bloco.astype({coluna: 'int8' for coluna in booleanas})
+    return bloco
+
+def escrever_csv(df, arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    for i, bloco in enumerate(_blocos(df, tamanho_bloco)):
+        _para_csv(bloco).to_csv(arquivo, header=(i == 0), index=False)
+
+def escrever_parquet(df, caminho, tamanho_bloco=TAMANHO_BLOCO):
+
+    escritor = None
+    try:
+        for bloco in _blocos(df, tamanho_bloco):
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+def escrever_exportacao(df, formato, caminho, tamanho_bloco=TAMANHO_BLOCO):
+
+    extensao, _ = FORMATOS[formato]
+    if extensao == 'csv':
+        with open(caminho, 'w', newline='', encoding='utf-8') as f:
+            escrever_csv(df, f, tamanho_bloco)
+    elif extensao == 'csv.gz':
+        with gzip.open(caminho, 'wt', newline='', encoding='utf-8') as f:
+            escrever_csv(df, f, tamanho_bloco)
+    else:
+        escrever_parquet(df, caminho, tamanho_bloco)
+
+def _prefixo(versao):
+    return f"restaurantes_{versao[:16]}_"
+
+def caminho_exportacao(formato, paises, versao, pasta=PASTA_EXPORTACOES):
+
+    chave = f"{versao};{formato};{'|'.join(sorted(paises))}"
+    nome = hashlib.sha1(chave.encode()).hexdigest()[:16]
+    extensao, _ = FORMATOS[formato]
+    return os.path.join(pasta, f"{_prefixo(versao)}{nome}.{extensao}")
+
+def _exportacoes(pasta):
+
+    # (caminho, bytes, último uso) dos arquivos prontos; os .tmp ainda estão sendo escritos
+    arquivos = []
+    with contextlib.suppress(FileNotFoundError):
+        for entrada in os.scandir(pasta):
+            if entrada.name.startswith('restaurantes_') and not entrada.name.endswith('.tmp'):
+                with contextlib.suppress(OSError):
+                    estado = entrada.stat()
+                    arquivos.append((entrada.path, estado.st_size, estado.st_mtime))
+    return arquivos
+
+def remover_exportacoes_antigas(versao, pasta=PASTA_EXPORTACOES):
+    for caminho, _, _ in _exportacoes(pasta):
+        if not os.path.basename(caminho).startswith(_prefixo(versao)):
+            with contextlib.suppress(OSError):
+                os.remove(caminho)
+
+def limitar_exportacoes(manter, pasta=PASTA_EXPORTACOES, limite=LIMITE_BYTES):
+
+    # dos usados mais recentemente para os mais antigos; manter (o do pedido atual) fica
+    total = 0
+    for caminho, tamanho, _ in sorted(_exportacoes(pasta), key=lambda arquivo: (arquivo[0] != manter, -arquivo[2])):
+        total += tamanho
+        if total > limite and caminho != manter:
+            with contextlib.suppress(OSError):
+                os.remove(caminho)
+
+def gerar_exportacao(df, formato, paises, versao, pasta=PASTA_EXPORTACOES):
+
+    # df já deve estar filtrado pelos paises; eles e a versao só identificam o arquivo
+    caminho = caminho_exportacao(formato, paises, versao, pasta)
+    if os.path.exists(caminho):
+        # conta como usado agora
+        with contextlib.suppress(OSError):
+            os.utime(caminho)
+        return caminho
+
+    os.makedirs(pasta, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    escrever_exportacao(df, formato, temporario)
+    os.replace(temporario, caminho)
+    limitar_exportacoes(caminho, pasta)
+    return caminho
+
+def nome_do_arquivo(formato):
+    extensao, _ = FORMATOS[formato]
+    return f"restaurantes_dados.{extensao}"
@@ -0,0 +1,109 @@
+import collections
+import json
+import threading
+
+import streamlit as st
+
+from fome_zero.medicao import contar, marcar
+
+# CACHE DE FIGURAS:
+# Cada gráfico é guardado já serializado (o JSON que o st.plotly_chart enviaria ao
+# navegador), com a chave (gráfico, parâmetros, versão do dataset). Em um acerto a página
+# não consulta os dados, não monta a figura do plotly e não serializa nada: o JSON guardado é
+# enviado direto. O cache é do processo (compartilhado entre sessões), limitado a
+# MAX_FIGURAS entradas e descarta a usada há mais tempo quando enche.
+#
+# O plotly.express (e o que o plotly.io puxa junto) só é importado quando uma figura
+# precisa ser montada: com o cache aquecido o processo do servidor nem chega a carregá-lo.
+#
+# O envio do JSON pronto usa partes internas do streamlit (o proto do elemento e
+# st._main._enqueue), conferidas só nas versões de VERSOES_ENVIO_DIRETO. Em qualquer
+# outra versão, ou se essas partes não existirem, o cache não é usado e o gráfico é
+# montado e enviado pelo st.plotly_chart. Refazer a figura a partir do JSON não serve:
+# a validação do plotly troca os números das listas por textos (ex.: o text das barras).
+
+MAX_FIGURAS = 512
+VERSOES_ENVIO_DIRETO = ('1.32',)
+
+_figuras = collections.OrderedDict()
+_trava = threading.Lock()
+
+def _obter(chave):
+    with _trava:
+        spec = _figuras.get(chave)
+        if spec is not None:
+            _figuras.move_to_end(chave)
+        return spec
+
+def publicar_figura(chave, spec):
+    with _trava:
+        _figuras[chave] = spec
+        _figuras.move_to_end(chave)
+        while len(_figuras) > MAX_FIGURAS:
+            _figuras.popitem(last=False)
+
+def limpar_figuras():
+    with _trava:
+        _figuras.clear()
+
+def chave_figura(grafico, versao, parametros):
+    # a ordem dos países escolhidos não muda os gráficos (as consultas filtram por conjunto)
+    normalizados = {nome: tuple(sorted(valor)) if isinstance(valor, (list, tuple)) else valor for nome, valor in parametros.items()}
+    return (grafico, tuple(sorted(normalizados.items())), versao)
+
+def _montar_figura(grafico, fonte, parametros):
+    from fome_zero.graficos import GRAFICOS
+    return GRAFICOS[grafico](fonte, **parametros)
+
+def construir_figura(grafico, fonte, parametros):
+    import plotly.io
+    return plotly.io.to_json(_montar_figura(grafico, fonte, parametros), validate=False)
+
+def _proto_do_grafico():
+
+    # a classe do proto do st.plotly_chart, ou None quando o envio direto não é seguro
+    if '.'.join(st.__version__.split('.')[:2]) not in VERSOES_ENVIO_DIRETO:
+        return None
+    try:
+        from streamlit.proto.PlotlyChart_pb2 import PlotlyChart
+    except ImportError:
+        return None
+    campos = {campo.name for campo in PlotlyChart.DESCRIPTOR.fields}
+    if not {'figure', 'use_container_width', 'theme'} <= campos or not hasattr(getattr(st, '_main', None), '_enqueue'):
+        return None
+    return PlotlyChart
+
+_PlotlyChartProto = _proto_do_grafico()
+
+def _enviar(spec, use_container_width):
+
+    # o mesmo elemento que o st.plotly_chart monta, mas a partir do JSON pronto: a API
+    # pública sempre serializa a figura de novo
+    proto = _PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.figure.spec = spec
+    proto.figure.config = json.dumps({'showLink': False, 'linkText': False})
+    proto.theme = 'streamlit'
+    st._main._enqueue('plotly_chart', proto)
+
+def exibir_grafico(grafico, versao, fonte, use_container_width=True, **parametros):
+
+    if _PlotlyChartProto is None:
+        st.plotly_chart(_montar_figura(grafico, fonte, parametros), use_container_width=use_container_width)
+        marcar(f'plotly_chart: {grafico}')
+        return
+
+    # a figura (consulta + px.bar + estilo, em graficos.py) só é montada quando não está no cache
+    chave = chave_figura(grafico, versao, parametros)
+    spec = _obter(chave)
+    if spec is None:
+        contar('figuras: falhas')
+        spec = construir_figura(grafico, fonte, parametros)
+        publicar_figura(chave, spec)
+        marcar(f'figura: {grafico}')
+    else:
+        contar('figuras: acertos')
+        marcar(f'figura (cache): {grafico}')
+
+    _enviar(spec, use_container_width)
+    marcar(f'plotly_chart: {grafico}')
@@ -0,0 +1,217 @@
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fome_zero.dados import CAMINHO_CSV
+
+# GERADOR DE DATASETS SINTÉTICOS:
+# Gera arquivos com as mesmas 21 colunas do zomato.csv e distribuições aprendidas dele,
+# para testes de carga e de escala. Para cada linha:
+#   - o país é sorteado com a frequência real;
+#   - cidade e culinária são sorteadas com a frequência real dentro do país;
+#   - latitude/longitude saem de uma normal em torno do centro da cidade;
+#   - endereço e bairro vêm de um restaurante real da mesma cidade;
+#   - moeda, custo, faixa de preço, flags, nota, cor e texto da nota e votos vêm juntos de
+#     um restaurante real do mesmo país (são correlacionados entre si).
+# Uma fração das linhas é cópia exata de outra linha do mesmo bloco, como as duplicatas
+# do arquivo original (~7,8%).
+#
+# Os blocos são gerados de forma independente, cada um com a semente derivada de
+# (semente, número do bloco), então o resultado é o mesmo com qualquer número de processos.
+
+COLUNAS = ['Restaurant ID', 'Restaurant Name', 'Country Code', 'City', 'Address', 'Locality', 'Locality Verbose',
+           'Longitude', 'Latitude', 'Cuisines', 'Average Cost for two', 'Currency', 'Has Table booking',
+           'Has Online delivery', 'Is delivering now', 'Switch to order menu', 'Price range', 'Aggregate rating',
+           'Rating color', 'Rating text', 'Votes']
+
+# colunas copiadas juntas de um restaurante real do mesmo país
+COLUNAS_DO_MODELO = ['Restaurant Name', 'Average Cost for two', 'Currency', 'Has Table booking', 'Has Online delivery',
+                     'Is delivering now', 'Switch to order menu', 'Price range', 'Aggregate rating', 'Rating color',
+                     'Rating text', 'Votes']
+
+COLUNAS_DO_LOCAL = ['Address', 'Locality', 'Locality Verbose']
+
+TAMANHO_BLOCO = 100_000
+TAXA_DUPLICATAS = 0.078
+# desvio mínimo das coordenadas em torno do centro da cidade (graus, ~1 km)
+DESVIO_MINIMO = 0.01
+# ids distintos entre blocos, mesmo com blocos de tamanhos diferentes
+TAMANHO_ID_BLOCO = 10_000_000
+
+def _frequencias(serie):
+    contagem = serie.value_counts()
+    return contagem.index.to_numpy(), (contagem / contagem.sum()).to_numpy()
+
+def construir_modelo(caminho_csv=CAMINHO_CSV):
+
+    real = pd.read_csv(caminho_csv).dropna(subset=['Cuisines']).drop_duplicates().reset_index(drop=True)
+    paises, prob_paises = _frequencias(real['Country Code'])
+
+    por_pais = {}
+    for pais, grupo in real.groupby('Country Code'):
+        cidades, prob_cidades = _frequencias(grupo['City'])
+        culinarias, prob_culinarias = _frequencias(grupo['Cuisines'])
+        por_pais[pais] = {
+            'modelos': grupo.index.to_numpy(),
+            'cidades': cidades,
+            'prob_cidades': prob_cidades,
+            'culinarias': culinarias,
+            'prob_culinarias': prob_culinarias,
+        }
+
+    por_cidade = {}
+    for cidade, grupo in real.groupby('City'):
+        por_cidade[cidade] = {
+            'linhas': grupo.index.to_numpy(),
+            'centro': grupo[['Latitude', 'Longitude']].median().to_numpy(),
+            'desvio': np.maximum(grupo[['Latitude', 'Longitude']].std().fillna(0).to_numpy(), DESVIO_MINIMO),
+        }
+
+    return {'real': real, 'paises': paises, 'prob_paises': prob_paises, 'por_pais': por_pais, 'por_cidade': por_cidade}
+
+def gerar_bloco(modelo, indice_bloco, linhas, semente, taxa_duplicatas=TAXA_DUPLICATAS, primeiro_id=1):
+
+    rng = np.random.default_rng([semente, indice_bloco])
+    real = modelo['real']
+
+    paises = rng.choice(modelo['paises'], size=linhas, p=modelo['prob_paises'])
+    modelos = np.empty(linhas, dtype=np.int64)
+    cidades = np.empty(linhas, dtype=object)
+    culinarias = np.empty(linhas, dtype=object)
+    for pais in np.unique(paises):
+        posicoes = np.flatnonzero(paises == pais)
+        info = modelo['por_pais'][pais]
+        modelos[posicoes] = rng.choice(info['modelos'], size=len(posicoes))
+        cidades[posicoes] = rng.choice(info['cidades'], size=len(posicoes), p=info['prob_cidades'])
+        culinarias[posicoes] = rng.choice(info['culinarias'], size=len(posicoes), p=info['prob_culinarias'])
+
+    coordenadas = np.empty((linhas, 2))
+    locais = np.empty(linhas, dtype=np.int64)
+    for cidade in np.unique(cidades):
+        posicoes = np.flatnonzero(cidades == cidade)
+        info = modelo['por_cidade'][cidade]
+        coordenadas[posicoes] = info['centro'] + info['desvio'] * rng.standard_normal((len(posicoes), 2))
+        locais[posicoes] = rng.choice(info['linhas'], size=len(posicoes))
+
+    bloco = real.loc[modelos, COLUNAS_DO_MODELO].reset_index(drop=True)
+    bloco[COLUNAS_DO_LOCAL] = real.loc[locais, COLUNAS_DO_LOCAL].to_numpy()
+    bloco['Restaurant ID'] = primeiro_id + indice_bloco * TAMANHO_ID_BLOCO + np.arange(linhas)
+    bloco['Country Code'] = paises
+    bloco['City'] = cidades
+    bloco['Cuisines'] = culinarias
+    bloco['Latitude'] = np.round(coordenadas[:, 0], 7)
+    bloco['Longitude'] = np.round(coordenadas[:, 1], 7)
+    # votos variam um pouco em torno do restaurante de modelo
+    bloco['Votes'] = np.round(bloco['Votes'].to_numpy() * rng.lognormal(0, 0.2, linhas)).astype(np.int64)
+    bloco = bloco[COLUNAS]
+
+    # duplicatas: cada linha escolhida vira cópia exata de outra linha do bloco
+    quantidade = int(round(taxa_duplicatas * linhas))
+    if quantidade and linhas > 1:
+        destinos = rng.choice(np.arange(1, linhas), size=min(quantidade, linhas - 1), replace=False)
+        # as origens nunca são sobrescritas, senão a cópia não teria par no arquivo
+        origens = rng.choice(np.setdiff1d(np.arange(linhas), destinos), size=len(destinos))
+        bloco.iloc[destinos] = bloco.iloc[origens].to_numpy()
+        bloco = bloco.astype({coluna: real[coluna].dtype for coluna in COLUNAS if coluna in real.columns and coluna != 'Votes'})
+
+    return bloco
+
+def gerar_dataframe(modelo, linhas, semente=0, taxa_duplicatas=TAXA_DUPLICATAS, tamanho_bloco=TAMANHO_BLOCO):
+    # versão em memória, para datasets que cabem na RAM (ex.: benchmarks)
+    blocos = [gerar_bloco(modelo, i, min(tamanho_bloco, linhas - inicio), semente, taxa_duplicatas)
+              for i, inicio in enumerate(range(0, linhas, tamanho_bloco))]
+    return pd.concat(blocos, ignore_index=True)
+
+# GERAÇÃO EM PARALELO:
+
+_MODELO = None
+
+def _iniciar_processo(caminho_csv):
+    global _MODELO
+    _MODELO = construir_modelo(caminho_csv)
+
+def _gerar_no_processo(indice_bloco, linhas, semente, taxa_duplicatas):
+    return gerar_bloco(_MODELO, indice_bloco, linhas, semente, taxa_duplicatas)
+
+def _blocos_em_ordem(linhas, semente, taxa_duplicatas, tamanho_bloco, processos, caminho_csv):
+
+    tarefas = [(i, min(tamanho_bloco, linhas - inicio)) for i, inicio in enumerate(range(0, linhas, tamanho_bloco))]
+    if processos <= 1:
+        modelo = construir_modelo(caminho_csv)
+        for i, n in tarefas:
+            yield gerar_bloco(modelo, i, n, semente, taxa_duplicatas)
+        return
+
+    # no máximo 2 blocos por processo em andamento: a memória não cresce com o total de linhas
+    with concurrent.futures.ProcessPoolExecutor(processos, initializer=_iniciar_processo, initargs=(caminho_csv,)) as executor:
+        pendentes = collections.deque()
+        tarefas = iter(tarefas)
+        for i, n in tarefas:
+            pendentes.append(executor.submit(_gerar_no_processo, i, n, semente, taxa_duplicatas))
+            if len(pendentes) >= 2 * processos:
+                break
+        while pendentes:
+            bloco = pendentes.popleft().result()
+            for i, n in tarefas:
+                pendentes.append(executor.submit(_gerar_no_processo, i, n, semente, taxa_duplicatas))
+                break
+            yield bloco
+
+def gerar_arquivo(saida, linhas, semente=0, taxa_duplicatas=TAXA_DUPLICATAS, tamanho_bloco=TAMANHO_BLOCO, processos=1, caminho_csv=CAMINHO_CSV):
+
+    formato = 'parquet' if saida.endswith('.parquet') else 'csv'
+    temporario = f"{saida}.{os.getpid()}.tmp"
+    abrir = gzip.open if saida.endswith('.gz') else open
+    escritor = arquivo = None
+    try:
+        try:
+            if formato == 'csv':
+                arquivo = abrir(temporario, 'wt', newline='', encoding='utf-8')
+            for i, bloco in enumerate(_blocos_em_ordem(linhas, semente, taxa_duplicatas, tamanho_bloco, processos, caminho_csv)):
+                if formato == 'csv':
+                    bloco.to_csv(arquivo, header=(i == 0), index=False)
+                else:
+                    tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                    if escritor is None:
+                        esquema = tabela.schema
+                        escritor = pq.ParquetWriter(temporario, esquema)
+                    escritor.write_table(tabela.cast(esquema))
+        finally:
+            if arquivo is not None:
+                arquivo.close()
+            if escritor is not None:
+                escritor.close()
+    except BaseException:
+        # inclusive com Ctrl+C: o arquivo pela metade não fica na pasta
+        with contextlib.suppress(OSError):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, saida)
+    return saida
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Gera um dataset sintético no formato do zomato.csv')
+    parser.add_argument('saida', help='arquivo de saída: .csv, .csv.gz ou .parquet')
+    parser.add_argument('--linhas', type=int, required=True)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--duplicatas', type=float, default=TAXA_DUPLICATAS, help='fração de linhas duplicadas (padrão: a do zomato.csv)')
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO)
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--origem', default=CAMINHO_CSV, help='CSV real de onde as distribuições são aprendidas')
+    args = parser.parse_args()
+
+    if args.bloco > TAMANHO_ID_BLOCO:
+        parser.error(f'--bloco deve ser no máximo {TAMANHO_ID_BLOCO}')
+    print(gerar_arquivo(args.saida, args.linhas, args.semente, args.duplicatas, args.bloco, args.processos, args.origem))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+import plotly.express as px
+
+from fome_zero.cambio import simbolo
+from fome_zero.consultas import cidades_com_mais_culinarias, cidades_com_mais_restaurantes, cidades_com_nota_abaixo_de_2_5, cidades_com_nota_acima_de_4, cidades_por_pais, media_nota_por_culinaria, media_preco_por_pais, media_votos_por_pais, restaurantes_por_pais
+from fome_zero.medicao import marcar
+
+# GRÁFICOS DAS PÁGINAS:
+# Cada função consulta a fonte dos dados (consultas.py) e monta uma figura do plotly. Ficam fora das páginas para que
+# o cache de figuras (figuras.py) e o aquecimento (aquecimento.py, em outros processos)
+# montem exatamente o mesmo gráfico a partir do nome e dos parâmetros.
+
+# VISÃO PAÍSES:
+
+def figura_restaurantes_por_pais(fonte, paises):
+
+    df_country_count = restaurantes_por_pais(fonte, paises)
+    marcar('agregacao: restaurantes_por_pais')
+
+    fig = px.bar(df_country_count,x='country',y='restaurant_id',title='Quantidade de Restaurantes registrados por país:', color_discrete_sequence=['#3B738F'] , labels={'country':'Países','restaurant_id':'Quantidade de Restaurantes'} , text='restaurant_id' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text}')
+    fig.update_layout(title={
+        'text' : 'Quantidade de Restaurantes por País',
+        'y': 0.9,
+        'x': 0.35
+        },
+        plot_bgcolor="#262730"
+    )
+
+    return fig
+
+def figura_cidades_por_pais(fonte, paises):
+
+    df_aux1 = cidades_por_pais(fonte, paises)
+    marcar('agregacao: cidades_por_pais')
+
+    fig = px.bar(df_aux1,x='country',y='city', color_discrete_sequence=['#3B738F'],labels={'country':'Países','city':'Quantidade de Cidades Cadastradas'} , text='city' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_layout(title={
+            'text' : 'Quantidade de Cidades por País',
+            'y': 1,
+            'x': 0.35
+            },
+            plot_bgcolor="#262730"
+            )
+    fig.update_traces(textposition='inside',texttemplate='%{text}')
+
+    return fig
+
+def figura_media_votos_por_pais(fonte, paises):
+
+    df_aux = media_votos_por_pais(fonte, paises)
+    marcar('agregacao: media_votos_por_pais')
+
+    fig = px.bar(df_aux , x='country' , y='votes' , color_discrete_sequence=['#3B738F'] , labels={'country':'Países','votes':'Avaliações Médias por País'} , text='votes' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text:.3s}')
+    fig.update_layout(title={
+        'text' : 'Média de Avaliações Feitas por País',
+        'y': 1,
+        'x': 0.15
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+def figura_media_preco_por_pais(fonte, paises, moeda, fator):
+
+    # a consulta soma os preços em dólar; a média só é reescalada para a moeda escolhida
+    df_aux = media_preco_por_pais(fonte, paises)
+    df_aux['valor_unificado'] = df_aux['valor_unificado'] * fator
+    marcar('agregacao: media_preco_por_pais')
+
+    fig = px.bar( df_aux,x='country' , y='valor_unificado' , color_discrete_sequence=['#3B738F'] , labels={'country':'Países','valor_unificado':'Preço Médio de um prato para dois'},text='valor_unificado', template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate=f'{simbolo(moeda)} %{{text:.3s}}')
+    fig.update_layout(title={
+        'text' : 'Média de um Prato para dois por País',
+        'y': 1,
+        'x': 0.15
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+# VISÃO CIDADES:
+
+def figura_cidades_com_mais_restaurantes(fonte, paises):
+
+    df_aux = cidades_com_mais_restaurantes(fonte, paises)
+    df_aux = df_aux.head(10)
+    marcar('agregacao: cidades_com_mais_restaurantes')
+
+    fig = px.bar(df_aux , x='city' , y='restaurant_id' , color='country',color_discrete_sequence=px.colors.diverging.Earth_r , labels={'city':'Cidades','restaurant_id':'Restaurantes'} , text='restaurant_id' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text}')
+    fig.update_layout(title={
+        'text' : 'Top10 CIdades com mais Restaurantes Registrados',
+        'y': 1,
+        'x': 0.18
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+def figura_cidades_com_nota_acima_de_4(fonte, paises):
+
+    df_aux = cidades_com_nota_acima_de_4(fonte, paises)
+    df_aux = df_aux.head(10)
+    marcar('agregacao: cidades_com_nota_acima_de_4')
+
+    fig = px.bar(df_aux , x='city' , y='aggregate_rating' , color='country', color_discrete_sequence=px.colors.diverging.Earth_r , labels={'city':'Cidades','aggregate_rating':'Restaurantes com nota > 4'} , text='aggregate_rating' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text}')
+    fig.update_layout(title={
+        'text' : 'Restaurantes com nota Acima de 4',
+        'y': 1,
+        'x': 0.05
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+def figura_cidades_com_nota_abaixo_de_2_5(fonte, paises):
+
+    # restaurantes sem nenhum voto não entram na contagem
+    df_aux = cidades_com_nota_abaixo_de_2_5(fonte, paises)
+    df_aux = df_aux.head(10)
+    marcar('agregacao: cidades_com_nota_abaixo_de_2_5')
+
+    fig = px.bar(df_aux , x='city' , y='aggregate_rating' , color='country', color_discrete_sequence=px.colors.diverging.Earth_r , labels={'city':'Cidades','aggregate_rating':'Restaurantes com nota < 2.5'} , text='aggregate_rating' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text}')
+    fig.update_layout(title={
+        'text' : 'Restaurantes com nota Abaixo de 2.5',
+        'y': 1,
+        'x': 0.01
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+def figura_cidades_com_mais_culinarias(fonte, paises, todas=False):
+
+    # todas=True conta todas as culinárias de cada restaurante, não só a principal
+    df_aux = cidades_com_mais_culinarias(fonte, paises, todas)
+    df_aux = df_aux.head(10)
+    marcar('agregacao: cidades_com_mais_culinarias')
+
+    fig = px.bar(df_aux,x='city',y='cuisines', color='country' ,color_discrete_sequence=px.colors.diverging.Earth_r , labels={'city':'cidades','cuisines':'Quantidade de Tipos Culinários'} , text='cuisines' , template='plotly_dark')
+    fig.update_yaxes(showticklabels=False)
+    fig.update_layout(title={
+            'text' : 'Top10 Cidades com mais Tipos Distintos de Culinária',
+            'y': 1,
+            'x': 0.18
+            },
+            plot_bgcolor="#262730"
+            )
+    fig.update_traces(textposition='inside',texttemplate='%{text}')
+
+    return fig
+
+# VISÃO CULINÁRIAS:
+
+def figura_melhores_culinarias(fonte, quantidade, todas=False):
+
+    df_aux = media_nota_por_culinaria(fonte, ascending=False, todas=todas)
+    df_aux = df_aux.head(quantidade)
+    marcar('agregacao: melhores_culinarias')
+
+    fig = px.bar(df_aux,x='cuisines',y='aggregate_rating',color_discrete_sequence=['#3B738F'],labels={'cuisines':'Tipos de Culinária','aggregate_rating':'Culinárias com as Melhores Notas'} , text='aggregate_rating' , template='plotly_dark') 
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text:.2s}')
+    fig.update_layout(title={
+        'text' : 'Tipos Culinários com as Melhores Notas',
+        'y': 1,
+        'x': 0.15
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+def figura_piores_culinarias(fonte, quantidade, todas=False):
+
+    df_aux = media_nota_por_culinaria(fonte, excluir=['Drinks Only', 'Mineira'], ascending=True, todas=todas)
+
+    df_aux = df_aux.head(quantidade)
+    marcar('agregacao: piores_culinarias')
+
+    fig = px.bar(df_aux,x='cuisines',y='aggregate_rating',color_discrete_sequence=['#3B738F'],labels={'cuisines':'Tipos de Culinária','aggregate_rating':'Culinárias com as Piores Notas'} , text='aggregate_rating' , template='plotly_dark') 
+    fig.update_yaxes(showticklabels=False)
+    fig.update_traces(textposition='inside',texttemplate='%{text:.2s}')
+    fig.update_layout(title={
+        'text' : 'Tipos Culinários com as Piores Notas',
+        'y': 1,
+        'x': 0.15
+        },
+        plot_bgcolor="#262730"
+        )
+
+    return fig
+
+# nome usado nas chaves do cache de figuras -> função que monta o gráfico
+GRAFICOS = {
+    'restaurantes_por_pais': figura_restaurantes_por_pais,
+    'cidades_por_pais': figura_cidades_por_pais,
+    'media_votos_por_pais': figura_media_votos_por_pais,
+    'media_preco_por_pais': figura_media_preco_por_pais,
+    'cidades_com_mais_restaurantes': figura_cidades_com_mais_restaurantes,
+    'cidades_com_nota_acima_de_4': figura_cidades_com_nota_acima_de_4,
+    'cidades_com_nota_abaixo_de_2_5': figura_cidades_com_nota_abaixo_de_2_5,
+    'cidades_com_mais_culinarias': figura_cidades_com_mais_culinarias,
+    'melhores_culinarias': figura_melhores_culinarias,
+    'piores_culinarias': figura_piores_culinarias,
+}
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# ÍNDICES PRÉ-CALCULADOS SOBRE O DATAFRAME TRATADO
+
+# MELHOR RESTAURANTE POR CULINÁRIA:
+# Uma única ordenação do dataframe inteiro; a primeira linha de cada culinária é a de
+# maior nota e, no empate, a de menor restaurant_id.
+
+def construir_melhores_por_culinaria(df):
+
+    melhores = (df.loc[:, ['cuisines', 'restaurant_id', 'restaurant_name', 'aggregate_rating']]
+                  .sort_values(by=['aggregate_rating', 'restaurant_id'], ascending=[False, True], kind='stable')
+                  .drop_duplicates(subset='cuisines', keep='first'))
+    return melhores.set_index('cuisines').sort_index()
+
+def atualizar_melhores_por_culinaria(melhores, df, removidas, adicionadas):
+
+    # df já é o dataframe atualizado. Só as culinárias que perderam o seu melhor
+    # restaurante precisam ser recalculadas a partir dele; as demais só disputam
+    # com as linhas novas.
+    perdidas = melhores.loc[melhores['restaurant_id'].isin(removidas['restaurant_id'])].index
+    candidatas = [melhores.drop(index=perdidas).reset_index(), adicionadas]
+    if len(perdidas):
+        candidatas.append(df.loc[df['cuisines'].isin(perdidas)])
+    candidatas = pd.concat([c.loc[:, ['cuisines', 'restaurant_id', 'restaurant_name', 'aggregate_rating']] for c in candidatas], ignore_index=True)
+    return construir_melhores_por_culinaria(candidatas)
+
+def melhores_das_culinarias(melhores, culinarias):
+    # na ordem em que foram escolhidas; culinárias sem nenhum restaurante são ignoradas
+    return melhores.loc[[culinaria for culinaria in culinarias if culinaria in melhores.index]]
+
+# ÍNDICE DE FILTROS:
+# Para cada coluna filtrável guarda as posições das linhas de cada valor, agrupadas e
+# ordenadas (no estilo CSR): posicoes[deslocamentos[i]:deslocamentos[i + 1]] são as
+# linhas da categoria i. Uma seleção vira união das listas dos valores escolhidos e
+# interseção entre colunas, seguidas de um único take no dataframe.
+
+COLUNAS_FILTRAVEIS = ('country', 'city', 'cuisines')
+
+def indexar_coluna(coluna):
+
+    categorias = coluna.cat.categories
+    codigos = coluna.cat.codes.to_numpy()
+    # a ordenação estável mantém as posições de cada categoria em ordem crescente
+    posicoes = np.argsort(codigos, kind='stable').astype(np.int64)
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(categorias))
+    deslocamentos = np.zeros(len(categorias) + 1, dtype=np.int64)
+    np.cumsum(contagens, out=deslocamentos[1:])
+    # códigos -1 (valores ausentes) ficam no começo e são pulados
+    posicoes = posicoes[len(codigos) - deslocamentos[-1]:]
+    return {'categorias': categorias, 'deslocamentos': deslocamentos, 'posicoes': posicoes}
+
+def atualizar_coluna_indexada(entrada, categorias, mapa, codigos, posicoes):
+
+    # a entrada de indexar_coluna depois de um delta: mapa leva as posições antigas às
+    # novas (-1 para as que saíram) e (codigos, posicoes) são as linhas novas, todas
+    # depois das que ficam. As categorias novas contêm as antigas na mesma ordem
+    # (unir_categorias ordena), então os grupos continuam em ordem e as linhas novas de
+    # cada categoria só entram no final do seu grupo, sem reordenar nada.
+    recodificar = categorias.get_indexer(entrada['categorias'])
+    ficam = mapa[entrada['posicoes']]
+    vivas = ficam >= 0
+    # as contagens antigas menos as das linhas que saíram (poucas)
+    saem = np.searchsorted(entrada['deslocamentos'], np.flatnonzero(~vivas), 'right') - 1
+    contagens = np.zeros(len(categorias), dtype=np.int64)
+    contagens[recodificar] = np.diff(entrada['deslocamentos']) - np.bincount(saem, minlength=len(recodificar))
+
+    presentes = codigos >= 0
+    ordem = np.argsort(codigos[presentes], kind='stable')
+    codigos, posicoes = codigos[presentes][ordem], posicoes[presentes][ordem]
+    fins = np.cumsum(contagens)
+    contagens += np.bincount(codigos, minlength=len(categorias))
+
+    deslocamentos = np.zeros(len(categorias) + 1, dtype=np.int64)
+    np.cumsum(contagens, out=deslocamentos[1:])
+    return {'categorias': categorias, 'deslocamentos': deslocamentos,
+            'posicoes': np.insert(ficam[vivas], fins[codigos], posicoes).astype(np.int64)}
+
+def construir_indice_de_filtros(df, colunas=COLUNAS_FILTRAVEIS):
+    return {coluna: indexar_coluna(df[coluna]) for coluna in colunas}
+
+def atualizar_indice_de_filtros(indice, df, posicoes):
+    # df já é o dataframe atualizado e posicoes vem de deltas.posicoes_do_delta
+    return {coluna: atualizar_coluna_indexada(entrada, df[coluna].cat.categories, posicoes['mapa'],
+                                              df[coluna].cat.codes.to_numpy()[posicoes['novas']].astype(np.int64), posicoes['novas'])
+            for coluna, entrada in indice.items()}
+
+def posicoes_dos_valores(indice, coluna, valores):
+
+    entrada = indice[coluna]
+    codigos = entrada['categorias'].get_indexer(list(valores))
+    codigos = codigos[codigos >= 0]
+    deslocamentos = entrada['deslocamentos']
+    partes = [entrada['posicoes'][deslocamentos[c]:deslocamentos[c + 1]] for c in codigos]
+    if not partes:
+        return np.empty(0, dtype=np.int64)
+    # cada linha pertence a uma única categoria, então a união não tem repetições
+    return np.sort(np.concatenate(partes))
+
+def posicoes_filtradas(indice, **selecoes):
+
+    # None quando não há nenhuma seleção (todas as linhas)
+    posicoes = None
+    for coluna, valores in selecoes.items():
+        linhas = posicoes_dos_valores(indice, coluna, valores)
+        posicoes = linhas if posicoes is None else np.intersect1d(posicoes, linhas, assume_unique=True)
+    return posicoes
+
+def filtrar(df, indice, **selecoes):
+
+    # filtrar(df, indice, country=paises, cuisines=culinaria)
+    posicoes = posicoes_filtradas(indice, **selecoes)
+    if posicoes is None:
+        return df
+    return df.take(posicoes)
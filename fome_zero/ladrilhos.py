@@ -0,0 +1,214 @@
+import numpy as np
+
+from fome_zero.espacial import intervalos_de_colunas, juntar_trechos, na_caixa, trechos_da_grade
+from fome_zero.indices import posicoes_filtradas
+
+# ÍNDICE DE LADRILHOS DO MAPA:
+# O mapa interativo (mapa.py) só recebe o que cabe na área visível. Para isso os
+# restaurantes são agrupados, uma vez por versão do dataset, nos ladrilhos do mapa (a
+# grade Web Mercator do Leaflet: 2^zoom ladrilhos de 256 px por lado), cada ladrilho
+# dividido em SUBDIVISAO x SUBDIVISAO células. Para cada zoom até ZOOM_MAXIMO ficam, por
+# célula e país, a quantidade de restaurantes, a soma das coordenadas (o grupo aparece
+# no centro de massa dos seus restaurantes) e as somas da nota e do custo para dois (as
+# médias do mapa de densidade). Como na grade do índice espacial, a chave é
+# faixa * colunas + coluna e as entradas são ordenadas por ela.
+#
+# O zoom mais fino é agrupado a partir dos restaurantes e cada zoom acima dele a partir
+# do anterior (cada célula junta quatro), então a construção custa um agrupamento das
+# linhas e outros bem menores. Na consulta, os grupos da área visível saem das faixas da
+# grade, como no índice espacial; com até LIMITE_MARCADORES restaurantes na área, eles
+# vão individualmente, do índice espacial. O que vai para o navegador fica limitado pela
+# área visível (~SUBDIVISAO^2 grupos por ladrilho), e não pelo tamanho do dataset.
+
+SUBDIVISAO = 4
+ZOOM_MAXIMO = 16
+LIMITE_MARCADORES = 500
+# latitudes além disso ficam fora do Web Mercator
+LATITUDE_MAXIMA = 85.0511287798
+
+def _mercator(latitudes, longitudes):
+
+    # coordenadas do mapa em [0, 1), x para leste e y para o sul, como os ladrilhos
+    phi = np.radians(np.clip(latitudes, -LATITUDE_MAXIMA, LATITUDE_MAXIMA))
+    x = (np.asarray(longitudes, dtype='float64') + 180) / 360
+    y = (1 - np.log(np.tan(phi) + 1 / np.cos(phi)) / np.pi) / 2
+    return x, y
+
+def _lado(zoom):
+    return (2 ** zoom) * SUBDIVISAO
+
+def _agrupar(colunas, faixas, paises, quantidade_paises, lado, medidas):
+
+    # uma entrada por (célula, país), ordenadas pela chave da célula, com a soma de cada medida
+    entradas, inversa = np.unique((faixas * lado + colunas) * quantidade_paises + paises, return_inverse=True)
+    nivel = {'chaves': entradas // quantidade_paises, 'pais': entradas % quantidade_paises}
+    for medida, valores in medidas.items():
+        nivel[medida] = np.bincount(inversa, weights=valores, minlength=len(entradas))
+    return nivel
+
+def _celulas_das_linhas(df, paises, zoom):
+
+    # coluna e faixa da célula do zoom, país e medidas das linhas com coordenadas
+    latitudes = df['latitude'].to_numpy(dtype='float64')
+    longitudes = df['longitude'].to_numpy(dtype='float64')
+    validas = np.isfinite(latitudes) & np.isfinite(longitudes) & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+    latitudes, longitudes = latitudes[validas], longitudes[validas]
+    notas = df['aggregate_rating'].to_numpy(dtype='float64')[validas]
+    valores = df['valor_unificado'].to_numpy(dtype='float64')[validas]
+
+    lado = _lado(zoom)
+    x, y = _mercator(latitudes, longitudes)
+    colunas = np.minimum((x * lado).astype(np.int64), lado - 1)
+    faixas = np.minimum((y * lado).astype(np.int64), lado - 1)
+
+    medidas = {
+        'contagem': np.ones(len(latitudes)),
+        'soma_latitude': latitudes,
+        'soma_longitude': longitudes,
+        # as médias do mapa de densidade ignoram os valores vazios
+        'soma_nota': np.nan_to_num(notas),
+        'notas': np.isfinite(notas).astype('float64'),
+        'soma_valor': np.nan_to_num(valores),
+        'valores': np.isfinite(valores).astype('float64'),
+    }
+    return colunas, faixas, paises[validas], medidas
+
+def _subir(nivel, zoom, quantidade_paises):
+    # cada célula do zoom de cima junta quatro células do zoom abaixo
+    lado = _lado(zoom + 1)
+    medidas = {medida: valores for medida, valores in nivel.items() if medida not in ('chaves', 'pais')}
+    return _agrupar((nivel['chaves'] % lado) // 2, (nivel['chaves'] // lado) // 2, nivel['pais'], quantidade_paises, _lado(zoom), medidas)
+
+def construir_indice_de_ladrilhos(df, zoom_maximo=ZOOM_MAXIMO):
+
+    quantidade_paises = len(df['country'].cat.categories)
+    colunas, faixas, paises, medidas = _celulas_das_linhas(df, df['country'].cat.codes.to_numpy().astype(np.int64), zoom_maximo)
+    niveis = {zoom_maximo: _agrupar(colunas, faixas, paises, quantidade_paises, _lado(zoom_maximo), medidas)}
+    for zoom in range(zoom_maximo - 1, -1, -1):
+        niveis[zoom] = _subir(niveis[zoom + 1], zoom, quantidade_paises)
+
+    return {'zoom_maximo': zoom_maximo, 'paises': df['country'].cat.categories, 'niveis': niveis}
+
+# ATUALIZAÇÃO POR DELTA:
+# Todas as medidas são somas, então um delta vira um nível com as linhas novas e, com
+# as medidas negativas, as removidas, agrupado e subido pelos zooms como na construção.
+# Em cada zoom ele é somado às entradas que já existem e as novas são inseridas na
+# ordem das chaves; só as células que o delta toca mudam.
+
+def _somar_ao_nivel(nivel, delta, quantidade_paises):
+
+    # entradas (célula, país) do delta que já estão no nível e onde entram as que não estão
+    entradas = nivel['chaves'] * quantidade_paises + nivel['pais']
+    entradas_delta = delta['chaves'] * quantidade_paises + delta['pais']
+    lugares = np.searchsorted(entradas, entradas_delta)
+    existem = lugares < len(entradas)
+    existem[existem] = entradas[lugares[existem]] == entradas_delta[existem]
+
+    somado = {}
+    for medida, valores in nivel.items():
+        if medida not in ('chaves', 'pais'):
+            valores = valores.copy()
+            valores[lugares[existem]] += delta[medida][existem]
+        somado[medida] = np.insert(valores, lugares[~existem], delta[medida][~existem]) if not existem.all() else valores
+    # a célula (de um país) que ficou sem restaurantes sai
+    vazias = somado['contagem'] < 0.5
+    if vazias.any():
+        somado = {medida: valores[~vazias] for medida, valores in somado.items()}
+    return somado
+
+def atualizar_indice_de_ladrilhos(ladrilhos, removidas, adicionadas):
+
+    zoom_maximo = ladrilhos['zoom_maximo']
+    quantidade_paises = len(ladrilhos['paises'])
+    saem, entram = [_celulas_das_linhas(linhas, ladrilhos['paises'].get_indexer(linhas['country']).astype(np.int64), zoom_maximo)
+                    for linhas in (removidas, adicionadas)]
+    medidas = {medida: np.concatenate([-saem[3][medida], entram[3][medida]]) for medida in entram[3]}
+    delta = _agrupar(*(np.concatenate([a, b]) for a, b in zip(saem[:3], entram[:3])), quantidade_paises, _lado(zoom_maximo), medidas)
+
+    niveis = {}
+    for zoom in range(zoom_maximo, -1, -1):
+        if zoom < zoom_maximo:
+            delta = _subir(delta, zoom, quantidade_paises)
+        niveis[zoom] = _somar_ao_nivel(ladrilhos['niveis'][zoom], delta, quantidade_paises)
+    return {'zoom_maximo': zoom_maximo, 'paises': ladrilhos['paises'], 'niveis': niveis}
+
+# CONSULTA DA ÁREA VISÍVEL:
+
+def celulas_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom):
+
+    # somas das medidas de cada célula do zoom que toca a área visível; células com mais
+    # de um país viram uma só
+    zoom = int(min(max(zoom, 0), ladrilhos['zoom_maximo']))
+    nivel = ladrilhos['niveis'][zoom]
+    lado = _lado(zoom)
+
+    x, y = _mercator(np.array([norte, sul]), np.array([oeste, leste]))
+    faixas = np.arange(max(int(y[0] * lado), 0), min(int(y[1] * lado), lado - 1) + 1, dtype=np.int64)
+    # x fora de [0, 1) quando a área passa do antimeridiano
+    intervalos = intervalos_de_colunas(int(np.floor(x[0] * lado)), int(np.floor(x[1] * lado)), lado)
+    entradas = juntar_trechos(*trechos_da_grade(nivel['chaves'], faixas, intervalos, lado))
+    if paises is not None:
+        entradas = entradas[np.isin(nivel['pais'][entradas], ladrilhos['paises'].get_indexer(list(paises)))]
+
+    chaves, inversa = np.unique(nivel['chaves'][entradas], return_inverse=True)
+    celulas = {'zoom': zoom, 'chaves': chaves}
+    for medida in nivel:
+        if medida not in ('chaves', 'pais'):
+            celulas[medida] = np.bincount(inversa, weights=nivel[medida][entradas], minlength=len(chaves))
+    return celulas
+
+def grupos_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom):
+
+    # grupos (latitude, longitude, quantidade) no centro de massa dos seus restaurantes
+    celulas = celulas_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom)
+    contagem = celulas['contagem']
+    return celulas['soma_latitude'] / np.maximum(contagem, 1), celulas['soma_longitude'] / np.maximum(contagem, 1), contagem.astype(np.int64)
+
+def consultar_area(ladrilhos, espacial, indice, paises, sul, oeste, norte, leste, zoom, limite=LIMITE_MARCADORES):
+
+    # {'tipo': 'grupos', latitude, longitude, quantidade} ou {'tipo': 'marcadores', linhas};
+    # paises=None não filtra por país
+    latitudes, longitudes, quantidades = grupos_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom)
+    # as células cobrem a área visível, então a soma delas limita os restaurantes na área
+    if quantidades.sum() <= limite:
+        linhas = None if paises is None else posicoes_filtradas(indice, country=paises)
+        return {'tipo': 'marcadores', 'linhas': na_caixa(espacial, sul, oeste, norte, leste, linhas=linhas)}
+    return {'tipo': 'grupos', 'latitude': latitudes, 'longitude': longitudes, 'quantidade': quantidades}
+
+# DENSIDADE:
+# Em vez de um objeto por restaurante, o mapa de densidade recebe as próprias células,
+# um polígono cada, coloridas pela medida escolhida. As células são as do zoom seguinte
+# ao do mapa (SUBDIVISAO * 2 por ladrilho de 256 px): umas poucas centenas na tela.
+
+MEDIDAS_DENSIDADE = {
+    'quantidade': 'Quantidade de restaurantes',
+    'nota': 'Nota média',
+    'preco': 'Preço médio para dois (US$)',
+}
+
+def _latitude(y):
+    # inverso do Web Mercator
+    return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y))))
+
+def densidade_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom, medida='quantidade'):
+
+    # limites (graus) de cada célula, quantidade de restaurantes e valor da medida
+    celulas = celulas_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom + 1)
+    lado = _lado(celulas['zoom'])
+    faixas, colunas = celulas['chaves'] // lado, celulas['chaves'] % lado
+
+    quantidade = celulas['contagem'].astype(np.int64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        valores = {
+            'quantidade': quantidade.astype('float64'),
+            'nota': celulas['soma_nota'] / celulas['notas'],
+            'preco': celulas['soma_valor'] / celulas['valores'],
+        }
+    return {
+        'sul': _latitude((faixas + 1) / lado),
+        'norte': _latitude(faixas / lado),
+        'oeste': colunas / lado * 360 - 180,
+        'leste': (colunas + 1) / lado * 360 - 180,
+        'quantidade': quantidade,
+        'valor': valores[medida],
+    }
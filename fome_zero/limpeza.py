@@ -0,0 +1,153 @@
+import argparse
+import time
+
+import inflection
+import numpy as np
+import pandas as pd
+
+from fome_zero.paises import COUNTRIES
+from fome_zero.transformacoes import paises_nome_colunar, valor_unificado_colunar
+
+# PIPELINE DE LIMPEZA:
+# A limpeza do dataset é uma lista de etapas declaradas em etapas_de_limpeza(), cada uma
+# de um tipo:
+#   quadro -> recebe e devolve o dataframe (só a primeira, que renomeia e descarta colunas);
+#   filtro -> recebe também a máscara das linhas que ainda estão no dataset e devolve a
+#             das linhas que ficam; nenhuma linha é copiada;
+#   coluna -> devolve os valores (vetorizados) de uma coluna nova ou substituída.
+# As máscaras dos filtros são acumuladas e as linhas descartadas só saem do dataframe
+# quando uma etapa de coluna precisa dele, em um único take, e no final: o dataset é
+# copiado duas ou três vezes, e não a cada etapa. Cada etapa registra as linhas de
+# entrada e de saída e o tempo gasto.
+
+# colunas que identificam uma linha repetida do dataset; None compara a linha inteira
+CHAVE_DUPLICATAS = ['restaurant_id', 'restaurant_name', 'country_code', 'city', 'cuisines', 'average_cost_for_two', 'aggregate_rating', 'votes']
+
+# custo para dois (em dólar) a partir do qual o restaurante é um outlier e sai do dataset;
+# países sem limite próprio (pelo nome, como na coluna country) usam o padrão
+LIMITE_VALOR_PADRAO = 160000
+LIMITES_VALOR_POR_PAIS = {}
+
+# ETAPAS:
+
+def nome_da_coluna(nome):
+    # "Restaurant ID" -> "restaurant_id"
+    return inflection.underscore(inflection.titleize(nome).replace(" ", ""))
+
+def preparar_colunas(bruto, descartar):
+    # renomeadas sem copiar; a cópia é a do drop, que já deixa as descartadas de fora
+    df = bruto.set_axis([nome_da_coluna(coluna) for coluna in bruto.columns], axis=1, copy=False)
+    return df.drop(columns=descartar)
+
+def sem_nulos(df, vivas, colunas):
+    return df[colunas].notna().all(axis=1).to_numpy()
+
+def hash_das_linhas(df, chave=None):
+    # um hash de 8 bytes por linha, das colunas da chave (ou da linha inteira)
+    colunas = df if chave is None else df[list(chave)]
+    return pd.util.hash_pandas_object(colunas, index=False).to_numpy()
+
+def primeira_ocorrencia(df, vivas, chave):
+    # só as linhas que ainda estão no dataset disputam a primeira ocorrência
+    ficam = np.zeros(len(df), dtype=bool)
+    posicoes = np.flatnonzero(vivas)
+    ficam[posicoes] = ~pd.Series(hash_das_linhas(df, chave)[posicoes]).duplicated().to_numpy()
+    return ficam
+
+def _itens(texto, separador):
+    # sem espaços nas pontas, sem itens vazios e sem repetir um item
+    return list(dict.fromkeys(item.strip() for item in texto.split(separador) if item.strip()))
+
+def lista_normalizada(df, coluna, separador=","):
+    # "Italian,Pizza , Italian" -> "Italian, Pizza"; também uma vez por valor distinto
+    codigos, valores = pd.factorize(df[coluna], use_na_sentinel=False)
+    normalizados = [texto if not isinstance(texto, str) else ", ".join(_itens(texto, separador)) for texto in valores]
+    return pd.Series(np.array(normalizados, dtype=object)[codigos], index=df.index, name=coluna)
+
+def primeiro_item(df, coluna, separador=","):
+    # "Italian, Pizza" -> "Italian"; as combinações distintas são bem menos numerosas que
+    # as linhas, então o texto é separado uma vez por valor distinto
+    codigos, valores = pd.factorize(df[coluna], use_na_sentinel=False)
+    primeiros = pd.Series(valores, dtype=object).str.split(separador, n=1).str[0].str.strip()
+    return pd.Series(primeiros.to_numpy()[codigos], index=df.index, name=coluna)
+
+def limites_por_pais(limites, padrao):
+    # país (nome) -> limite, para o código de cada país
+    return {codigo: limites.get(nome, padrao) for codigo, nome in COUNTRIES.items()}
+
+def abaixo_do_limite(df, vivas, coluna, limites, padrao):
+    limite = df['country_code'].map(limites_por_pais(limites, padrao)).fillna(padrao).to_numpy(dtype='float64')
+    # valor vazio também sai, como na comparação direta com o limite
+    return df[coluna].to_numpy(dtype='float64') < limite
+
+def etapas_de_limpeza(taxas_cambio, chave=CHAVE_DUPLICATAS, limites=LIMITES_VALOR_POR_PAIS, padrao=LIMITE_VALOR_PADRAO):
+
+    return [
+        # a coluna switch_to_order_menu tem sempre o mesmo valor e não é usada na análise
+        {'etapa': 'preparar_colunas', 'tipo': 'quadro', 'funcao': preparar_colunas, 'parametros': {'descartar': ['switch_to_order_menu']}},
+        # só a coluna cuisines tem vazios (poucas linhas)
+        {'etapa': 'sem_culinaria', 'tipo': 'filtro', 'funcao': sem_nulos, 'parametros': {'colunas': ['cuisines']}},
+        {'etapa': 'duplicatas', 'tipo': 'filtro', 'funcao': primeira_ocorrencia, 'parametros': {'chave': chave}},
+        # todas as culinárias do restaurante (índice de culinárias, culinarias.py) e, em
+        # cuisines, só a principal: a primeira da lista
+        {'etapa': 'todas_as_culinarias', 'tipo': 'coluna', 'coluna': 'todas_culinarias', 'funcao': lista_normalizada, 'parametros': {'coluna': 'cuisines'}},
+        {'etapa': 'culinaria_principal', 'tipo': 'coluna', 'coluna': 'cuisines', 'funcao': primeiro_item, 'parametros': {'coluna': 'cuisines'}},
+        # custo para dois em dólar, para comparar países
+        {'etapa': 'valor_unificado', 'tipo': 'coluna', 'coluna': 'valor_unificado', 'funcao': valor_unificado_colunar, 'parametros': {'taxas_cambio': taxas_cambio}},
+        {'etapa': 'outliers_valor_unificado', 'tipo': 'filtro', 'funcao': abaixo_do_limite, 'parametros': {'coluna': 'valor_unificado', 'limites': limites, 'padrao': padrao}},
+        {'etapa': 'nome_do_pais', 'tipo': 'coluna', 'coluna': 'country', 'funcao': paises_nome_colunar, 'parametros': {}},
+    ]
+
+# EXECUÇÃO:
+
+def limpar(bruto, etapas):
+
+    # devolve o dataframe limpo e, para cada etapa, linhas de entrada e saída e o tempo
+    df = bruto
+    vivas = None
+    relatorio = []
+    for etapa in etapas:
+        inicio = time.perf_counter()
+        entrada = len(df) if vivas is None else int(vivas.sum())
+
+        if etapa['tipo'] == 'quadro':
+            df = etapa['funcao'](df, **etapa['parametros'])
+        elif etapa['tipo'] == 'filtro':
+            vivas = np.ones(len(df), dtype=bool) if vivas is None else vivas
+            vivas = vivas & etapa['funcao'](df, vivas, **etapa['parametros'])
+        else:
+            if vivas is not None and not vivas.all():
+                # a coluna só é calculada para as linhas que ficam
+                df = df.take(np.flatnonzero(vivas))
+            vivas = None
+            df[etapa['coluna']] = etapa['funcao'](df, **etapa['parametros'])
+
+        saida = len(df) if vivas is None else int(vivas.sum())
+        relatorio.append({'etapa': etapa['etapa'], 'linhas_entrada': entrada, 'linhas_saida': saida,
+                          'ms': (time.perf_counter() - inicio) * 1000})
+
+    if vivas is not None and not vivas.all():
+        df = df.take(np.flatnonzero(vivas))
+    return df, relatorio
+
+def relatorio_limpeza(relatorio):
+    return "\n".join(f"limpeza: {r['etapa']:<26} {r['linhas_entrada']:>9} -> {r['linhas_saida']:>9} linhas {r['ms']:>9.1f} ms" for r in relatorio)
+
+def main():
+
+    # python -m fome_zero.limpeza: mostra linhas e tempo de cada etapa da limpeza
+    from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json
+
+    parser = argparse.ArgumentParser(description='Executa a limpeza do dataset e mostra cada etapa')
+    parser.add_argument('csv', nargs='?', default=CAMINHO_CSV)
+    parser.add_argument('--chave', nargs='+', help='colunas usadas na deduplicação (padrão: CHAVE_DUPLICATAS)')
+    parser.add_argument('--linha-inteira', action='store_true', help='deduplica comparando a linha inteira')
+    args = parser.parse_args()
+
+    chave = None if args.linha_inteira else (args.chave or CHAVE_DUPLICATAS)
+    df, relatorio = limpar(pd.read_csv(args.csv), etapas_de_limpeza(carregar_dados_de_json(), chave))
+    print(relatorio_limpeza(relatorio))
+    print(f"{len(df)} linhas após a limpeza")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+import json
+import time
+
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+
+from fome_zero.ladrilhos import MEDIDAS_DENSIDADE, consultar_area, densidade_na_area
+
+# MAPA DOS RESTAURANTES:
+# Em vez de um folium.Marker por linha (iterrows), as coordenadas vão para o navegador
+# como um único array e o FastMarkerCluster cria os marcadores no lado do cliente.
+#
+# O folium (com os plugins e o branca) é o import mais pesado do dashboard e só é usado
+# para montar o HTML: ele é importado na primeira vez que um mapa é construído, e não
+# por quem só importa este módulo.
+#
+# No modo interativo (streamlit_folium) o mapa devolve a área visível e o zoom a cada
+# movimento, e só os restaurantes dessa área vão para o navegador: grupos com a
+# quantidade de restaurantes ou, de perto, cada restaurante (índice de ladrilhos,
+# ladrilhos.py). O mapa base não muda entre execuções; só a camada dos restaurantes é
+# trocada, sem recarregar o mapa. No modo de densidade a camada são as células da grade
+# de ladrilhos, um polígono por célula, coloridas pela quantidade de restaurantes, pela
+# nota média ou pelo preço médio.
+
+# Cria o marcador de cada linha [latitude, longitude, país] já no navegador
+CALLBACK_MARCADOR = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2]);
+    return marker;
+};
+"""
+
+LARGURA = 700
+ALTURA = 500
+
+CHAVE_MAPA_INTERATIVO = 'mapa_interativo'
+# última área visível devolvida pelo mapa (sessão)
+CHAVE_AREA = 'area_do_mapa'
+ZOOM_INICIAL = 2
+# área visível antes do primeiro movimento do mapa (o mundo inteiro)
+AREA_INICIAL = (-90, -180, 90, 180)
+
+# cores das células do mapa de densidade, da menor para a maior medida; sem valor, cinza
+CORES_DENSIDADE = ['#ffffb2', '#fecc5c', '#fd8d3c', '#f03b20', '#bd0026']
+COR_SEM_VALOR = '#bdbdbd'
+
+def pontos_do_mapa(df):
+
+    # ~10 cm de precisão é mais que suficiente para o mapa e reduz o tamanho do HTML
+    latitudes = df['latitude'].round(6).tolist()
+    longitudes = df['longitude'].round(6).tolist()
+    paises = df['country'].astype(str).tolist()
+    return [list(ponto) for ponto in zip(latitudes, longitudes, paises)]
+
+def construir_mapa(df):
+
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    mapa = folium.Map(location=[1,1],zoom_start=2)
+    FastMarkerCluster(pontos_do_mapa(df), callback=CALLBACK_MARCADOR).add_to(mapa)
+    return mapa
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def html_do_mapa(_df, paises, versao):
+
+    # paises e versao (do dataset) identificam o mapa no cache; o dataframe filtrado
+    # não entra na chave para não precisar ser serializado a cada rerun
+    import folium
+
+    inicio = time.perf_counter()
+    figura = folium.Figure().add_child(construir_mapa(_df))
+    html = figura.render()
+    return html, time.perf_counter() - inicio
+
+def exibir_mapa(df, paises, versao, debug=False):
+
+    html, tempo = html_do_mapa(df, tuple(sorted(paises)), versao)
+    components.html(html, height=ALTURA + 10, width=LARGURA)
+
+    if debug:
+        st.caption(f'Mapa: {len(df)} restaurantes, HTML de {len(html.encode()) / 1024:.0f} KB, construído em {tempo * 1000:.0f} ms')
+
+# MAPA INTERATIVO:
+
+def _geojson(latitudes, longitudes, propriedades):
+    # ~1 m de precisão; as propriedades são listas com um valor por ponto
+    coordenadas = zip(np.round(longitudes, 5).tolist(), np.round(latitudes, 5).tolist())
+    nomes = list(propriedades)
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': list(ponto)}, 'properties': dict(zip(nomes, valores))}
+        for ponto, *valores in zip(coordenadas, *propriedades.values())]}
+
+def _na_area(longitudes, oeste):
+    # a área visível pode passar do antimeridiano (oeste < -180): os pontos vão para a
+    # mesma volta do globo que está na tela
+    return oeste + np.mod(np.asarray(longitudes, dtype='float64') - oeste, 360)
+
+def _raio_do_grupo(quantidade):
+    # 8 px para um restaurante e +4 px a cada potência de 10
+    return 8 + 4 * np.floor(np.log10(np.maximum(quantidade, 1))).astype(int)
+
+def camada_da_area(resultado, df, oeste):
+
+    import folium
+
+    camada = folium.FeatureGroup(name='restaurantes')
+    if resultado['tipo'] == 'grupos':
+        dados = _geojson(resultado['latitude'], _na_area(resultado['longitude'], oeste),
+                         {'quantidade': resultado['quantidade'].tolist(), 'raio': _raio_do_grupo(resultado['quantidade']).tolist()})
+        geojson = folium.GeoJson(dados, marker=folium.CircleMarker(fill=True, fill_opacity=0.6, weight=1),
+                                 style_function=lambda ponto: {'radius': ponto['properties']['raio']},
+                                 tooltip=folium.GeoJsonTooltip(fields=['quantidade'], aliases=['Restaurantes:']))
+    else:
+        pontos = df.take(resultado['linhas'])
+        dados = _geojson(pontos['latitude'].to_numpy(), _na_area(pontos['longitude'].to_numpy(), oeste),
+                         {'restaurante': pontos['restaurant_name'].astype(str).tolist(), 'pais': pontos['country'].astype(str).tolist()})
+        geojson = folium.GeoJson(dados, marker=folium.Marker(), popup=folium.GeoJsonPopup(fields=['restaurante', 'pais'], labels=False))
+    # área vazia (ou nenhum país selecionado): o popup e o tooltip do folium exigem os
+    # campos nas features, então a camada vai sem o GeoJson
+    if dados['features']:
+        geojson.add_to(camada)
+    return camada, dados
+
+def _cores(valores, logaritmica=False):
+
+    # a posição de cada valor entre o menor e o maior da área visível escolhe a cor; a
+    # quantidade vai em escala logarítmica (poucas células concentram muitos restaurantes)
+    escala = np.log10(np.maximum(valores, 1)) if logaritmica else np.asarray(valores, dtype='float64')
+    finitos = np.isfinite(escala)
+    if not finitos.any():
+        return [COR_SEM_VALOR] * len(escala), (np.nan, np.nan)
+    minimo, maximo = escala[finitos].min(), escala[finitos].max()
+    posicao = (escala - minimo) / (maximo - minimo) if maximo > minimo else np.zeros(len(escala))
+    classes = np.clip(np.nan_to_num(posicao * len(CORES_DENSIDADE)).astype(int), 0, len(CORES_DENSIDADE) - 1)
+    cores = [CORES_DENSIDADE[classe] if finito else COR_SEM_VALOR for classe, finito in zip(classes.tolist(), finitos.tolist())]
+    limites = (10 ** minimo, 10 ** maximo) if logaritmica else (minimo, maximo)
+    return cores, limites
+
+def camada_de_densidade(densidade, medida, oeste):
+
+    import folium
+
+    oestes = np.round(_na_area(densidade['oeste'], oeste), 5)
+    lestes = np.round(oestes + (densidade['leste'] - densidade['oeste']), 5)
+    suls, nortes = np.round(densidade['sul'], 5), np.round(densidade['norte'], 5)
+    cores, limites = _cores(densidade['valor'], logaritmica=medida == 'quantidade')
+    # JSON não tem NaN: célula sem valor vai com null
+    valores = [None if np.isnan(valor) else round(valor, 2) for valor in densidade['valor'].tolist()]
+
+    dados = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature',
+         'geometry': {'type': 'Polygon', 'coordinates': [[[w, s], [e, s], [e, n], [w, n], [w, s]]]},
+         'properties': {'quantidade': quantidade, 'valor': valor, 'cor': cor}}
+        for w, e, s, n, quantidade, valor, cor in zip(oestes.tolist(), lestes.tolist(), suls.tolist(), nortes.tolist(),
+                                                      densidade['quantidade'].tolist(), valores, cores)]}
+
+    campos, nomes = ['quantidade'], ['Restaurantes:']
+    if medida != 'quantidade':
+        campos, nomes = campos + ['valor'], nomes + [f'{MEDIDAS_DENSIDADE[medida]}:']
+    camada = folium.FeatureGroup(name='densidade')
+    # sem células na área, a camada vai sem o GeoJson (o tooltip exige os campos nas features)
+    if dados['features']:
+        folium.GeoJson(dados, style_function=lambda celula: {'fillColor': celula['properties']['cor'], 'color': celula['properties']['cor'],
+                                                             'weight': 0.5, 'fillOpacity': 0.6},
+                       tooltip=folium.GeoJsonTooltip(fields=campos, aliases=nomes)).add_to(camada)
+    return camada, dados, limites
+
+def _area_visivel(visao):
+
+    # (sul, oeste, norte, leste) e zoom devolvidos pelo st_folium
+    limites = (visao or {}).get('bounds') or {}
+    sudoeste, nordeste = limites.get('_southWest') or {}, limites.get('_northEast') or {}
+    area = (sudoeste.get('lat'), sudoeste.get('lng'), nordeste.get('lat'), nordeste.get('lng'))
+    if any(valor is None for valor in area):
+        area = AREA_INICIAL
+    return tuple(float(valor) for valor in area), int((visao or {}).get('zoom') or ZOOM_INICIAL)
+
+def exibir_mapa_interativo(df, indice, espacial, ladrilhos, paises, medida=None, debug=False):
+
+    import folium
+    from streamlit_folium import st_folium
+
+    # a área usada na camada é a do último movimento; se o mapa devolver outra, a página
+    # roda de novo com a camada da área nova
+    visao = st.session_state.get(CHAVE_AREA)
+    (sul, oeste, norte, leste), zoom = _area_visivel(visao)
+
+    # medida: mapa de densidade colorido por ela (MEDIDAS_DENSIDADE); None: grupos e marcadores
+    inicio = time.perf_counter()
+    if medida is None:
+        resultado = consultar_area(ladrilhos, espacial, indice, paises, sul, oeste, norte, leste, zoom)
+        camada, dados = camada_da_area(resultado, df, oeste)
+        tipo = resultado['tipo']
+    else:
+        densidade = densidade_na_area(ladrilhos, paises, sul, oeste, norte, leste, zoom, medida)
+        camada, dados, (minimo, maximo) = camada_de_densidade(densidade, medida, oeste)
+        tipo = 'células'
+    tempo = time.perf_counter() - inicio
+
+    mapa = folium.Map(location=[1,1],zoom_start=ZOOM_INICIAL)
+    retorno = st_folium(mapa, key=CHAVE_MAPA_INTERATIVO, feature_group_to_add=camada, returned_objects=['bounds', 'zoom'],
+                        height=ALTURA, width=LARGURA)
+    if retorno and _area_visivel(retorno) != _area_visivel(visao):
+        st.session_state[CHAVE_AREA] = retorno
+        st.rerun()
+
+    if medida is not None and dados['features']:
+        st.caption(f'{MEDIDAS_DENSIDADE[medida]}: de {minimo:,.2f} (amarelo) a {maximo:,.2f} (vermelho) na área visível')
+
+    if debug:
+        st.caption(f'Mapa interativo: zoom {zoom}, {len(dados["features"])} {tipo}, '
+                   f'camada de {len(json.dumps(dados).encode()) / 1024:.0f} KB montada em {tempo * 1000:.0f} ms')
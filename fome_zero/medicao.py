@@ -0,0 +1,132 @@
+import collections
+import datetime
+import json
+import os
+import threading
+import time
+
+# MEDIÇÃO DAS ETAPAS DAS PÁGINAS:
+# Cronômetro de voltas: a página chama iniciar_medicao() no começo e marcar('etapa')
+# depois de cada trecho (leitura, filtro, agregação, figura, mapa, exportação...). Cada
+# marca registra o tempo desde a marca anterior, então não é preciso reindentar o código
+# da página em blocos "with" e marcas feitas dentro de funções chamadas pela página (ex.:
+# a leitura do CSV em dados.py) entram na sequência naturalmente.
+#
+# Desligada, marcar() só consulta um atributo da thread e retorna. Ligada (?debug=1 na URL
+# ou FOME_ZERO_MEDICAO=1 no ambiente), cada execução da página vira uma linha em
+# dataset/cache/medicoes.jsonl e os totais do processo são reescritos em
+# dataset/cache/metricas.prom, no formato do textfile collector do node_exporter.
+#
+# Contadores (ex.: acertos e falhas do cache de figuras) são somados sempre, com contar(),
+# e aparecem no painel e no arquivo do Prometheus.
+#
+# Este módulo não importa o streamlit (e nem dados.py, que o usa), para poder ser usado
+# também pelas ferramentas de linha de comando.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_LOG = os.path.join(RAIZ, "dataset", "cache", "medicoes.jsonl")
+CAMINHO_METRICAS = os.path.join(RAIZ, "dataset", "cache", "metricas.prom")
+VARIAVEL_AMBIENTE = "FOME_ZERO_MEDICAO"
+
+# cada sessão do streamlit executa a página na sua própria thread
+_local = threading.local()
+
+# totais do processo por (página, etapa): [soma dos segundos, quantidade]
+_totais = {}
+_trava = threading.Lock()
+
+# contadores do processo, independentes da medição estar ligada
+_contadores = collections.Counter()
+
+def medicao_ligada(debug=False):
+    return debug or os.environ.get(VARIAVEL_AMBIENTE) == "1"
+
+def iniciar_medicao(pagina, debug=False):
+
+    if not medicao_ligada(debug):
+        _local.voltas = None
+        return False
+    _local.pagina = pagina
+    _local.voltas = []
+    _local.ultima = time.perf_counter()
+    # o painel só aparece com ?debug=1; pela variável de ambiente a medição só é registrada
+    return debug
+
+def marcar(etapa):
+
+    voltas = getattr(_local, "voltas", None)
+    if voltas is None:
+        return
+    agora = time.perf_counter()
+    voltas.append((etapa, agora - _local.ultima))
+    _local.ultima = agora
+
+def contar(nome, quantidade=1):
+    _contadores[nome] += quantidade
+
+def _rotulo(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"')
+
+def _escrever_metricas(caminho):
+
+    linhas = [
+        "# HELP fome_zero_etapa_segundos Tempo gasto em cada etapa das páginas do dashboard.",
+        "# TYPE fome_zero_etapa_segundos summary",
+    ]
+    for (pagina, etapa), (soma, quantidade) in sorted(_totais.items()):
+        rotulos = f'pagina="{_rotulo(pagina)}",etapa="{_rotulo(etapa)}"'
+        linhas.append(f"fome_zero_etapa_segundos_sum{{{rotulos}}} {soma:.6f}")
+        linhas.append(f"fome_zero_etapa_segundos_count{{{rotulos}}} {quantidade}")
+    linhas += [
+        "# HELP fome_zero_contador_total Contadores do dashboard (ex.: acertos do cache de figuras).",
+        "# TYPE fome_zero_contador_total counter",
+    ]
+    for nome, valor in sorted(_contadores.items()):
+        linhas.append(f'fome_zero_contador_total{{nome="{_rotulo(nome)}"}} {valor}')
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    os.replace(temporario, caminho)
+
+def finalizar_medicao(painel=None, caminho_log=CAMINHO_LOG, caminho_metricas=CAMINHO_METRICAS):
+
+    # painel: container do streamlit (ex.: st.sidebar) onde a tabela de tempos é exibida
+    voltas = getattr(_local, "voltas", None)
+    if voltas is None:
+        return None
+    _local.voltas = None
+    pagina = _local.pagina
+    total = sum(segundos for _, segundos in voltas)
+
+    registro = {
+        "data": datetime.datetime.now().isoformat(timespec="milliseconds"),
+        "pagina": pagina,
+        "total_ms": round(total * 1000, 3),
+        "etapas": [{"etapa": etapa, "ms": round(segundos * 1000, 3)} for etapa, segundos in voltas],
+    }
+    with _trava:
+        for etapa, segundos in voltas + [("total", total)]:
+            acumulado = _totais.setdefault((pagina, etapa), [0.0, 0])
+            acumulado[0] += segundos
+            acumulado[1] += 1
+        try:
+            os.makedirs(os.path.dirname(caminho_log), exist_ok=True)
+            with open(caminho_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            _escrever_metricas(caminho_metricas)
+        except OSError:
+            # sem permissão de escrita a medição continua aparecendo no painel
+            pass
+
+    if painel is not None:
+        painel.markdown("""___""")
+        painel.markdown("## Tempos da página")
+        painel.dataframe({
+            "etapa": [etapa for etapa, _ in voltas] + ["total"],
+            "ms": [round(segundos * 1000, 1) for _, segundos in voltas] + [round(total * 1000, 1)],
+        }, hide_index=True, use_container_width=True)
+        if _contadores:
+            painel.caption(' · '.join(f'{nome}: {valor}' for nome, valor in sorted(_contadores.items())))
+    return registro
@@ -0,0 +1,59 @@
+# Tabelas de apoio: nome, moeda e cor de cada código usado no dataset do Zomato
+
+COUNTRIES = {
+ 1: "India",
+ 14: "Australia",
+ 30: "Brazil",
+ 37: "Canada",
+ 94: "Indonesia",
+ 148: "New Zeland",
+ 162: "Philippines",
+ 166: "Qatar",
+ 184: "Singapure",
+ 189: "South Africa",
+ 191: "Sri Lanka",
+ 208: "Turkey",
+ 214: "United Arab Emirates",
+ 215: "England",
+ 216: "United States of America",
+ }
+
+# países selecionados quando uma página abre
+PAISES_PADRAO = ['Brazil','England','South Africa', 'Canada','Qatar','Australia']
+
+def country_name(country_id):
+    return COUNTRIES[country_id]
+
+MOEDAS = {
+ 1: "INR",
+ 14: "AUD",
+ 30: "BRL",
+ 37: "CAD",
+ 94: "IDR",
+ 148: "NZD",
+ 162: "PHP",
+ 166: "QAR",
+ 184: "SGD",
+ 189: "ZAR",
+ 191: "LKR",
+ 208: "TRY",
+ 214: "AED",
+ 215: "GBP",
+ 216: "USD",
+ }
+
+def country_moeda(country_id):
+    return MOEDAS[country_id]
+
+COLORS = {
+"3F7E00": "darkgreen",
+"5BA829": "green",
+"9ACD32": "lightgreen",
+"CDD614": "orange",
+"FFBA00": "red",
+"CBCBC8": "darkred",
+"FF7800": "darkred",
+}
+
+def color_name(color_code):
+    return COLORS[color_code]
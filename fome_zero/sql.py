@@ -0,0 +1,131 @@
+import contextlib
+import glob
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from fome_zero.cubo import ordenar
+from fome_zero.dados import RAIZ
+
+# BACKEND SQLITE:
+# Os restaurantes tratados ficam em um arquivo SQLite por versão do dataset, com índices
+# em país, cidade e culinária. Filtro e agrupamento rodam no banco, fora da memória do
+# processo; cada consulta abre a própria conexão (só leitura), então sessões diferentes
+# consultam em paralelo. Só o resultado agrupado (algumas dezenas de linhas) volta para o
+# pandas, onde divisões, arredondamento e ordenação são os mesmos do cubo.
+
+PASTA_BANCOS = os.path.join(RAIZ, "dataset", "cache", "consultas")
+COLUNAS = ['country', 'city', 'cuisines', 'votes', 'aggregate_rating', 'valor_unificado']
+# bancos guardados na pasta, contando o da versão atual: uma página que começou a ser
+# desenhada antes de uma versão nova ainda consulta o banco da anterior
+BANCOS_MANTIDOS = 2
+
+def caminho_banco(versao, pasta=PASTA_BANCOS):
+    return os.path.join(pasta, f"restaurantes_{versao[:16]}.sqlite")
+
+def _modificado(caminho):
+    try:
+        return os.path.getmtime(caminho)
+    except OSError:
+        return 0
+
+def remover_bancos_antigos(caminho, manter=BANCOS_MANTIDOS):
+
+    # apaga os bancos de versões anteriores, dos menos para os mais recentes usados,
+    # deixando o de caminho e mais manter - 1
+    outros = [banco for banco in glob.glob(os.path.join(os.path.dirname(caminho), "restaurantes_*.sqlite")) if banco != caminho]
+    for banco in sorted(outros, key=_modificado, reverse=True)[manter - 1:]:
+        with contextlib.suppress(OSError):
+            os.remove(banco)
+
+def construir_banco(df, caminho):
+
+    # a versão está no nome do arquivo: se ele existe, já tem esses dados (e passa a
+    # contar como usado agora, para não ser apagado por remover_bancos_antigos)
+    if os.path.exists(caminho):
+        with contextlib.suppress(OSError):
+            os.utime(caminho)
+        return caminho
+
+    tabela = df[COLUNAS].copy()
+    for coluna in ['country', 'city', 'cuisines']:
+        tabela[coluna] = tabela[coluna].astype(str)
+    tabela['votes'] = tabela['votes'].astype('int64')
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with contextlib.closing(sqlite3.connect(temporario)) as con:
+        tabela.to_sql('restaurantes', con, index=False, chunksize=50_000)
+        con.execute("CREATE INDEX idx_pais ON restaurantes (country)")
+        con.execute("CREATE INDEX idx_pais_cidade ON restaurantes (country, city)")
+        con.execute("CREATE INDEX idx_culinaria ON restaurantes (cuisines)")
+        con.commit()
+    os.replace(temporario, caminho)
+    remover_bancos_antigos(caminho)
+    return caminho
+
+def _consultar(banco, sql, parametros=()):
+    with contextlib.closing(sqlite3.connect(f"file:{banco}?mode=ro", uri=True, check_same_thread=False)) as con:
+        return pd.read_sql_query(sql, con, params=list(parametros))
+
+def _onde(paises, excluir=()):
+    condicoes, parametros = [], []
+    if paises is not None:
+        condicoes.append(f"country IN ({', '.join('?' * len(paises))})")
+        parametros += list(paises)
+    if excluir:
+        condicoes.append(f"cuisines NOT IN ({', '.join('?' * len(excluir))})")
+        parametros += list(excluir)
+    return (f"WHERE {' AND '.join(condicoes)}" if condicoes else ""), parametros
+
+# PÁGINA PAÍSES:
+
+def _por_pais(banco, paises, colunas):
+    onde, parametros = _onde(paises)
+    return _consultar(banco, f"SELECT country, {colunas} FROM restaurantes {onde} GROUP BY country ORDER BY country", parametros)
+
+def restaurantes_por_pais(banco, paises):
+    return _por_pais(banco, paises, "COUNT(*) AS restaurant_id")
+
+def cidades_por_pais(banco, paises):
+    return _por_pais(banco, paises, "COUNT(DISTINCT city) AS city")
+
+def media_votos_por_pais(banco, paises):
+    soma = _por_pais(banco, paises, "SUM(votes) AS soma, COUNT(*) AS quantidade")
+    return pd.DataFrame({'country': soma['country'], 'votes': soma['soma'] / soma['quantidade']})
+
+def media_preco_por_pais(banco, paises):
+    soma = _por_pais(banco, paises, "SUM(valor_unificado) AS soma, COUNT(valor_unificado) AS quantidade")
+    return pd.DataFrame({'country': soma['country'], 'valor_unificado': soma['soma'] / soma['quantidade']})
+
+# PÁGINA CIDADES:
+
+def _ranking_cidades(banco, paises, medida, coluna):
+    onde, parametros = _onde(paises)
+    soma = _consultar(banco, f"SELECT country, city, {medida} AS medida FROM restaurantes {onde} GROUP BY country, city HAVING medida > 0", parametros)
+    return ordenar(soma.rename(columns={'medida': coluna}), coluna, False, ['country', 'city'])
+
+def cidades_com_mais_restaurantes(banco, paises):
+    return _ranking_cidades(banco, paises, "COUNT(*)", 'restaurant_id')
+
+def cidades_com_nota_acima_de_4(banco, paises):
+    return _ranking_cidades(banco, paises, "SUM(aggregate_rating > 4)", 'aggregate_rating')
+
+def cidades_com_nota_abaixo_de_2_5(banco, paises):
+    # restaurantes sem nenhum voto não entram, como no cubo
+    return _ranking_cidades(banco, paises, "SUM(aggregate_rating < 2.5 AND votes != 0)", 'aggregate_rating')
+
+def cidades_com_mais_culinarias(banco, paises):
+    return _ranking_cidades(banco, paises, "COUNT(DISTINCT cuisines)", 'cuisines')
+
+# PÁGINA CULINÁRIAS:
+
+def media_nota_por_culinaria(banco, paises=None, excluir=(), ascending=False):
+
+    onde, parametros = _onde(paises, excluir)
+    # soma em décimos, como no cubo, para a média sair igual
+    soma = _consultar(banco, f"SELECT cuisines, SUM(CAST(ROUND(aggregate_rating * 10) AS INTEGER)) AS soma, COUNT(aggregate_rating) AS quantidade FROM restaurantes {onde} GROUP BY cuisines", parametros)
+    media = pd.DataFrame({'cuisines': soma['cuisines'], 'aggregate_rating': (soma['soma'] / soma['quantidade'] / 10).round(2)})
+    return ordenar(media, 'aggregate_rating', ascending, ['cuisines'])
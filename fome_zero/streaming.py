@@ -0,0 +1,136 @@
+import argparse
+import resource
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fome_zero.cubo import DIMENSOES, construir_cubo
+from fome_zero.dados import CAMINHO_CSV, CAMINHO_TAXAS, carregar_dados_de_json
+from fome_zero.indices import construir_melhores_por_culinaria
+from fome_zero.limpeza import CHAVE_DUPLICATAS, etapas_de_limpeza, hash_das_linhas, limpar, relatorio_limpeza
+from fome_zero.tipos import compactar_tipos
+
+# INGESTÃO EM BLOCOS:
+# Para arquivos maiores que a memória. O CSV é lido em blocos, cada bloco passa pelas
+# mesmas etapas de limpeza de tratar_dados (limpeza.py) e os agregados usados pelas
+# páginas (cubo e melhor restaurante por culinária) são atualizados bloco a bloco. A
+# única etapa trocada é a das duplicatas, que também descarta as linhas já vistas em
+# blocos anteriores: delas só fica na memória um hash de 8 bytes por linha, nunca as
+# linhas em si. Os hashes ficam em um array ordenado: cada bloco consulta e insere os
+# seus por busca binária, sem ordenar de novo tudo o que já foi visto.
+#
+# É uma ferramenta offline (python -m fome_zero.streaming), para gerar os agregados e,
+# com --destino, as linhas tratadas em Parquet. O dashboard não passa por aqui: as
+# páginas usam o dataframe inteiro em memória (estado.py, pelo construir_snapshot de
+# dados.py), então ler o CSV em blocos não diminuiria o que o processo precisa guardar.
+
+TAMANHO_BLOCO = 100_000
+
+def novos_vistos():
+    return {'hashes': np.empty(0, dtype=np.uint64)}
+
+def _nos_vistos(vistos, hashes):
+    # vistos está ordenado
+    if not len(vistos):
+        return np.zeros(len(hashes), dtype=bool)
+    lugares = np.minimum(np.searchsorted(vistos, hashes), len(vistos) - 1)
+    return vistos[lugares] == hashes
+
+def fora_dos_vistos(df, vivas, chave, vistos):
+
+    # como limpeza.primeira_ocorrencia, mais as linhas que já apareceram em blocos
+    # anteriores; os hashes das que ficam entram em vistos
+    hashes = hash_das_linhas(df, chave)
+    ficam = np.zeros(len(df), dtype=bool)
+    posicoes = np.flatnonzero(vivas)
+    ficam[posicoes] = ~pd.Series(hashes[posicoes]).duplicated().to_numpy() & ~_nos_vistos(vistos['hashes'], hashes[posicoes])
+    novos = np.sort(hashes[ficam])
+    vistos['hashes'] = np.insert(vistos['hashes'], np.searchsorted(vistos['hashes'], novos), novos)
+    return ficam
+
+def etapas_em_blocos(taxas_cambio, vistos, chave=CHAVE_DUPLICATAS):
+    etapas = etapas_de_limpeza(taxas_cambio, chave)
+    return [{'etapa': 'duplicatas', 'tipo': 'filtro', 'funcao': fora_dos_vistos, 'parametros': {'chave': chave, 'vistos': vistos}}
+            if etapa['etapa'] == 'duplicatas' else etapa for etapa in etapas]
+
+def tratar_bloco(bloco, taxas_cambio, vistos, chave=CHAVE_DUPLICATAS):
+    # devolve o bloco limpo e o relatório de limpar(); vistos é atualizado
+    return limpar(bloco, etapas_em_blocos(taxas_cambio, vistos, chave))
+
+def _somar_relatorios(relatorio, novo):
+    if relatorio is None:
+        return novo
+    return [{**etapa, 'linhas_entrada': etapa['linhas_entrada'] + nova['linhas_entrada'], 'linhas_saida': etapa['linhas_saida'] + nova['linhas_saida'],
+             'ms': etapa['ms'] + nova['ms']} for etapa, nova in zip(relatorio, novo)]
+
+def _somar_cubos(cubo, novo):
+    if cubo is None:
+        return novo
+    return pd.concat([cubo, novo], ignore_index=True).groupby(DIMENSOES).sum().reset_index()
+
+def _juntar_melhores(melhores, novos):
+    if melhores is None:
+        return novos
+    return construir_melhores_por_culinaria(pd.concat([melhores.reset_index(), novos.reset_index()], ignore_index=True))
+
+def ingerir_em_blocos(caminho_csv=CAMINHO_CSV, caminho_taxas=CAMINHO_TAXAS, tamanho_bloco=TAMANHO_BLOCO, chave=CHAVE_DUPLICATAS, destino=None):
+
+    # destino: caminho de um Parquet onde os blocos tratados são gravados à medida que
+    # são processados (opcional; sem ele só os agregados são mantidos)
+    taxas_cambio = carregar_dados_de_json(caminho_taxas)
+    vistos = novos_vistos()
+    cubo = melhores = relatorio = escritor = None
+    linhas_lidas = linhas_tratadas = 0
+
+    try:
+        for bloco in pd.read_csv(caminho_csv, chunksize=tamanho_bloco):
+            linhas_lidas += len(bloco)
+            df, relatorio_bloco = tratar_bloco(bloco, taxas_cambio, vistos, chave)
+            relatorio = _somar_relatorios(relatorio, relatorio_bloco)
+            linhas_tratadas += len(df)
+
+            cubo = _somar_cubos(cubo, construir_cubo(df))
+            melhores = _juntar_melhores(melhores, construir_melhores_por_culinaria(df))
+
+            if destino is not None:
+                # o esquema do primeiro bloco vale para todos, mesmo que um bloco
+                # tenha uma coluna inteira vazia
+                if escritor is None:
+                    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+                    escritor = pq.ParquetWriter(destino, esquema)
+                escritor.write_table(pa.Table.from_pandas(df, schema=esquema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    return {
+        'cubo': compactar_tipos(cubo),
+        'melhores': melhores,
+        'relatorio': relatorio or [],
+        'linhas_lidas': linhas_lidas,
+        'linhas_tratadas': linhas_tratadas,
+    }
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Ingestão do CSV do Zomato em blocos')
+    parser.add_argument('csv', nargs='?', default=CAMINHO_CSV)
+    parser.add_argument('--taxas', default=CAMINHO_TAXAS)
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO)
+    parser.add_argument('--chave', nargs='+', help='colunas usadas na deduplicação (padrão: CHAVE_DUPLICATAS)')
+    parser.add_argument('--linha-inteira', action='store_true', help='deduplica comparando a linha inteira')
+    parser.add_argument('--destino', help='Parquet onde gravar as linhas tratadas')
+    args = parser.parse_args()
+
+    chave = None if args.linha_inteira else (args.chave or CHAVE_DUPLICATAS)
+    resultado = ingerir_em_blocos(args.csv, args.taxas, args.bloco, chave, args.destino)
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(relatorio_limpeza(resultado['relatorio']))
+    print(f"{resultado['linhas_lidas']} linhas lidas, {resultado['linhas_tratadas']} após a limpeza")
+    print(f"cubo: {len(resultado['cubo'])} linhas, culinárias: {len(resultado['melhores'])}")
+    print(f"pico de memória: {pico:.0f} MB")
+
+if __name__ == '__main__':
+    main()
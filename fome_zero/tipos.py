@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from fome_zero.paises import COUNTRIES
+
+# COMPACTAÇÃO DE TIPOS:
+# Colunas de texto com poucos valores distintos viram categóricas (as páginas agrupam
+# pelos códigos em vez de comparar strings) e os números usam o menor tipo seguro.
+
+# As categorias são ordenadas alfabeticamente; para o país a lista é fixa, então os
+# códigos não mudam de uma versão do dataset para a outra.
+CATEGORIAS_FIXAS = {
+    'country': sorted(COUNTRIES.values()),
+}
+
+COLUNAS_CATEGORICAS = ['country', 'city', 'cuisines', 'todas_culinarias', 'currency', 'rating_text', 'rating_color', 'locality']
+
+COLUNAS_BOOLEANAS = ['has_table_booking', 'has_online_delivery', 'is_delivering_now']
+
+TIPOS_NUMERICOS = {
+    'country_code': 'int16',
+    'price_range': 'int8',
+    'votes': 'int32',
+    'average_cost_for_two': 'int32',
+}
+
+# Nenhuma coluna float é reduzida para float32: a nota e o valor_unificado aparecem nas
+# métricas e no download (4.9 viraria 4.900000095367432) e latitude/longitude perderiam
+# precisão; o ganho seria pequeno perto das colunas de texto.
+
+def uso_de_memoria(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _para_categoria(coluna):
+
+    categorias = CATEGORIAS_FIXAS.get(coluna.name)
+    if categorias is None:
+        categorias = sorted(coluna.dropna().unique())
+    return pd.Categorical(coluna, categories=categorias)
+
+def compactar_tipos(df):
+
+    df = df.copy()
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = _para_categoria(df[coluna])
+
+    for coluna in COLUNAS_BOOLEANAS:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(bool)
+
+    for coluna, tipo in TIPOS_NUMERICOS.items():
+        if coluna not in df.columns:
+            continue
+        if np.issubdtype(np.dtype(tipo), np.integer):
+            # só reduz o inteiro se todos os valores couberem no tipo menor
+            limites = np.iinfo(tipo)
+            if df[coluna].min() < limites.min or df[coluna].max() > limites.max:
+                continue
+        df[coluna] = df[coluna].astype(tipo)
+
+    return df
+
+def relatorio_memoria(antes, depois):
+    return f"memória do dataframe: {antes / 1e6:.2f} MB -> {depois / 1e6:.2f} MB ({1 - depois / antes:.0%} menor)"
+
+def unir_categorias(*dfs):
+
+    # Deixa as colunas categóricas de todos os dataframes com as mesmas categorias, para
+    # que um pd.concat entre eles continue categórico (ex.: cidade nova vinda de um delta)
+    resultado = list(dfs)
+    for coluna in COLUNAS_CATEGORICAS:
+        if not all(coluna in df.columns for df in dfs):
+            continue
+        categorias = CATEGORIAS_FIXAS.get(coluna)
+        if categorias is None:
+            valores = set()
+            for df in dfs:
+                serie = df[coluna]
+                valores.update(serie.cat.categories if isinstance(serie.dtype, pd.CategoricalDtype) else serie.dropna().unique())
+            categorias = sorted(valores)
+        tipo = pd.CategoricalDtype(categorias)
+        resultado = [df if df[coluna].dtype == tipo else df.assign(**{coluna: df[coluna].astype(tipo)}) for df in resultado]
+    return resultado
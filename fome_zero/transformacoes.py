@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from fome_zero.paises import COUNTRIES, MOEDAS
+
+# TRANSFORMAÇÕES COLUNARES:
+# Versões vetorizadas de valor_unificado e paises_nome. Em vez de um df.apply(axis=1),
+# que cria uma Series por linha, o country_code de cada linha é usado como posição
+# em uma tabela (código do país -> taxa / nome) montada uma única vez.
+
+def tabela_por_codigo(mapa, vazio, dtype):
+
+    tabela = np.full(max(mapa) + 1, vazio, dtype=dtype)
+    for codigo, valor in mapa.items():
+        tabela[codigo] = valor
+    return tabela
+
+def _buscar(tabela, codigos):
+
+    # códigos lidos como float (ex.: coluna com vazios em um arquivo de delta) também valem
+    codigos = np.asarray(codigos).astype(np.int64, copy=False)
+    fora = (codigos < 0) | (codigos >= len(tabela))
+    if not fora.any():
+        valores = tabela[codigos]
+        fora = pd.isna(valores)
+        if not fora.any():
+            return valores
+    # mesmo comportamento das funções por linha: código sem país/moeda é um erro
+    raise KeyError(int(codigos[fora][0]))
+
+def taxas_por_codigo(taxas_cambio):
+    return tabela_por_codigo({codigo: taxas_cambio[moeda] for codigo, moeda in MOEDAS.items()}, np.nan, 'float64')
+
+def nomes_por_codigo():
+    return tabela_por_codigo(COUNTRIES, None, object)
+
+def valor_unificado_colunar(df, taxas_cambio):
+
+    taxas = _buscar(taxas_por_codigo(taxas_cambio), df['country_code'].to_numpy())
+    valores = np.round(df['average_cost_for_two'].to_numpy(dtype='float64') / taxas, 2)
+    return pd.Series(valores, index=df.index, name='valor_unificado')
+
+def paises_nome_colunar(df):
+
+    nomes = _buscar(nomes_por_codigo(), df['country_code'].to_numpy())
+    return pd.Series(nomes, index=df.index, name='country')
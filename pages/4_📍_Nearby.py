@@ -0,0 +1,131 @@
+import streamlit as st
+
+from fome_zero.culinarias import posicoes_das_culinarias
+from fome_zero.dados import create_price_tye
+from fome_zero.espacial import dentro_do_raio, mais_proximos
+from fome_zero.estado import estado_atual
+from fome_zero.indices import filtrar
+from fome_zero.medicao import finalizar_medicao, iniciar_medicao, marcar
+
+# ?debug=1 na URL liga a medição do tempo de cada etapa e mostra os tempos na barra lateral
+debug = iniciar_medicao('nearby', st.query_params.get('debug') == '1')
+
+# Carregando o dataframe já tratado (lido, limpo e convertido uma única vez por processo)
+# e os índices, todos da mesma versão do dataset durante esta execução da página
+
+estado = estado_atual()
+df = estado['df']
+indice = estado['indice'] # posições das linhas de cada país, cidade e culinária
+indice_de_culinarias = estado['culinarias'] # todas as culinárias de cada restaurante
+indice_espacial = estado['espacial'] # grade das coordenadas dos restaurantes
+marcar('carregar_dados')
+
+############################### INICIANDO A CONSTRUÇÃO DA PÁGINA DO STREAMLIT ########################################
+
+st.set_page_config(page_title='Visão Proximidade',page_icon='📍',layout='wide')
+
+col1,col2 = st.sidebar.columns([2,3])
+
+with col1:
+    # pelo caminho o streamlit envia o PNG como está, sem decodificar e recodificar a imagem
+    st.image( 'logo.png' , width=60)
+
+with col2:
+
+    st.markdown('## Fome Zero!')
+
+st.sidebar.markdown("""___""")
+st.sidebar.markdown('## Ponto de partida')
+
+partida = st.sidebar.radio('Buscar a partir de:', ['Cidade', 'Coordenadas'], horizontal=True)
+
+if partida == 'Cidade':
+
+    paises_disponiveis = sorted(df['country'].unique())
+    pais = st.sidebar.selectbox('País:', paises_disponiveis, index=paises_disponiveis.index('Brazil') if 'Brazil' in paises_disponiveis else 0)
+    df_pais = filtrar(df, indice, country=[pais])
+    cidade = st.sidebar.selectbox('Cidade:', sorted(df_pais['city'].unique()))
+
+    # o centro da cidade: a mediana não é puxada por coordenadas erradas de um restaurante
+    df_cidade = filtrar(df, indice, country=[pais], city=[cidade])
+    latitude = float(df_cidade['latitude'].median())
+    longitude = float(df_cidade['longitude'].median())
+
+else:
+
+    latitude = st.sidebar.number_input('Latitude:', min_value=-90.0, max_value=90.0, value=-22.9068, format='%.6f')
+    longitude = st.sidebar.number_input('Longitude:', min_value=-180.0, max_value=180.0, value=-43.1729, format='%.6f')
+
+st.sidebar.markdown("""___""")
+st.sidebar.markdown('## Busca')
+
+busca = st.sidebar.radio('Restaurantes:', ['Mais próximos', 'Dentro de um raio'], horizontal=True)
+
+if busca == 'Mais próximos':
+    quantidade = st.sidebar.slider('Quantidade de restaurantes:', 1, 100, step=1, value=10)
+else:
+    raio_km = st.sidebar.slider('Raio (km):', 0.5, 50.0, step=0.5, value=5.0)
+
+st.sidebar.markdown("""___""")
+st.sidebar.markdown('## Filtros')
+
+culinaria = st.sidebar.multiselect('Tipos de culinária (qualquer um da lista do restaurante):', indice_de_culinarias['nomes'])
+precos = st.sidebar.multiselect('Faixa de preço:', [1, 2, 3, 4], format_func=create_price_tye)
+nota_minima = st.sidebar.slider('Nota mínima:', 0.0, 5.0, step=0.1, value=0.0)
+
+# filtros vazios não restringem a busca
+filtros = {
+    'linhas': posicoes_das_culinarias(indice_de_culinarias, culinaria) if culinaria else None,
+    'precos': precos or None,
+    'nota_minima': nota_minima or None,
+}
+marcar('filtros')
+
+if busca == 'Mais próximos':
+    linhas, distancias = mais_proximos(indice_espacial, latitude, longitude, quantidade, **filtros)
+else:
+    linhas, distancias = dentro_do_raio(indice_espacial, latitude, longitude, raio_km, **filtros)
+marcar('consulta_espacial')
+
+with st.container():
+
+    st.title('📍 Restaurantes Próximos')
+    st.markdown(f'###### A partir de {latitude:.4f}, {longitude:.4f}')
+    st.markdown("""___""")
+
+with st.container():
+
+    col1,col2,col3 = st.columns(3)
+
+    with col1:
+
+        st.metric(label='Restaurantes encontrados', value=len(linhas))
+
+    with col2:
+
+        st.metric(label='Mais próximo', value=f'{distancias[0]:.2f} km' if len(distancias) else '-')
+
+    with col3:
+
+        st.metric(label='Mais distante', value=f'{distancias[-1]:.2f} km' if len(distancias) else '-')
+
+with st.container():
+
+    encontrados = df.take(linhas).assign(distancia_km=distancias.round(2))
+    # a lista completa de culinárias de cada restaurante e a faixa de preço por extenso
+    encontrados = encontrados.assign(cuisines=encontrados['todas_culinarias'], price_type=encontrados['price_range'].map(create_price_tye))
+
+    col1,col2 = st.columns([3,2])
+
+    with col1:
+
+        tabela = encontrados[['distancia_km','restaurant_name','city','cuisines','price_type','aggregate_rating']].reset_index(drop=True)
+        st.dataframe(tabela, height=500)
+
+    with col2:
+
+        st.map(encontrados[['latitude','longitude']], size=20)
+
+    marcar('resultados')
+
+finalizar_medicao(st.sidebar if debug else None)
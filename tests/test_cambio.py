@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from fome_zero.cambio import MOEDAS_EXIBICAO, caminho_taxas_ativas, ler_taxas, salvar_versao, validar_taxas
+from fome_zero.dados import CAMINHO_TAXAS, carregar_dados_de_json
+
+@pytest.fixture
+def taxas():
+    return carregar_dados_de_json(CAMINHO_TAXAS)
+
+def test_taxas_da_raiz_validas(taxas):
+    assert set(MOEDAS_EXIBICAO) <= set(validar_taxas(taxas))
+
+def test_sem_moeda_de_exibicao_recusada(taxas):
+    del taxas['EUR']
+    with pytest.raises(ValueError, match='EUR'):
+        validar_taxas(taxas)
+
+def test_versao_datada_sem_moeda_de_exibicao_recusada(taxas, tmp_path):
+    salvar_versao(taxas, '2024-01-01', str(tmp_path))
+    del taxas['EUR']
+    # uma versão colocada direto na pasta, sem passar pelo salvar_versao
+    (tmp_path / '2024-02-01.json').write_text(json.dumps(taxas))
+    ativa = caminho_taxas_ativas(str(tmp_path))
+    assert ativa.endswith('2024-02-01.json')
+    with pytest.raises(ValueError, match='MOEDAS_EXIBICAO'):
+        ler_taxas(ativa)
@@ -0,0 +1,62 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from fome_zero import consultas, culinarias, sql
+from fome_zero.cubo import construir_cubo
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, tratar_dados
+from fome_zero.paises import PAISES_PADRAO
+from fome_zero.tipos import compactar_tipos
+
+SELECOES = [
+    PAISES_PADRAO,
+    None,
+    [],
+    ['Brazil'],
+    ['India'],
+    ['United States of America', 'England'],
+    ['Qatar', 'Singapure', 'Sri Lanka', 'Turkey'],
+    ['Indonesia', 'New Zeland', 'Philippines', 'South Africa', 'United Arab Emirates', 'Canada', 'Australia'],
+]
+
+CONSULTAS = [(funcao.__name__, funcao, lambda paises: (paises,)) for funcao in consultas.CONSULTAS_POR_PAIS] + [
+    ('media_nota_por_culinaria', consultas.media_nota_por_culinaria, lambda paises: (paises, ['Drinks Only', 'Mineira'], False)),
+    ('media_nota_por_culinaria_crescente', consultas.media_nota_por_culinaria, lambda paises: (paises, ['Drinks Only', 'Mineira'], True)),
+]
+
+@pytest.fixture(scope='module')
+def df():
+    return compactar_tipos(tratar_dados(pd.read_csv(CAMINHO_CSV), carregar_dados_de_json()))
+
+@pytest.fixture(scope='module')
+def fontes(df, tmp_path_factory):
+    pasta = tmp_path_factory.mktemp('consultas')
+    indice = culinarias.construir_indice_de_culinarias(df)
+    return (consultas.preparar_fonte('pandas', df, construir_cubo(df), 'versao_de_teste', indice, pasta),
+            consultas.preparar_fonte('sqlite', df, None, 'versao_de_teste', indice, pasta))
+
+@pytest.mark.parametrize('paises', SELECOES, ids=lambda paises: 'todos' if paises is None else ','.join(paises) or 'nenhum')
+@pytest.mark.parametrize('nome, funcao, argumentos', CONSULTAS, ids=[nome for nome, _, _ in CONSULTAS])
+def test_backends_iguais(fontes, nome, funcao, argumentos, paises):
+    pandas, sqlite = fontes
+    esperado, obtido = funcao(pandas, *argumentos(paises)), funcao(sqlite, *argumentos(paises))
+    assert consultas._iguais(esperado, obtido), f'{nome} {paises}\n{esperado}\n{obtido}'
+
+def test_indice_de_culinarias_igual_ao_backend(fontes):
+    assert consultas.comparar_indice_de_culinarias(fontes[0], SELECOES) == []
+
+def test_bancos_de_versoes_antigas_sao_apagados(df, tmp_path):
+    tabela = df.head(50)
+    caminhos = []
+    for numero in range(4):
+        caminhos.append(consultas.preparar_fonte('sqlite', tabela, None, f'versao_{numero}', None, str(tmp_path))['dados'])
+        # o mtime de alguns sistemas de arquivos tem resolução de segundos
+        os.utime(caminhos[-1], (time.time() - 10 + numero, time.time() - 10 + numero))
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(caminho) for caminho in caminhos[-sql.BANCOS_MANTIDOS:])
+
+    # a versão que volta a ser usada não é apagada pela próxima
+    consultas.preparar_fonte('sqlite', tabela, None, 'versao_2', None, str(tmp_path))
+    consultas.preparar_fonte('sqlite', tabela, None, 'versao_4', None, str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(sql.caminho_banco(versao, str(tmp_path))) for versao in ['versao_2', 'versao_4'])
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, tratar_dados
+from fome_zero.deltas import COLUNA_OPERACAO, aplicar_delta, ler_delta, posicoes_do_delta
+from fome_zero.estado import _atualizar_estruturas, _construir_estruturas
+from fome_zero.tipos import compactar_tipos
+
+# Os índices ajustados delta a delta têm de ser iguais aos construídos do zero sobre o
+# dataframe atualizado.
+
+def _iguais(ajustado, refeito, caminho=''):
+    if isinstance(refeito, dict):
+        assert set(ajustado) == set(refeito), caminho
+        for chave in refeito:
+            _iguais(ajustado[chave], refeito[chave], f'{caminho}.{chave}')
+    elif isinstance(refeito, pd.DataFrame):
+        pd.testing.assert_frame_equal(ajustado, refeito, obj=caminho)
+    elif isinstance(refeito, pd.Series):
+        pd.testing.assert_series_equal(ajustado, refeito, obj=caminho)
+    elif isinstance(refeito, pd.Index):
+        pd.testing.assert_index_equal(ajustado, refeito, obj=caminho)
+    elif isinstance(refeito, np.ndarray) and refeito.dtype.kind == 'f':
+        np.testing.assert_allclose(ajustado, refeito, rtol=1e-9, atol=1e-6, err_msg=caminho)
+    elif isinstance(refeito, np.ndarray):
+        np.testing.assert_array_equal(ajustado, refeito, err_msg=caminho)
+    else:
+        assert ajustado == refeito, caminho
+
+@pytest.fixture(scope='module')
+def bruto():
+    return pd.read_csv(CAMINHO_CSV)
+
+def _deltas(bruto, df, estruturas):
+
+    rng = np.random.default_rng(0)
+    # os melhores de algumas culinárias saem, para que elas sejam recalculadas
+    melhores = estruturas['melhores_todas']['restaurant_id'].to_numpy()
+    removidos = np.concatenate([melhores[::7], rng.choice(df['restaurant_id'].to_numpy(), 40, replace=False)])
+    alterados = bruto.loc[~bruto['Restaurant ID'].isin(removidos)].sample(60, random_state=0).drop_duplicates('Restaurant ID')
+    alterados = alterados.assign(**{'Aggregate rating': 4.9, 'Latitude': alterados['Latitude'] + 0.01})
+    alterados.loc[alterados.index[:20], 'Cuisines'] = 'Culinária Teste, Italian'
+    novos = bruto.sample(30, random_state=1).assign(**{'Restaurant ID': np.arange(90_000_000, 90_000_030), 'City': 'Cidade Nova',
+                                                       'Cuisines': 'Italian, Culinária Nova'})
+    primeiro = pd.concat([bruto.loc[bruto['Restaurant ID'].isin(removidos)].drop_duplicates('Restaurant ID').assign(**{COLUNA_OPERACAO: 'delete'}),
+                          alterados.assign(**{COLUNA_OPERACAO: 'upsert'}), novos.assign(**{COLUNA_OPERACAO: 'upsert'})])
+    # o segundo tira parte do que o primeiro pôs e só remove
+    segundo = pd.concat([novos.head(10), alterados.head(5)]).assign(**{COLUNA_OPERACAO: 'delete'})
+    return [primeiro, segundo]
+
+def test_estruturas_ajustadas_iguais_as_refeitas(bruto, tmp_path):
+
+    taxas_cambio = carregar_dados_de_json()
+    df = compactar_tipos(tratar_dados(bruto, taxas_cambio))
+    estruturas = _construir_estruturas(df)
+
+    for numero, delta in enumerate(_deltas(bruto, df, estruturas)):
+        caminho = tmp_path / f'{numero}.csv'
+        delta.to_csv(caminho, index=False)
+        ids, novas = ler_delta(caminho, taxas_cambio)
+        anterior = df
+        df, removidas, adicionadas = aplicar_delta(df, ids, novas)
+        estruturas = _atualizar_estruturas(estruturas, df, removidas, adicionadas, posicoes_do_delta(anterior, removidas, adicionadas))
+        _iguais(estruturas, _construir_estruturas(df))
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, tratar_dados
+from fome_zero.espacial import construir_indice_espacial, dentro_do_raio, mais_proximos, varredura_linear
+from fome_zero.tipos import compactar_tipos
+
+@pytest.fixture(scope='module')
+def df():
+    return compactar_tipos(tratar_dados(pd.read_csv(CAMINHO_CSV), carregar_dados_de_json())).reset_index(drop=True)
+
+@pytest.fixture(scope='module')
+def indice(df):
+    return construir_indice_espacial(df)
+
+@pytest.fixture(scope='module')
+def pontos(df):
+    # ~1 km em torno de restaurantes sorteados (como o centro de uma cidade) e pontos nas
+    # bordas da grade: antimeridiano, polos e o meio do oceano
+    rng = np.random.default_rng(0)
+    origens = rng.integers(len(df), size=40)
+    perto = np.column_stack([df['latitude'].to_numpy()[origens], df['longitude'].to_numpy()[origens]]) + rng.normal(0, 0.01, (40, 2))
+    return [tuple(ponto) for ponto in perto] + [(0.0, 179.99), (-36.85, -179.99), (89.9, 0.0), (-89.9, 45.0), (-30.0, -20.0)]
+
+def _filtros(df):
+    italianas = np.flatnonzero(df['cuisines'].to_numpy() == 'Italian')
+    return [{}, {'precos': [1, 2], 'nota_minima': 4.0}, {'linhas': italianas}]
+
+@pytest.mark.parametrize('raio_km', [0.5, 5, 25, 500])
+def test_raio_igual_a_varredura_linear(df, indice, pontos, raio_km):
+    for filtros in _filtros(df):
+        for latitude, longitude in pontos:
+            linhas, distancias = dentro_do_raio(indice, latitude, longitude, raio_km, **filtros)
+            esperadas, esperados = varredura_linear(df, latitude, longitude, raio_km=raio_km, **filtros)
+            np.testing.assert_array_equal(linhas, esperadas)
+            np.testing.assert_allclose(distancias, esperados)
+
+@pytest.mark.parametrize('k', [1, 10, 100])
+def test_mais_proximos_igual_a_varredura_linear(df, indice, pontos, k):
+    for filtros in _filtros(df):
+        for latitude, longitude in pontos:
+            linhas, distancias = mais_proximos(indice, latitude, longitude, k, **filtros)
+            esperadas, esperados = varredura_linear(df, latitude, longitude, k=k, **filtros)
+            np.testing.assert_array_equal(linhas, esperadas)
+            np.testing.assert_allclose(distancias, esperados)
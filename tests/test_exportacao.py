@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+import pytest
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, tratar_dados
+from fome_zero.exportacao import FORMATOS, gerar_exportacao, limitar_exportacoes, remover_exportacoes_antigas
+from fome_zero.tipos import compactar_tipos
+
+@pytest.fixture(scope='module')
+def df():
+    return compactar_tipos(tratar_dados(pd.read_csv(CAMINHO_CSV), carregar_dados_de_json())).head(500)
+
+def _arquivos(pasta):
+    return sorted(os.listdir(pasta))
+
+def test_exportacao_reaproveitada(df, tmp_path):
+    caminhos = [gerar_exportacao(df, formato, ['Brazil'], 'versao_1', str(tmp_path)) for formato in FORMATOS]
+    assert [gerar_exportacao(df, formato, ['Brazil'], 'versao_1', str(tmp_path)) for formato in FORMATOS] == caminhos
+    assert _arquivos(tmp_path) == sorted(os.path.basename(caminho) for caminho in caminhos)
+
+def test_versoes_anteriores_apagadas(df, tmp_path):
+    antigo = gerar_exportacao(df, 'CSV', ['Brazil'], 'versao_1', str(tmp_path))
+    novo = gerar_exportacao(df, 'CSV', ['Brazil'], 'versao_2', str(tmp_path))
+    # um arquivo ainda sendo escrito não é apagado
+    escrevendo = tmp_path / (os.path.basename(antigo) + '.123.456.tmp')
+    escrevendo.write_text('')
+    remover_exportacoes_antigas('versao_2', str(tmp_path))
+    assert _arquivos(tmp_path) == sorted([os.path.basename(novo), escrevendo.name])
+
+def test_limite_apaga_os_usados_ha_mais_tempo(df, tmp_path):
+    caminhos = []
+    for numero, paises in enumerate([['Brazil'], ['India'], ['Qatar'], ['Canada']]):
+        caminhos.append(gerar_exportacao(df, 'CSV', paises, 'versao_1', str(tmp_path)))
+        os.utime(caminhos[-1], (1000 + numero, 1000 + numero))
+    # o primeiro volta a ser usado
+    gerar_exportacao(df, 'CSV', ['Brazil'], 'versao_1', str(tmp_path))
+
+    tamanho = os.path.getsize(caminhos[0])
+    limitar_exportacoes(caminhos[3], str(tmp_path), limite=3 * tamanho)
+    assert _arquivos(tmp_path) == sorted(os.path.basename(caminho) for caminho in [caminhos[0], caminhos[2], caminhos[3]])
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from fome_zero import figuras
+
+def _pagina():
+    from fome_zero.estado import estado_atual
+    from fome_zero.figuras import exibir_grafico
+    estado = estado_atual()
+    exibir_grafico('restaurantes_por_pais', estado['versao'], estado['fonte'], paises=['Brazil', 'India'])
+
+def _figura(monkeypatch, proto):
+    monkeypatch.setenv('FOME_ZERO_AQUECIMENTO', '0')
+    monkeypatch.setattr(figuras, '_PlotlyChartProto', proto)
+    at = AppTest.from_function(_pagina, default_timeout=60).run()
+    assert not at.exception
+    graficos = at.get('plotly_chart')
+    assert len(graficos) == 1
+    return json.loads(graficos[0].proto.figure.spec)
+
+@pytest.mark.skipif(figuras._PlotlyChartProto is None, reason='streamlit sem o envio direto')
+def test_envio_direto_igual_ao_plotly_chart(monkeypatch):
+    direto = _figura(monkeypatch, figuras._PlotlyChartProto)
+    figuras.limpar_figuras()
+    publico = _figura(monkeypatch, None)
+    assert direto['data'] == publico['data']
+    assert direto['layout'] == publico['layout']
+
+def test_versao_nao_conferida_usa_plotly_chart(monkeypatch):
+    monkeypatch.setattr(figuras, 'VERSOES_ENVIO_DIRETO', ())
+    assert figuras._proto_do_grafico() is None
+    assert _figura(monkeypatch, None)['data']
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from fome_zero import gerador
+from fome_zero.gerador import TAXA_DUPLICATAS, construir_modelo, gerar_arquivo, gerar_dataframe
+
+@pytest.fixture(scope='module')
+def modelo():
+    return construir_modelo()
+
+@pytest.mark.parametrize('extensao', ['csv', 'parquet'])
+def test_mesmo_arquivo_com_qualquer_numero_de_processos(tmp_path, extensao):
+    # blocos pequenos: vários blocos por processo, terminando fora de ordem
+    arquivos = [gerar_arquivo(str(tmp_path / f'sintetico_{processos}.{extensao}'), 2500, semente=3, tamanho_bloco=400, processos=processos)
+                for processos in (1, 3)]
+    with open(arquivos[0], 'rb') as um, open(arquivos[1], 'rb') as varios:
+        assert um.read() == varios.read()
+
+def test_taxa_de_duplicatas(modelo):
+    df = gerar_dataframe(modelo, 20_000, tamanho_bloco=5000)
+    assert len(df) == 20_000
+    assert df['Restaurant ID'].nunique() == len(df) - df.duplicated().sum()
+    assert df.duplicated().mean() == pytest.approx(TAXA_DUPLICATAS, abs=0.001)
+
+def test_falha_nao_deixa_temporario(tmp_path, monkeypatch, modelo):
+    def blocos_com_falha(linhas, semente, taxa_duplicatas, tamanho_bloco, processos, caminho_csv):
+        yield gerar_dataframe(modelo, 100)
+        raise RuntimeError('falha na geração')
+    monkeypatch.setattr(gerador, '_blocos_em_ordem', blocos_com_falha)
+    for extensao in ('csv', 'csv.gz', 'parquet'):
+        with pytest.raises(RuntimeError, match='falha na geração'):
+            gerar_arquivo(str(tmp_path / f'sintetico.{extensao}'), 1000)
+    assert os.listdir(tmp_path) == []
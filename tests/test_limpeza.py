@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json, rename_columns
+from fome_zero.limpeza import etapas_de_limpeza, limpar
+from fome_zero.transformacoes import paises_nome_colunar, valor_unificado_colunar
+
+# o tratar_dados de antes do pipeline declarativo, etapa por etapa
+def tratar_dados_antigo(df1, taxas_cambio):
+    df = rename_columns(df1)
+    df = df.drop(['switch_to_order_menu'], axis=1)
+    df = df.dropna(subset=['cuisines'])
+    df = df.drop_duplicates()
+    df["cuisines"] = df.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
+    df['cuisines'] = df['cuisines'].str.strip()
+    df['valor_unificado'] = valor_unificado_colunar(df, taxas_cambio)
+    df = df[df['valor_unificado'] < 160000]
+    df['country'] = paises_nome_colunar(df)
+    return df
+
+@pytest.fixture(scope='module')
+def bruto():
+    return pd.read_csv(CAMINHO_CSV)
+
+@pytest.fixture(scope='module')
+def taxas():
+    return carregar_dados_de_json()
+
+@pytest.fixture(scope='module')
+def esperado(bruto, taxas):
+    return tratar_dados_antigo(bruto, taxas)
+
+# chave=None compara a linha inteira, como o drop_duplicates antigo; a chave padrão
+# (CHAVE_DUPLICATAS) encontra as mesmas duplicatas no zomato.csv
+@pytest.mark.parametrize('chave', [{'chave': None}, {}])
+def test_limpar_igual_ao_pipeline_antigo(bruto, taxas, esperado, chave):
+    df, relatorio = limpar(bruto, etapas_de_limpeza(taxas, **chave))
+    # todas_culinarias é a única coluna nova do pipeline
+    pd.testing.assert_frame_equal(df.drop(columns='todas_culinarias'), esperado)
+    assert relatorio[-1]['linhas_saida'] == len(esperado)
+
+def test_bruto_nao_modificado(bruto, taxas):
+    copia = bruto.copy()
+    limpar(bruto, etapas_de_limpeza(taxas))
+    pd.testing.assert_frame_equal(bruto, copia)
@@ -0,0 +1,67 @@
+import folium
+import pytest
+
+from fome_zero.estado import estado_atual
+from fome_zero.ladrilhos import MEDIDAS_DENSIDADE, consultar_area, densidade_na_area
+from fome_zero.mapa import camada_da_area, camada_de_densidade
+
+# (sul, oeste, norte, leste) no meio do Atlântico Sul, sem nenhum restaurante
+AREA_VAZIA = (-30, -20, -29, -19)
+MUNDO = (-90, -180, 90, 180)
+
+@pytest.fixture(scope='module')
+def dados():
+    estado = estado_atual()
+    return estado['df'], estado['indice'], estado['espacial'], estado['ladrilhos']
+
+def _renderizar(camada):
+    mapa = folium.Map()
+    camada.add_to(mapa)
+    return mapa.get_root().render()
+
+@pytest.mark.parametrize('paises, area, zoom', [
+    ('todos', AREA_VAZIA, 9),
+    ([], MUNDO, 2),
+    ([], AREA_VAZIA, 9),
+])
+def test_camada_da_area_vazia(dados, paises, area, zoom):
+    df, indice, espacial, ladrilhos = dados
+    paises = list(df['country'].cat.categories) if paises == 'todos' else paises
+    resultado = consultar_area(ladrilhos, espacial, indice, paises, *area, zoom)
+    camada, geojson = camada_da_area(resultado, df, area[1])
+    assert geojson['features'] == []
+    _renderizar(camada)
+
+@pytest.mark.parametrize('area, zoom', [(MUNDO, 2), ((-23.6, -46.7, -23.5, -46.6), 12)])
+def test_camada_da_area_com_restaurantes(dados, area, zoom):
+    df, indice, espacial, ladrilhos = dados
+    resultado = consultar_area(ladrilhos, espacial, indice, ['Brazil'], *area, zoom)
+    camada, geojson = camada_da_area(resultado, df, area[1])
+    assert geojson['features']
+    assert 'restaurante' in _renderizar(camada) or resultado['tipo'] == 'grupos'
+
+@pytest.mark.parametrize('medida', list(MEDIDAS_DENSIDADE))
+@pytest.mark.parametrize('paises, area, zoom', [
+    ('todos', AREA_VAZIA, 9),
+    ([], MUNDO, 2),
+])
+def test_camada_de_densidade_vazia(dados, medida, paises, area, zoom):
+    df, _, _, ladrilhos = dados
+    paises = list(df['country'].cat.categories) if paises == 'todos' else paises
+    densidade = densidade_na_area(ladrilhos, paises, *area, zoom, medida)
+    camada, geojson, _ = camada_de_densidade(densidade, medida, area[1])
+    assert geojson['features'] == []
+    _renderizar(camada)
+
+@pytest.mark.parametrize('modo', ['Área visível', 'Densidade'])
+def test_main_page_sem_paises(monkeypatch, modo):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.setenv('FOME_ZERO_AQUECIMENTO', '0')
+    at = AppTest.from_file('../📊_Main_Page.py', default_timeout=120).run()
+    at.sidebar.radio[0].set_value(modo).run()
+    if modo == 'Densidade':
+        # o AppTest não converte de volta o valor de um selectbox com format_func
+        at.sidebar.selectbox[0].select_index(0)
+    at.sidebar.multiselect[0].set_value([]).run()
+    assert not at.exception
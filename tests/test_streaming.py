@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+
+from fome_zero.dados import CAMINHO_CSV, carregar_dados_de_json
+from fome_zero.limpeza import etapas_de_limpeza, limpar
+from fome_zero.streaming import ingerir_em_blocos
+
+@pytest.mark.parametrize('chave', [{}, {'chave': None}])
+def test_blocos_iguais_a_limpeza_inteira(tmp_path, chave):
+    # blocos pequenos: as duplicatas atravessam os blocos
+    destino = tmp_path / 'tratado.parquet'
+    resultado = ingerir_em_blocos(CAMINHO_CSV, tamanho_bloco=1000, destino=str(destino), **chave)
+    esperado, relatorio = limpar(pd.read_csv(CAMINHO_CSV), etapas_de_limpeza(carregar_dados_de_json(), **chave))
+
+    assert resultado['linhas_tratadas'] == len(esperado)
+    assert [etapa['linhas_saida'] for etapa in resultado['relatorio']] == [etapa['linhas_saida'] for etapa in relatorio]
+    pd.testing.assert_frame_equal(pd.read_parquet(destino), esperado.reset_index(drop=True), check_dtype=False)